@@ -1,12 +1,19 @@
 """
 Grasshopper Analyzer Package
 Tools for analyzing and linting Grasshopper definitions
-Supports both JSON (from export) and GHX (direct) formats
+Supports JSON (from export), GHX (direct) and binary GH formats
 """
 
 from .gh_analyzer import GHAnalyzer, analyze_gh_json
 from .gh_linter import GHLinter, lint_gh_json
 from .ghx_parser import GHXParser, parse_ghx
+from .gh_archive import GHArchiveError, read_gh_archive
+from .parse_cache import ParseCache
+from .subgraph_cache import SubgraphCache
+from .graph import DefinitionGraph, GraphVisitor, LocalVisitor
+from .model_diff import ModelDiff, diff_models
+from .spatial import SpatialIndex
+from .rule_engine import LintRule, NodeRule, register_rule
 from .lint_rules import LINT_RULES, get_rule, get_rules_by_severity
 
 __version__ = "0.2.0"
@@ -18,6 +25,19 @@ __all__ = [
     'analyze_gh_json',
     'lint_gh_json',
     'parse_ghx',
+    'GHArchiveError',
+    'read_gh_archive',
+    'ParseCache',
+    'SubgraphCache',
+    'DefinitionGraph',
+    'GraphVisitor',
+    'LocalVisitor',
+    'ModelDiff',
+    'diff_models',
+    'SpatialIndex',
+    'LintRule',
+    'NodeRule',
+    'register_rule',
     'LINT_RULES',
     'get_rule',
     'get_rules_by_severity'
@@ -2,9 +2,61 @@
 Grasshopper Definition Analyzer
 Simple JSON analysis tool for GH definitions
 """
+import itertools
 import json
-from collections import defaultdict, Counter
-from typing import Dict, List, Any
+import math
+from array import array
+from bisect import bisect_left, insort
+from itertools import compress, repeat
+from operator import and_, eq, ge, itemgetter, lt, ne, not_, or_, sub
+from time import perf_counter
+from collections import Counter, deque
+from typing import Dict, List, Any, Optional, Tuple
+from .model import DefinitionModel, DefinitionDict
+from .graph import DefinitionGraph, GraphVisitor
+from .model_diff import ModelDiff
+from .passes import DanglingPorts, UnnamedParams, InternalizedData, MixedAccess, TreeOperations
+from .spatial import (SpatialIndex, SegmentGrid, object_box, segment_crossings, count_crossings,
+                      median_cell_size, percentile)
+
+
+# Rough size of one serialized object in a .ghx file, used for savings estimates
+OBJECT_BYTES_ESTIMATE = 3000
+
+# Objects whose results leave the wire graph (display, bake/export, cluster outputs)
+SINK_KEYWORDS = ("Panel", "Bake", "Export", "Save", "Write", "Cluster Output",
+                 "Custom Preview", "Data Recorder")
+# Input params that never draw a preview
+INPUT_KEYWORDS = ("Slider", "Toggle", "Button", "Value List", "ValueList", "Scroller")
+# Output (and param) names of previewable geometry, for formats without a preview flag
+GEOMETRY_KEYWORDS = ("Geometry", "Curve", "Surface", "Brep", "Mesh", "Point", "Line", "Circle",
+                     "Arc", "Plane", "Box", "Vector", "Rectangle", "Polyline", "SubD", "Extrusion")
+
+
+def _crossing_order(item: Dict[str, Any]) -> Tuple:
+    """Flagged wires most crossed first, then longest, then in wire order"""
+    return -item["crossings"], -item["length"], item["wire"]
+
+
+def _long_flags(lengths: List[float], threshold: float):
+    return map(ge, lengths, repeat(threshold)) if threshold > 0 else repeat(False, len(lengths))
+
+
+class WireCrossings:
+    """Per-wire crossing state behind ``find_wire_crossings``, kept to patch the next revision
+    
+    Columns are indexed by wire. Wires with an end off the nodes
+    (``resolved`` 0) sit at zero coordinates and are never bucketed,
+    counted or flagged.
+    """
+    
+    __slots__ = ("resolved", "xa", "ya", "xb", "yb", "lengths", "long_percentile", "long_median_ratio",
+                 "ordered", "grid", "counts", "total", "threshold", "items", "flagged")
+    
+    def __init__(self, geometry, long_percentile: float, long_median_ratio: float):
+        self.resolved, self.xa, self.ya, self.xb, self.yb, self.lengths = geometry
+        self.long_percentile = long_percentile
+        self.long_median_ratio = long_median_ratio
 
 
 class GHAnalyzer:
@@ -12,23 +64,115 @@ class GHAnalyzer:
     
     def __init__(self, json_path: str):
         with open(json_path, 'r', encoding='utf-8') as f:
-            self.data = json.load(f)
-        
-        self.components = self.data.get('components', [])
-        self.params = self.data.get('params', [])
-        self.wires = self.data.get('wires', [])
+            self._load(json.load(f))
+    
+    @classmethod
+    def from_data(cls, data: Dict[str, Any]) -> "GHAnalyzer":
+        """Create an analyzer from an already parsed definition dict"""
+        analyzer = cls.__new__(cls)
+        analyzer._load(data)
+        return analyzer
+    
+    def _load(self, data: Dict[str, Any]):
+        self.model = DefinitionModel.from_dict(data)
+        # The export dict as before; component/param/wire dicts are built on first access
+        self.data = DefinitionDict(self.model)
         self.warnings = self.data.get('warnings', [])
+        self._graph = None
+        self._passes = {}
+        self._pass_visitors = {}
+        self._spatial = None
+        # Reusable state: refinement labels and duplicate-chain groups (GH007), wire crossing counts (GH009)
+        self._labels = None
+        self._chain_classes = None
+        self._chain_groups = {}
+        self._chain_items = {}
+        self._chain_ranks = {}
+        self._chain_reach = {}
+        # Last complete find_duplicate_chains result, by (min_components, rounds)
+        self._chain_result = None
+        self._depths = None
+        # Ids whose chain depth changed since the previous revision (None: computed afresh),
+        # and the deep chain items by min_depth (GH014)
+        self._depth_changes = None
+        self._deep_chains = None
+        self._crossings = None
+        self._previous = None
+        self._diff = None
+        # Optional SubgraphCache sharing cacheable per-node findings across definitions
+        self.subgraph_cache = None
+    
+    def follow(self, previous: "GHAnalyzer", diff: ModelDiff):
+        """Reuse what ``previous`` computed wherever ``diff`` (from its model to this one) allows
+        
+        Per-node passes update only the touched nodes' findings, and
+        duplicate chains and wire crossings recompute only around the
+        change; everything else runs as usual. When the wiring is
+        unchanged the previous graph, with its memoized orders, is reused;
+        otherwise it is checked for cycles only around the added wires.
+        """
+        self._previous = previous
+        self._diff = diff
+        # Only one revision back is ever needed
+        previous._previous = previous._diff = None
+        rewired = diff.added or diff.removed or diff.wires_added or diff.wires_removed or diff.reordered
+        if (self._graph is None and previous._graph is not None and not rewired
+                and previous.model.guids == self.model.guids):
+            self._graph = previous._graph.rebind(self.model)
+    
+    @property
+    def graph(self) -> DefinitionGraph:
+        """Wire adjacency, built on first use and shared by all queries and rules"""
+        if self._graph is None:
+            self._graph = DefinitionGraph(self.model)
+            if self._previous is not None and self._previous._graph is not None:
+                self._graph.follow_cycles(self._previous._graph, self._diff)
+        return self._graph
+    
+    @property
+    def spatial_index(self) -> SpatialIndex:
+        """Grid index over node boxes (ids are node ids), built on first use
+        
+        Boxes come from each node's recorded ``bounds``; nodes without
+        bounds (older exports) get a default-sized box around their pivot.
+        """
+        if self._spatial is None:
+            model = self.model
+            boxes = [object_box((model.xs[v], model.ys[v]), node.get('bounds'))
+                     for v, node in enumerate(model.nodes)]
+            self._spatial = SpatialIndex(boxes)
+        return self._spatial
+    
+    @property
+    def components(self) -> List[Dict[str, Any]]:
+        """Component dicts in the export format (built once from the model, for JSON output)"""
+        return self.data['components']
+    
+    @property
+    def params(self) -> List[Dict[str, Any]]:
+        """Param dicts in the export format (built once from the model, for JSON output)"""
+        return self.data['params']
+    
+    @property
+    def wires(self) -> List[Dict[str, Any]]:
+        """Wire dicts in the export format (built once from the model, for JSON output)"""
+        return self.data['wires']
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Full definition in the export JSON format"""
+        return self.model.to_dict()
     
     def get_overview(self) -> Dict[str, Any]:
         """Get basic overview of the definition"""
         doc = self.data.get('document', {})
         stats = self.data.get('stats', {})
+        model = self.model
         
         # Category breakdown
-        category_counts = Counter([c.get('category', 'Unknown') for c in self.components])
+        category_counts = Counter([c.get('category', 'Unknown') for c in model.iter_components()])
         
         # Parameter types
-        param_types = Counter([p.get('param_kind', 'Unknown') for p in self.params])
+        param_types = Counter([p.get('param_kind', 'Unknown') for p in model.iter_params()])
         
         return {
             "document": {
@@ -37,9 +181,9 @@ class GHAnalyzer:
                 "gh_version": doc.get('gh_version', '')
             },
             "stats": {
-                "total_components": stats.get('total_components', len(self.components)),
-                "total_params": stats.get('total_params', len(self.params)),
-                "total_wires": stats.get('total_wires', len(self.wires)),
+                "total_components": stats.get('total_components', model.n_components),
+                "total_params": stats.get('total_params', model.n_nodes - model.n_components),
+                "total_wires": stats.get('total_wires', model.n_wires),
                 "warnings": stats.get('warnings_count', len(self.warnings))
             },
             "breakdown": {
@@ -48,82 +192,998 @@ class GHAnalyzer:
             }
         }
     
+    def run_passes(self, *passes: GraphVisitor, visitors=()) -> List[Any]:
+        """Results of ``passes``, computing the ones not yet memoized in one traversal
+        
+        Pass results are memoized by ``key``. The pending passes and any
+        extra ``visitors`` (lint rules) share a single walk of the graph;
+        the extra visitors' results are not returned. When following a
+        previous revision, passes that can ``update`` from that revision's
+        instance skip the walk. With a ``subgraph_cache`` set, cacheable
+        per-node passes and rules visit only the parts it has not seen.
+        """
+        pending = {}
+        for p in passes:
+            if p.key not in self._passes and p.key not in pending:
+                previous = self._previous._pass_visitors.get(p.key) if self._previous else None
+                if previous is not None and p.update(self.graph, previous, self._diff):
+                    self._passes[p.key] = p.finish()
+                    self._pass_visitors[p.key] = p
+                else:
+                    pending[p.key] = p
+        if pending or visitors:
+            walk = list(pending.values()) + list(visitors)
+            if self.subgraph_cache is not None:
+                results = self.subgraph_cache.traverse(self.graph, walk)
+            else:
+                results = self.graph.traverse(walk)
+            for (key, p), result in zip(pending.items(), results):
+                self._passes[key] = result
+                self._pass_visitors[key] = p
+        return [self._passes[p.key] for p in passes]
+    
+    def find_dangling_ports(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Find unconnected component inputs and outputs in one pass over the wires
+        
+        See ``DanglingPorts``; the result is memoized.
+        """
+        return self.run_passes(DanglingPorts())[0]
+    
     def find_dangling_inputs(self) -> List[Dict[str, Any]]:
         """Find components with unconnected inputs"""
-        dangling = []
-        
-        # Build wire map: {to_guid: [input_names]}
-        wire_targets = defaultdict(list)
-        for wire in self.wires:
-            to_guid = wire.get('to', {}).get('guid', '')
-            in_name = wire.get('to', {}).get('in_name', '')
-            if to_guid:
-                wire_targets[to_guid].append(in_name)
-        
-        # Check each component
-        for comp in self.components:
-            guid = comp.get('guid')
-            connected_inputs = set(wire_targets.get(guid, []))
-            
-            for inp in comp.get('inputs', []):
-                inp_name = inp.get('name')
-                if inp_name not in connected_inputs:
-                    dangling.append({
-                        "component": comp.get('name'),
-                        "guid": guid,
-                        "input": inp_name,
-                        "pos": comp.get('pos')
-                    })
-        
-        return dangling
+        return self.find_dangling_ports()["inputs"]
     
     def find_dangling_outputs(self) -> List[Dict[str, Any]]:
         """Find components with unconnected outputs"""
-        dangling = []
-        
-        # Build wire map: {from_guid: [output_names]}
-        wire_sources = defaultdict(list)
-        for wire in self.wires:
-            from_guid = wire.get('from', {}).get('guid', '')
-            out_name = wire.get('from', {}).get('out_name', '')
-            if from_guid:
-                wire_sources[from_guid].append(out_name)
-        
-        # Check each component
-        for comp in self.components:
-            guid = comp.get('guid')
-            connected_outputs = set(wire_sources.get(guid, []))
-            
-            for out in comp.get('outputs', []):
-                out_name = out.get('name')
-                if out_name not in connected_outputs:
-                    dangling.append({
-                        "component": comp.get('name'),
-                        "guid": guid,
-                        "output": out_name,
-                        "pos": comp.get('pos')
-                    })
-        
-        return dangling
+        return self.find_dangling_ports()["outputs"]
     
     def find_unnamed_params(self) -> List[Dict[str, Any]]:
         """Find panels/sliders without custom names"""
-        unnamed = []
-        
-        for param in self.params:
-            name = param.get('name', '')
-            param_kind = param.get('param_kind', '')
-            
-            # Check if name is default/generic
-            if not name or name == param_kind or name.startswith('Number Slider') or name.startswith('Panel'):
-                unnamed.append({
-                    "type": param_kind,
-                    "name": name,
-                    "guid": param.get('guid'),
-                    "pos": param.get('pos')
-                })
-        
-        return unnamed
+        return self.run_passes(UnnamedParams())[0]
+    
+    def find_cone(self, guid: str, direction: str = "downstream") -> Dict[str, Any]:
+        """Objects downstream of ``guid`` (recomputed when it changes) or upstream of it (feeding it)
+        
+        Cones come from the graph's memoized reachability bitsets, so
+        querying many objects on one analyzer is cheap.
+        """
+        model = self.model
+        node = model.node(guid)
+        if node is None:
+            raise ValueError(f"Unknown object: {guid}")
+        if direction == "downstream":
+            cone = self.graph.downstream(node.id)
+        elif direction == "upstream":
+            cone = self.graph.upstream(node.id)
+        else:
+            raise ValueError(f"Unknown direction: {direction}")
+        
+        objects = [model.nodes[v] for v in cone if v < model.n_nodes]
+        return {
+            "component": node.name,
+            "guid": guid,
+            "direction": direction,
+            "components": sum(1 for o in objects if o.is_component),
+            "params": sum(1 for o in objects if not o.is_component),
+            "objects": [{"component": o.name, "guid": o.guid, "pos": o.pos} for o in objects]
+        }
+    
+    def find_input_impact(self) -> List[Dict[str, Any]]:
+        """Downstream cone size of every unwired param (sliders, panels, toggles)
+        
+        Ranked by the number of components each input makes recompute.
+        """
+        model = self.model
+        graph = self.graph
+        impact = []
+        for v in graph.sources():
+            node = model.nodes[v]
+            if node.is_component:
+                continue
+            cone = [u for u in graph.downstream(v) if u < model.n_nodes]
+            components = sum(1 for u in cone if u < model.n_components)
+            impact.append({
+                "component": node.name,
+                "guid": node.guid,
+                "type": node.get('param_kind', ''),
+                "downstream_components": components,
+                "downstream_params": len(cone) - components,
+                "pos": node.pos
+            })
+        impact.sort(key=lambda i: i["downstream_components"], reverse=True)
+        return impact
+    
+    def is_sink(self, node) -> bool:
+        """Whether a node's result is used outside the wire graph
+        
+        Display, bake/export and cluster output objects always are; any
+        other object except input params is when it draws a preview (not
+        hidden and preview capable). GHX and .gh input do not record
+        ``preview_capable``; there only objects with a geometry output (by
+        output name, or param name for params) count as previewing.
+        """
+        param_kind = node.get('param_kind') or ''
+        label = f"{node.name or ''} {node.get('type') or ''} {param_kind}"
+        if any(keyword in label for keyword in SINK_KEYWORDS):
+            return True
+        if any(keyword in param_kind for keyword in INPUT_KEYWORDS):
+            return False
+        if node.get('hidden', False):
+            return False
+        preview_capable = node.get('preview_capable')
+        if preview_capable is not None:
+            return bool(preview_capable)
+        if node.is_component:
+            names = [port.name or '' for port in node.outputs or ()]
+        else:
+            names = [node.name or '', param_kind]
+        return any(keyword in name for name in names for keyword in GEOMETRY_KEYWORDS)
+    
+    def find_dead_subgraphs(self, timings: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Objects whose results never reach a sink, grouped into deletable pieces
+        
+        One reverse BFS from every sink (see ``is_sink``) marks the live
+        nodes; wires to unresolved endpoints count as live too. Dead params
+        are only reported when wired. Costs come from ``timings``
+        (guid -> ms) or the exported ``time_ms``; ``cost_ms`` is None when
+        no dead object has a timing.
+        """
+        model = self.model
+        graph = self.graph
+        n_nodes = model.n_nodes
+        in_offsets, in_wires, wire_src = graph.in_offsets, graph.in_wires, model.wire_src
+        
+        live = bytearray(graph.n)
+        queue = [v for v in range(n_nodes) if self.is_sink(model.nodes[v])]
+        sinks = len(queue)
+        queue.extend(range(n_nodes, graph.n))
+        for v in queue:
+            live[v] = 1
+        while queue:
+            v = queue.pop()
+            for k in range(in_offsets[v], in_offsets[v + 1]):
+                u = wire_src[in_wires[k]]
+                if not live[u]:
+                    live[u] = 1
+                    queue.append(u)
+        
+        dead = bytearray(graph.n)
+        for v in range(n_nodes):
+            if not live[v] and (model.nodes[v].is_component or graph.in_degree(v) or graph.out_degree(v)):
+                dead[v] = 1
+        
+        def cost_of(node):
+            if timings is not None:
+                return timings.get(node.guid)
+            return node.get('time_ms')
+        
+        # Weakly connected pieces of the dead nodes, each deletable as a unit
+        subgraphs = []
+        timed = False
+        seen = bytearray(graph.n)
+        for start in range(n_nodes):
+            if not dead[start] or seen[start]:
+                continue
+            seen[start] = 1
+            piece = [start]
+            for v in piece:
+                for u in itertools.chain(graph.predecessors(v), graph.successors(v)):
+                    if dead[u] and not seen[u]:
+                        seen[u] = 1
+                        piece.append(u)
+            piece.sort()
+            nodes = [model.nodes[v] for v in piece]
+            costs = [c for c in (cost_of(node) for node in nodes) if c is not None]
+            timed = timed or bool(costs)
+            subgraphs.append({
+                "components": [node.name for node in nodes],
+                "guids": [node.guid for node in nodes],
+                "size": len(nodes),
+                "cost_ms": round(sum(costs), 3) if costs else None,
+                "pos": nodes[0].pos
+            })
+        subgraphs.sort(key=lambda s: (s["cost_ms"] or 0.0, s["size"]), reverse=True)
+        
+        dead_components = sum(1 for v in range(model.n_components) if dead[v])
+        return {
+            "sinks": sinks,
+            "live": sum(live[:n_nodes]),
+            "dead_components": dead_components,
+            "dead_params": sum(dead) - dead_components,
+            "cost_ms": round(sum(s["cost_ms"] or 0.0 for s in subgraphs), 3) if timed else None,
+            "subgraphs": subgraphs
+        }
+    
+    def find_deep_chains(self, min_depth: int = 10, max_paths: int = 10) -> Dict[str, Any]:
+        """Longest component chain ending at each sink, plus any wire cycles
+        
+        One Kahn pass over the wire graph: a chain's depth counts the
+        components on it (params pass through without adding depth). Sinks
+        whose chain reaches ``min_depth`` are returned deepest first; the
+        first ``max_paths`` carry their path (rebuilding every path would
+        cost O(V * depth)). Nodes that never become ready are on or behind a cycle;
+        each cycle found among them is reported instead of being walked.
+        When following a previous revision depths are patched downstream
+        of the change (see ``_chain_depths``).
+        """
+        model = self.model
+        graph = self.graph
+        depth, parent, leftover = self._chain_depths()
+        
+        def describe(v):
+            node = model.nodes[v] if v < model.n_nodes else None
+            return {"component": node.name if node else None, "guid": model.guids[v]}
+        
+        def chain_item(v):
+            return {**describe(v), "depth": int(depth[v]), "pos": model.nodes[v].pos}
+        
+        previous = self._previous._deep_chains if self._depth_changes is not None else None
+        if previous is not None and previous[0] == min_depth:
+            # Drop the items of nodes whose depth, data, position or wires
+            # changed, then slot the deep sinks among them back in
+            diff, node_ids = self._diff, model.node_ids
+            stale = set(map(model.guids.__getitem__, self._depth_changes)) | diff.touched | diff.removed
+            chains = list(compress(previous[1], map(not_, map(stale.__contains__, map(itemgetter("guid"),
+                                                                                      previous[1])))))
+            for v in sorted(v for v in map(node_ids.get, stale, repeat(model.n_nodes)) if v < model.n_nodes):
+                if not graph.out_degree(v) and not leftover[v] and depth[v] >= min_depth:
+                    chains.insert(bisect_left(chains, (-depth[v], v),
+                                              key=lambda item: (-item["depth"], node_ids[item["guid"]])),
+                                  chain_item(v))
+            sinks = graph.sinks()
+            max_depth = chains[0]["depth"] if chains else int(max(compress(
+                map(depth.__getitem__, sinks), map(not_, map(leftover.__getitem__, sinks))), default=0))
+        else:
+            ranked = []
+            max_depth = 0
+            for v in graph.sinks():
+                if leftover[v]:
+                    continue
+                chain_depth = int(depth[v])
+                max_depth = max(max_depth, chain_depth)
+                if chain_depth >= min_depth:
+                    ranked.append((chain_depth, v))
+            ranked.sort(key=lambda c: c[0], reverse=True)
+            chains = [chain_item(v) for _, v in ranked]
+        self._deep_chains = (min_depth, chains)
+        
+        # Only the deepest chains carry their path, built afresh on copies
+        items = [dict(item, path=[describe(u)["component"]
+                                  for u in graph.path_to(parent, model.node_ids[item["guid"]])])
+                 for item in chains[:max_paths]]
+        items.extend(itertools.islice(chains, max_paths, None))
+        
+        return {
+            "max_depth": max_depth,
+            "chains": items,
+            "cycles": [[describe(v) for v in cycle] for cycle in graph.find_cycles(leftover)]
+        }
+    
+    def _chain_depths(self) -> Tuple[array, array, bytearray]:
+        """``longest_paths`` with components weighing 1 and params 0
+        
+        Following a previous revision, its depths carry over and only
+        rewired, added and changed nodes take the deepest of their sources
+        again, then their successors while depths keep changing (as in
+        ``TreeOperations.update``). A full pass is run instead when wires
+        were reordered or nodes on or behind a cycle are involved.
+        """
+        model, graph = self.model, self.graph
+        n_components = model.n_components
+        leftover = graph.leftover()
+        previous, diff = self._previous, self._diff
+        if previous is not None and previous._depths is not None and not diff.reordered:
+            old_leftover = array('b', previous.graph.leftover())
+            if diff.carry(old_leftover).tobytes() == leftover:
+                old_depth, old_parent = previous._depths
+                depth = diff.carry(old_depth, 0.0)
+                parent = diff.carry(old_parent, -1, ids=True)
+                node_ids, wire_src = model.node_ids, model.wire_src
+                # A removed component still named by a wire stops weighing 1
+                queue = deque(node_ids[guid] for guid in itertools.chain(diff.rewired, diff.added, diff.changed,
+                                                                         diff.removed)
+                              if guid in node_ids)
+                changes = set()
+                while queue:
+                    v = queue.popleft()
+                    if leftover[v]:
+                        break
+                    best, best_parent = 0.0, -1
+                    for w in graph.in_edges(v):
+                        u = wire_src[w]
+                        if depth[u] > best:
+                            best, best_parent = depth[u], u
+                    parent[v] = best_parent
+                    value = best + (v < n_components)
+                    if value != depth[v]:
+                        depth[v] = value
+                        changes.add(v)
+                        queue.extend(graph.successors(v))
+                else:
+                    self._depths = depth, parent
+                    self._depth_changes = changes
+                    return depth, parent, leftover
+        weights = [1.0] * n_components + [0.0] * (graph.n - n_components)
+        depth, parent, leftover = graph.longest_paths(weights)
+        self._depths = depth, parent
+        return depth, parent, leftover
+    
+    def find_critical_path(self, timings: Optional[Dict[str, float]] = None,
+                           top: int = 20) -> Dict[str, Any]:
+        """Solve-time critical path: the heaviest timed chain through the wire graph
+        
+        Node weights are milliseconds from ``timings`` (guid -> ms), else a
+        document-level ``timings`` map, else each object's exported
+        ``time_ms``; untimed nodes weigh 0. ``critical_ms`` bounds the solve
+        when independent branches run in parallel, ``serial_ms`` is the
+        single-threaded total. Every timed node gets its slack: how much
+        slower it could get before it lengthens the critical path. The
+        ``top`` timed nodes with the least slack are returned.
+        """
+        model = self.model
+        graph = self.graph
+        if timings is None:
+            timings = self.data.get('timings')
+        if timings is not None:
+            costs = [timings.get(guid) for guid in model.guids]
+        else:
+            costs = [node.get('time_ms') for node in model.nodes]
+            costs.extend([None] * (graph.n - model.n_nodes))
+        timed = [v for v in range(model.n_nodes) if costs[v] is not None]
+        weights = array('d', (c or 0.0 for c in costs))
+        
+        path, finish, slack, leftover = graph.critical_path(weights)
+        total = max(finish) if graph.n else 0.0
+        
+        def describe(v):
+            node = model.nodes[v] if v < model.n_nodes else None
+            return {
+                "component": node.name if node else None,
+                "guid": model.guids[v],
+                "time_ms": round(weights[v], 3)
+            }
+        
+        ranked = sorted((v for v in timed if not leftover[v]),
+                        key=lambda v: (slack[v], -weights[v]))
+        nodes = []
+        for v in ranked[:top]:
+            item = describe(v)
+            item["finish_ms"] = round(finish[v], 3)
+            item["slack_ms"] = round(slack[v], 3)
+            item["critical"] = slack[v] <= 1e-9 * max(total, 1.0)
+            nodes.append(item)
+        
+        return {
+            "timed_objects": len(timed),
+            "critical_ms": round(total, 3),
+            "serial_ms": round(sum(weights[:model.n_nodes]), 3),
+            "critical_path": [describe(v) for v in path],
+            "nodes": nodes,
+            "untimed_cycle_nodes": sum(leftover[:model.n_nodes])
+        }
+    
+    def find_duplicate_chains(self, min_components: int = 3, rounds: int = 6,
+                              deadline: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Find repeated component chains that could become one cluster
+        
+        Each node starts from a label of its type and port counts, then
+        ``rounds`` of Weisfeiler-Lehman refinement fold in the labels of
+        its upstream neighbours and the ports they are wired through:
+        O(rounds * (V + E)). Components sharing a label at round ``r`` head
+        identical upstream chains ``r`` wires deep. Each component is
+        grouped at the deepest round it still has a twin; groups whose
+        chain holds at least ``min_components`` components are reported
+        deepest first, skipping groups already covered by a reported chain.
+        
+        Past ``deadline`` (a ``perf_counter`` value) refinement and grouping
+        stop where they are and the chains found so far are returned.
+        
+        Chains read no positions, so after a diff that only moved nodes
+        the previous revision's result and state carry over as they are.
+        Otherwise, when following a previous revision, only nodes within ``rounds``
+        wires downstream of a change are relabelled, and groups at round
+        ``r`` whose roots all lie more than ``r`` wires below any change
+        reuse the chains found last time.
+        """
+        previous = self._previous
+        if previous is not None and self._diff.moves_only and previous._chain_result is not None \
+                and previous._chain_result[0] == (min_components, rounds):
+            self._labels, self._chain_classes = previous._labels, previous._chain_classes
+            for name in ("_chain_groups", "_chain_items", "_chain_ranks", "_chain_reach"):
+                setattr(self, name, dict(getattr(previous, name)))
+            self._chain_result = previous._chain_result
+            return list(self._chain_result[1])
+        model = self.model
+        graph = self.graph
+        
+        labels, dirty = self._chain_labels(rounds, deadline)
+        previous_groups = self._previous._chain_groups if dirty is not None else {}
+        # Upstream chains by root guid (not kept when guids repeat), carried
+        # over except where a change is within reach: ``r`` wires up
+        if dirty is not None and self._previous._chain_reach is not None:
+            reach = self._chain_reach = dict(self._previous._chain_reach)
+            for v, hops in dirty.items():
+                guid = model.guids[v]
+                for r in range(max(hops, 1), len(labels)):
+                    reach.pop((guid, r), None)
+        else:
+            self._chain_reach = {} if len(model.node_ids) == model.n_ids else None
+        
+        # Groups in the order of their heads; roots are guids unless guids repeat
+        unique = self._chain_reach is not None
+        groups = self._chain_roots(labels, dirty, unique)
+        
+        # Longest chains first: a root's chain is as deep as the round allows
+        # and its upstream actually goes (unchanged outside the relabelled cone)
+        leftover = graph.leftover()
+        depths = {}
+        node_ids, guids = model.node_ids, model.guids
+        root_id = node_ids.__getitem__ if unique else int
+        previous_ranks, ranks = self._previous._chain_ranks if dirty is not None else {}, self._chain_ranks
+        
+        def chain_rank(group):
+            _, (r, _), roots = group
+            v = root_id(roots[0])
+            if leftover[v]:
+                return 0, len(roots)
+            key = (guids[v], r)
+            depth = None if dirty is None or dirty.get(v, r + 1) <= r else previous_ranks.get(key)
+            if depth is None:
+                depth = graph.upstream_depth(v, r, depths)
+            ranks[key] = depth
+            return depth, len(roots)
+        
+        duplicates = []
+        covered = set()
+        previous_items = self._previous._chain_items if dirty is not None else {}
+        dirty_roots = dict(zip(map(guids.__getitem__, dirty), dirty.values())) if dirty is not None and unique \
+            else dirty
+        complete = True
+        for _, (r, _), roots in sorted(groups, key=chain_rank, reverse=True):
+            if deadline is not None and perf_counter() > deadline:
+                complete = False
+                break
+            root_guids = tuple(roots) if unique else tuple(map(guids.__getitem__, roots))
+            if covered.issuperset(root_guids):
+                continue
+            key = (r, root_guids)
+            unchanged = dirty is not None and min(map(dirty_roots.get, roots, repeat(r + 1))) > r
+            found = previous_groups.get(key) if unchanged else None
+            item = previous_items.get(key) if found is not None else None
+            if found is None:
+                found = self._chain_group(roots, r)
+            self._chain_groups[key] = found
+            if not found:
+                continue
+            chains, size, chain_components = found
+            if chain_components < min_components:
+                continue
+            for chain in chains:
+                covered.update(chain)
+            if item is None:
+                instances = len(chains)
+                root = model.nodes[node_ids[chains[0][0]]]
+                # N copies of the chain become one cluster definition plus N instances
+                objects_saved = instances * size - size - instances
+                item = {
+                    "component": root.name,
+                    "type": root.type,
+                    "instances": instances,
+                    "chain_size": size,
+                    "chain_components": chain_components,
+                    "guids": [list(chain) for chain in chains],
+                    "objects_saved": max(objects_saved, 0),
+                    "estimated_saving_bytes": max(objects_saved, 0) * OBJECT_BYTES_ESTIMATE
+                }
+            self._chain_items[key] = item
+            duplicates.append(item)
+        
+        duplicates.sort(key=lambda d: d["estimated_saving_bytes"], reverse=True)
+        if complete:
+            self._chain_result = ((min_components, rounds), duplicates)
+        return list(duplicates)
+    
+    @staticmethod
+    def _kind(node) -> Tuple:
+        """Initial refinement label key: type and port counts"""
+        return (node.type or node.name, node.param_kind, len(node.inputs or ()), len(node.outputs or ()))
+    
+    @staticmethod
+    def _splitting_rounds(labels: List[array]) -> List[array]:
+        """``labels`` up to the first round that no longer splits any class"""
+        classes = len(set(labels[0]))
+        for r in range(1, len(labels)):
+            split = len(set(labels[r]))
+            if split == classes:
+                return labels[:r]
+            classes = split
+        return labels
+    
+    @staticmethod
+    def _repeat_stable(refined: List[array], labels: List[array], rounds: int) -> List[array]:
+        """``refined`` repeated up to ``rounds`` when refinement stopped on a stable partition
+        
+        Every later round would group the nodes the same way, so copies
+        identical that deep stay grouped at every depth (two untouched
+        copies of a chain never split and would otherwise not be grouped).
+        """
+        if len(refined) < len(labels):
+            return refined + [refined[-1]] * (rounds + 1 - len(refined))
+        return refined
+    
+    def _chain_labels(self, rounds: int, deadline: Optional[float]):
+        """Refinement labels for ``find_duplicate_chains``, and the ids relabelled since the previous revision
+        
+        Labels come from signature tables kept across revisions, so a
+        following analyzer relabels only the nodes within the refined
+        depth downstream of a structural change (the second value, by
+        wires from the nearest change; None when everything was labelled
+        afresh).
+        """
+        model, graph = self.model, self.graph
+        state = self._previous._labels if self._previous is not None else None
+        if state is not None and state[0] == rounds and not self._diff.reordered:
+            _, kinds, tables, old_labels = state
+            diff = self._diff
+            node_ids = model.node_ids
+            labels = [diff.carry(old) for old in old_labels]
+            seeds = [node_ids[guid] for guid in itertools.chain(diff.added, diff.changed, diff.removed, diff.rewired)
+                     if guid in node_ids]
+            dirty = graph.downstream_within(seeds, len(labels) - 1)
+            unresolved = kinds.setdefault(None, len(kinds))
+            for v in dirty:
+                labels[0][v] = kinds.setdefault(self._kind(model.nodes[v]), len(kinds)) \
+                    if v < model.n_nodes else unresolved
+            graph.relabel(labels, tables, dirty)
+            refined = self._splitting_rounds(labels)
+            # A stored final round that now splits means refinement would go deeper than last time
+            if len(refined) < len(labels) or len(labels) > rounds:
+                self._labels = (rounds, kinds, tables, labels)
+                return self._repeat_stable(refined, labels, rounds), dirty
+        
+        kinds = {}
+        initial = [kinds.setdefault(self._kind(node), len(kinds)) for node in model.nodes]
+        initial.extend([kinds.setdefault(None, len(kinds))] * (graph.n - model.n_nodes))  # unresolved endpoints
+        tables = []
+        labels = graph.neighborhood_labels(initial, rounds, deadline, tables)
+        if deadline is None or perf_counter() <= deadline:
+            self._labels = (rounds, kinds, tables, labels)
+        return self._repeat_stable(self._splitting_rounds(labels), labels, rounds), None
+    
+    def _chain_roots(self, labels: List[array], dirty: Optional[Dict[int, int]], unique: bool) -> List[Tuple]:
+        """Groups for ``find_duplicate_chains``: (head id, (round, label), roots), by head id
+        
+        A group is every component sharing a label at a round where one of
+        them, the head (the first in id order), shares it for the last
+        time: refinement only splits classes, so that is where its class at
+        the next round holds it alone. Roots are guids in id order (ids when
+        guids repeat).
+        
+        Components are kept by label per distinct round and groups by
+        (round, label), so a following analyzer carries both over and
+        revisits only the classes its relabelled ids (``dirty``) and removed
+        components leave or join, and the groups around them.
+        """
+        model = self.model
+        n_components, guids, node_ids = model.n_components, model.guids, model.node_ids
+        key_id = node_ids.__getitem__ if unique else int
+        last = len(labels) - 1
+        # Position of each round's label array among the distinct ones (repeated rounds share one)
+        distinct = {}
+        shape = tuple(distinct.setdefault(id(labels[r]), len(distinct)) for r in range(len(labels)))
+        
+        def head(r, members):
+            if len(members) < 2:
+                return None
+            if r == last:
+                return members[0]
+            following, label = classes[shape[r + 1]], labels[r + 1]
+            for m in members:
+                if len(following[label[key_id(m)]]) == 1:
+                    return m
+            return None
+        
+        state = self._previous._chain_classes if dirty is not None and unique else None
+        if state is None or state[0] != shape:
+            keys = guids[:n_components] if unique else range(n_components)
+            classes = []
+            for k in range(len(distinct)):
+                members = {}
+                for m, label in zip(keys, labels[shape.index(k)]):
+                    members.setdefault(label, []).append(m)
+                classes.append(members)
+            index = {}
+            for r in range(1, len(labels)):
+                members = classes[shape[r]]
+                for label in compress(members, map(lt, repeat(1), map(len, members.values()))):
+                    first = head(r, members[label])
+                    if first is not None:
+                        index[(r, label)] = first
+        else:
+            _, old_labels, old_classes, old_index = state
+            old_model = self._previous.model
+            old_ids, n_old_components = old_model.node_ids, old_model.n_components
+            # (guid, old id or None, new id or None) of every component left, joined or relabelled
+            removed = self._diff.removed
+            moved = [(guid, old_ids[guid], None) for guid in removed if old_ids[guid] < n_old_components]
+            for v in dirty:
+                guid = guids[v]
+                # A removed component still named by a wire lingers as an unresolved endpoint
+                if guid in removed:
+                    continue
+                u = old_ids.get(guid)
+                if u is not None and u >= n_old_components:
+                    u = None
+                if u is not None or v < n_components:
+                    moved.append((guid, u, v if v < n_components else None))
+            classes = [dict(members) for members in old_classes]
+            index = dict(old_index)
+            touched = set()
+            for k, members in enumerate(classes):
+                r = shape.index(k)
+                old_label, label = old_labels[r], labels[r]
+                copied = set()
+                
+                def class_of(key):
+                    if key not in copied:
+                        copied.add(key)
+                        members[key] = list(members.get(key, ()))
+                    return members[key]
+                
+                changes = [(guid, old_label[u] if u is not None else None, label[v] if v is not None else None)
+                           for guid, u, v in moved]
+                changes = [change for change in changes if change[1] != change[2]]
+                # Leave first: classes may still hold removed guids, which have no new id
+                for guid, before, _ in changes:
+                    if before is not None:
+                        class_of(before).remove(guid)
+                for guid, _, after in changes:
+                    if after is not None:
+                        insort(class_of(after), guid, key=node_ids.__getitem__)
+                for key in copied:
+                    if not members[key]:
+                        del members[key]
+            for r in range(1, len(labels)):
+                for _, u, v in moved:
+                    if u is not None:
+                        touched.add((r, old_labels[r][u]))
+                    if v is not None:
+                        touched.add((r, labels[r][v]))
+            for r, label in touched:
+                first = head(r, classes[shape[r]].get(label, ()))
+                if first is None:
+                    index.pop((r, label), None)
+                else:
+                    index[(r, label)] = first
+        self._chain_classes = (shape, labels, classes, index)
+        groups = [(key_id(first), key, classes[shape[key[0]]][key[1]]) for key, first in index.items()]
+        groups.sort(key=itemgetter(0))
+        return groups
+    
+    def _chain_group(self, roots: List, r: int):
+        """Copies of the ``r``-deep chain above each root, as guid lists, with
+        their smallest size and component count; () when fewer than two
+        
+        Roots and chains are worked on as guids, chains kept per root in
+        ``_chain_reach``, unless guids repeat (then as ids).
+        """
+        graph, model = self.graph, self.model
+        n_nodes, n_components = model.n_nodes, model.n_components
+        guids, node_ids, reach = model.guids, model.node_ids, self._chain_reach
+        unique = reach is not None
+        reached = []
+        for root in roots:
+            chain = reach.get((root, r)) if unique else None
+            if chain is None:
+                chain = graph.upstream_within(node_ids[root] if unique else root, r)
+                chain = list(compress(chain, map(lt, chain, repeat(n_nodes))))
+                if unique:
+                    chain = reach[(root, r)] = list(map(guids.__getitem__, chain))
+            reached.append(chain)
+        heads = roots
+        # Nodes reached from several roots are shared inputs and stay outside
+        # the cluster; a root inside another copy's chain is not a copy
+        multiplicity = Counter(itertools.chain.from_iterable(reached))
+        chains = [list(compress(chain, map(eq, map(multiplicity.__getitem__, chain), repeat(1)))) for chain in reached]
+        chains = [chain for chain, head in zip(chains, heads) if chain and chain[0] == head]
+        if len(chains) < 2:
+            return ()
+        size = min(map(len, chains))
+        ids = (lambda chain: map(node_ids.__getitem__, chain)) if unique else iter
+        chain_components = min(sum(map(lt, ids(chain), repeat(n_components))) for chain in chains)
+        if not unique:
+            chains = [list(map(guids.__getitem__, chain)) for chain in chains]
+        return chains, size, chain_components
+    
+    def find_tree_operations(self, min_chain_operations: int = 3) -> Dict[str, Any]:
+        """Data-tree churn and mixed tree access, in one topological pass
+        
+        See ``TreeOperations`` for how chains and hotspots are found and
+        ``MixedAccess`` for mixed access wires.
+        """
+        tree, mixed = self.run_passes(TreeOperations(min_chain_operations), MixedAccess())
+        return dict(tree, mixed_access_wires=mixed)
+    
+    def find_wire_crossings(self, long_percentile: float = 95.0,
+                            long_median_ratio: float = 3.0,
+                            deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Crossing count and length of every wire drawn between node pivots
+        
+        Crossings come from a grid-bucketed segment pass (see
+        ``segment_crossings``). A wire is long when its length is at or
+        above the ``long_percentile`` length and at least
+        ``long_median_ratio`` times the median, so evenly laid out canvases
+        flag nothing. Wires to unresolved endpoints have no position and
+        are skipped. Past ``deadline`` crossing counts stop growing (see
+        ``segment_crossings``); lengths are always complete. When following
+        a previous revision only wires that were redrawn are re-tested, and
+        only their entries in the flagged list are rebuilt.
+        """
+        state = self._patch_crossings(long_percentile, long_median_ratio)
+        if state is None:
+            state = self._wire_crossings(long_percentile, long_median_ratio, deadline)
+            if deadline is None or perf_counter() <= deadline:
+                self._crossings = state
+        else:
+            self._crossings = state
+        return {
+            "total_crossings": state.total,
+            "wires_checked": state.resolved.count(1),
+            "long_threshold": round(state.threshold, 1),
+            "wires": state.flagged
+        }
+    
+    def _wire_geometry(self, wires: Optional[List[int]] = None) -> Tuple:
+        """Per wire (or per wire in ``wires``): whether both ends are nodes,
+        the end coordinates (zero off the nodes) and the length"""
+        model = self.model
+        n_nodes = model.n_nodes
+        wire_src, wire_dst = model.wire_src, model.wire_dst
+        if wires is not None:
+            wire_src = array('i', map(wire_src.__getitem__, wires))
+            wire_dst = array('i', map(wire_dst.__getitem__, wires))
+        resolved = bytearray(map(and_, map(lt, wire_src, repeat(n_nodes)), map(lt, wire_dst, repeat(n_nodes))))
+        # Unresolved endpoint ids come after the nodes
+        padding = array('d', bytes(8 * (model.n_ids - n_nodes)))
+        xs, ys = model.xs + padding, model.ys + padding
+        xa, ya = array('d', map(xs.__getitem__, wire_src)), array('d', map(ys.__getitem__, wire_src))
+        xb, yb = array('d', map(xs.__getitem__, wire_dst)), array('d', map(ys.__getitem__, wire_dst))
+        lengths = array('d', map(math.hypot, map(sub, xb, xa), map(sub, yb, ya)))
+        return resolved, xa, ya, xb, yb, lengths
+    
+    @staticmethod
+    def _long_threshold(ordered: List[float], long_percentile: float, long_median_ratio: float) -> float:
+        return max(percentile(ordered, long_percentile), percentile(ordered, 50.0) * long_median_ratio)
+    
+    def _crossing_item(self, state: "WireCrossings", w: int) -> Optional[Dict[str, Any]]:
+        """Flagged-list entry of wire ``w``, or None when it is neither crossed nor long"""
+        is_long = state.lengths[w] >= state.threshold > 0
+        if not (state.counts[w] or is_long):
+            return None
+        model = self.model
+        u, v = model.wire_src[w], model.wire_dst[w]
+        return {
+            "from": model.nodes[u].name,
+            "to": model.nodes[v].name,
+            "from_guid": model.guids[u],
+            "to_guid": model.guids[v],
+            "wire": w,
+            "crossings": state.counts[w],
+            "length": round(state.lengths[w], 1),
+            "long": is_long
+        }
+    
+    def _wire_crossings(self, long_percentile: float, long_median_ratio: float,
+                        deadline: Optional[float]) -> "WireCrossings":
+        model = self.model
+        state = WireCrossings(self._wire_geometry(), long_percentile, long_median_ratio)
+        wires = list(compress(range(model.n_wires), state.resolved))
+        state.ordered = sorted(compress(state.lengths, state.resolved))
+        cell_size = median_cell_size(state.ordered) if state.ordered else 1.0
+        state.grid = SegmentGrid.build(state.xa, state.ya, state.xb, state.yb, cell_size, wires)
+        state.counts, state.total = segment_crossings(state.xa, state.ya, state.xb, state.yb, model.wire_src,
+                                                      model.wire_dst, cell_size, deadline, state.grid)
+        state.threshold = self._long_threshold(state.ordered, long_percentile, long_median_ratio)
+        items = state.items = [None] * model.n_wires
+        for w in wires:
+            items[w] = self._crossing_item(state, w)
+        state.flagged = sorted(filter(None, items), key=_crossing_order)
+        return state
+    
+    def _patch_crossings(self, long_percentile: float,
+                         long_median_ratio: float) -> Optional["WireCrossings"]:
+        """The previous revision's crossings brought up to date, or None
+        
+        Columns of the wires present in both revisions carry over a run at
+        a time. Wires added since, or at a node that moved, appeared or
+        went, are redrawn: the old crossings of the redrawn old wires are
+        taken back and those of the redrawn new wires counted afresh, both
+        through the previous revision's segment grid. Sorted lengths and
+        flagged-list entries are patched the same way. None when there is
+        nothing to start from or so much changed that a full pass is cheaper.
+        """
+        previous, diff = self._previous, self._diff
+        if previous is None or previous._crossings is None or diff.reordered:
+            return None
+        old, old_model, model = previous._crossings, previous.model, self.model
+        graph, old_graph = self.graph, previous.graph
+        n = model.n_wires
+        wire_map, wire_origin = diff.wire_map, diff.wire_origin
+        # Redrawn wires, old and new; a wire kept but redrawn on one side is on the other too
+        gone, drawn = set(diff.wires_removed_at), set(diff.wires_added_at)
+        for u in map(old_model.node_ids.__getitem__, diff.moved | diff.removed):
+            gone.update(old_graph.in_edges(u), old_graph.out_edges(u))
+        for v in map(model.node_ids.__getitem__, diff.moved | diff.added):
+            drawn.update(graph.in_edges(v), graph.out_edges(v))
+        drawn.update(filter((0).__le__, map(wire_map.__getitem__, gone)))
+        gone.update(filter((0).__le__, map(wire_origin.__getitem__, drawn)))
+        if len(gone) + len(drawn) > n // 4 + 16:
+            return None
+        
+        carry = diff.carry_wires
+        state = WireCrossings((carry(old.resolved), carry(old.xa, 0.0), carry(old.ya, 0.0), carry(old.xb, 0.0),
+                               carry(old.yb, 0.0), carry(old.lengths, 0.0)), long_percentile, long_median_ratio)
+        redrawn = sorted(drawn)
+        columns = (state.resolved, state.xa, state.ya, state.xb, state.yb, state.lengths)
+        for column, values in zip(columns, self._wire_geometry(redrawn)):
+            for w, value in zip(redrawn, values):
+                column[w] = value
+        moves = array('i', wire_map)
+        for w in gone:
+            moves[w] = -1
+        gone = sorted(w for w in gone if old.resolved[w])
+        drawn = [w for w in redrawn if state.resolved[w]]
+        
+        counts = state.counts = carry(old.counts)
+        for w in redrawn:
+            counts[w] = 0
+        grid = old.grid.follow(moves, drawn, state.xa, state.ya, state.xb, state.yb)
+        if grid.drawn > n // 4 + 16:
+            grid = SegmentGrid.build(state.xa, state.ya, state.xb, state.yb, grid.cell_size,
+                                     list(compress(range(n), state.resolved)))
+        state.grid = grid
+        cell_size = grid.cell_size
+        recounted = set()
+        for _, w in count_crossings(old.xa, old.ya, old.xb, old.yb, old_model.wire_src, old_model.wire_dst,
+                                    gone, cell_size, old.grid):
+            if moves[w] >= 0:
+                counts[moves[w]] -= 1
+                recounted.add(moves[w])
+        for w, other in count_crossings(state.xa, state.ya, state.xb, state.yb, model.wire_src, model.wire_dst,
+                                        drawn, cell_size, grid):
+            counts[w] += 1
+            counts[other] += 1
+            recounted.add(other)
+        state.total = sum(counts) // 2
+        
+        ordered = state.ordered = list(old.ordered)
+        for w in gone:
+            del ordered[bisect_left(ordered, old.lengths[w])]
+        for w in drawn:
+            insort(ordered, state.lengths[w])
+        state.threshold = self._long_threshold(ordered, long_percentile, long_median_ratio)
+        
+        # Entries to rebuild: redrawn or recounted wires, wires whose long
+        # flag flipped with the threshold and wires into or out of changed nodes
+        dirty = recounted.union(drawn)
+        if (old.long_percentile, old.long_median_ratio) != (long_percentile, long_median_ratio):
+            dirty.update(range(n))
+        elif state.threshold != old.threshold:
+            low, high = sorted((old.threshold, state.threshold))
+            # Only a length from the lower threshold up to the higher one flips
+            if low <= 0 or bisect_left(ordered, high) > bisect_left(ordered, low):
+                dirty.update(compress(range(n), map(ne, _long_flags(state.lengths, old.threshold),
+                                                    _long_flags(state.lengths, state.threshold))))
+        for v in map(model.node_ids.__getitem__, diff.changed):
+            dirty.update(graph.in_edges(v), graph.out_edges(v))
+        
+        items = state.items = carry(old.items, None)
+        for w in redrawn:
+            items[w] = None
+        # Old entries dropped from the flagged list, and by id the ones replaced or dropped
+        stale = [old.items[w] for w in gone if old.items[w] is not None]
+        replaced = dict.fromkeys(map(id, stale))
+        shifted = False
+        # Entries of wires whose index shifted get a copy with the new index
+        for start, length in diff.shifted_wires():
+            shifted = True
+            stop = start + length
+            before = items[start:stop]
+            kept = compress(range(start, stop), before)
+            entries = list(filter(None, before))
+            replaced.update(zip(map(id, entries), map(or_, entries, map(dict.fromkeys, repeat(("wire",)), kept))))
+            items[start:stop] = map(replaced.get, map(id, before), before)
+        added = []
+        for w in dirty:
+            if not state.resolved[w]:
+                continue
+            before = old.items[wire_origin[w]] if wire_origin[w] >= 0 else None
+            if before is not None:
+                replaced[id(before)] = None
+                stale.append(before)
+            items[w] = self._crossing_item(state, w)
+            if items[w] is not None:
+                added.append(items[w])
+        if shifted or len(stale) * 16 > len(old.flagged):
+            flagged = list(filter(None, map(replaced.get, map(id, old.flagged), old.flagged)))
+        else:
+            # Few entries go: find them by their sort key and copy the slices between
+            flagged, start = [], 0
+            for position in sorted({bisect_left(old.flagged, _crossing_order(item), key=_crossing_order)
+                                    for item in stale}):
+                flagged += old.flagged[start:position]
+                start = position + 1
+            flagged += old.flagged[start:]
+        state.flagged = flagged
+        # Inserting one by one costs O(log n) key calls each, re-sorting O(n)
+        if len(added) * 16 > len(flagged):
+            flagged.extend(added)
+            flagged.sort(key=_crossing_order)
+        else:
+            for item in added:
+                insort(flagged, item, key=_crossing_order)
+        return state
+    
+    def _spatial_item(self, v: int) -> Dict[str, Any]:
+        node = self.model.nodes[v]
+        return {
+            "component": node.name,
+            "guid": node.guid,
+            "pos": node.pos,
+            "bounds": node.get('bounds')
+        }
+    
+    def find_objects_in_region(self, min_x: float, min_y: float,
+                               max_x: float, max_y: float) -> List[Dict[str, Any]]:
+        """Components and params whose boxes intersect a canvas rectangle"""
+        return [self._spatial_item(v)
+                for v in self.spatial_index.query_range(min_x, min_y, max_x, max_y)]
+    
+    def find_nearest_objects(self, x: float, y: float, k: int = 5) -> List[Dict[str, Any]]:
+        """The ``k`` components and params closest to a canvas point (box distance)"""
+        nearest = []
+        for distance, v in self.spatial_index.nearest(x, y, k):
+            item = self._spatial_item(v)
+            item["distance"] = round(distance, 1)
+            nearest.append(item)
+        return nearest
+    
+    def find_overlapping_components(self, min_area: float = 1.0) -> List[Dict[str, Any]]:
+        """Pairs of objects drawn on top of each other, largest overlap first
+        
+        Boxes that only touch, or overlap by less than ``min_area`` square
+        units, are ignored. Pairs where either box is estimated from the
+        pivot are marked ``estimated``.
+        """
+        index = self.spatial_index
+        nodes = self.model.nodes
+        overlaps = []
+        for a, b in index.overlapping_pairs():
+            width = min(index.max_x[a], index.max_x[b]) - max(index.min_x[a], index.min_x[b])
+            height = min(index.max_y[a], index.max_y[b]) - max(index.min_y[a], index.min_y[b])
+            area = width * height
+            if area < min_area:
+                continue
+            smaller = min((index.max_x[v] - index.min_x[v]) * (index.max_y[v] - index.min_y[v])
+                          for v in (a, b))
+            overlaps.append({
+                "components": [nodes[a].name, nodes[b].name],
+                "guids": [nodes[a].guid, nodes[b].guid],
+                "overlap_area": round(area, 1),
+                "overlap_ratio": round(area / smaller, 3) if smaller > 0 else 1.0,
+                "estimated": not (nodes[a].get('bounds') and nodes[b].get('bounds')),
+                "pos": nodes[a].pos
+            })
+        overlaps.sort(key=lambda o: o["overlap_area"], reverse=True)
+        return overlaps
+    
+    def find_internalized_data(self, top: int = 10) -> Dict[str, Any]:
+        """Internalized data totals and the largest carriers by decoded size
+        
+        Uses the per-object ``internalized`` byte counts recorded by the
+        GHX/GH parser; JSON exports carry none and report zero.
+        """
+        return self.run_passes(InternalizedData(top))[0]
     
     def get_plugin_usage(self) -> List[Dict[str, Any]]:
         """Get list of plugins/categories used"""
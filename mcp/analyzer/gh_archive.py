@@ -0,0 +1,286 @@
+"""
+Binary GH Archive Reader
+Reads compressed .gh files (GH_IO binary archives) without Grasshopper
+
+A .gh file is a raw-deflate stream of a GH_IO chunk tree written with .NET
+BinaryWriter semantics:
+
+    chunk := name:string  index:int32  item_count:int32  chunk_count:int32
+             item * item_count  chunk * chunk_count
+    item  := name:string  index:int32  type_code:int32  value
+
+The reader rebuilds the same element tree GH_IO writes to a .ghx file
+(``Archive`` / ``items`` / ``item`` / ``chunks`` / ``chunk``), so GHXParser
+can run on it unchanged.
+"""
+import base64
+import struct
+import zlib
+import uuid
+import decimal
+import xml.etree.ElementTree as ET
+from typing import Tuple
+
+
+TYPE_NAMES = {
+    1: "gh_bool",
+    2: "gh_byte",
+    3: "gh_int32",
+    4: "gh_int64",
+    5: "gh_single",
+    6: "gh_double",
+    7: "gh_decimal",
+    8: "gh_date",
+    9: "gh_guid",
+    10: "gh_string",
+    20: "gh_bytearray",
+    21: "gh_doublearray",
+    30: "gh_drawing_point",
+    31: "gh_drawing_pointf",
+    32: "gh_drawing_size",
+    33: "gh_drawing_sizef",
+    34: "gh_drawing_rectangle",
+    35: "gh_drawing_rectanglef",
+    36: "gh_drawing_color",
+    37: "gh_drawing_bitmap",
+    50: "gh_point2d",
+    51: "gh_point3d",
+    52: "gh_point4d",
+    60: "gh_interval1d",
+    61: "gh_interval2d",
+    70: "gh_line",
+    71: "gh_boundingbox",
+    72: "gh_plane",
+    80: "gh_version"
+}
+
+# Fixed-size values written as a struct and shown as named child elements
+_STRUCT_TYPES = {
+    30: ("<2i", ("X", "Y")),
+    31: ("<2f", ("X", "Y")),
+    32: ("<2i", ("W", "H")),
+    33: ("<2f", ("W", "H")),
+    34: ("<4i", ("X", "Y", "W", "H")),
+    35: ("<4f", ("X", "Y", "W", "H")),
+    50: ("<2d", ("X", "Y")),
+    51: ("<3d", ("X", "Y", "Z")),
+    52: ("<4d", ("X", "Y", "Z", "W")),
+    60: ("<2d", ("A", "B")),
+    61: ("<4d", ("UA", "UB", "VA", "VB")),
+    70: ("<6d", ("Ax", "Ay", "Az", "Bx", "By", "Bz")),
+    71: ("<6d", ("Minx", "Miny", "Minz", "Maxx", "Maxy", "Maxz")),
+    72: ("<9d", ("Ox", "Oy", "Oz", "Xx", "Xy", "Xz", "Yx", "Yy", "Yz")),
+    80: ("<3i", ("Major", "Minor", "Revision"))
+}
+
+# Single-value scalars: struct format
+_SCALAR_TYPES = {
+    2: "<B",
+    3: "<i",
+    4: "<q",
+    8: "<q"
+}
+
+
+# Compressed bytes read per step when only the header is wanted
+_HEADER_BLOCK_SIZE = 16 * 1024
+
+
+class GHArchiveError(ValueError):
+    """Raised when a .gh file is not a readable GH_IO binary archive"""
+
+
+def _format_double(value: float) -> str:
+    """Format a double the way GH_IO writes it (no trailing '.0')"""
+    text = repr(value)
+    return text[:-2] if text.endswith(".0") else text
+
+
+def _format_single(value: float) -> str:
+    """Format a float32 with the shortest text that round-trips"""
+    packed = struct.pack("<f", value)
+    for digits in range(1, 10):
+        text = "%.*g" % (digits, value)
+        if struct.pack("<f", float(text)) == packed:
+            return _format_double(float(text))
+    return repr(value)
+
+
+def _format_decimal(raw: bytes) -> str:
+    """Decode a .NET System.Decimal (lo, mid, hi, flags)"""
+    lo, mid, hi, flags = struct.unpack("<4i", raw)
+    mantissa = (lo & 0xFFFFFFFF) | ((mid & 0xFFFFFFFF) << 32) | ((hi & 0xFFFFFFFF) << 64)
+    scale = (flags >> 16) & 0xFF
+    value = decimal.Decimal(mantissa).scaleb(-scale)
+    if flags & 0x80000000:
+        value = -value
+    return str(value)
+
+
+class _StopReading(Exception):
+    """Internal signal: the chunk named by ``stop_at`` was reached"""
+
+
+class GHArchiveReader:
+    """Walk the chunks and items of a decompressed GH_IO binary archive
+
+    If ``stop_at`` names a chunk, reading ends when that chunk starts and the
+    tree read so far is returned (the stop chunk itself is left empty).
+    """
+
+    def __init__(self, payload: bytes, stop_at: str = None):
+        self.buf = memoryview(payload)
+        self.pos = 0
+        self.stop_at = stop_at
+
+    def _read(self, fmt: str) -> Tuple:
+        values = struct.unpack_from(fmt, self.buf, self.pos)
+        self.pos += struct.calcsize(fmt)
+        return values
+
+    def _read_int32(self) -> int:
+        value = struct.unpack_from("<i", self.buf, self.pos)[0]
+        self.pos += 4
+        return value
+
+    def _read_bytes(self, count: int) -> bytes:
+        if count < 0 or self.pos + count > len(self.buf):
+            raise GHArchiveError(f"Truncated archive at offset {self.pos}")
+        data = self.buf[self.pos:self.pos + count].tobytes()
+        self.pos += count
+        return data
+
+    def _read_string(self) -> str:
+        # .NET BinaryWriter: 7-bit encoded byte length, then UTF-8
+        length = 0
+        shift = 0
+        while True:
+            byte = self.buf[self.pos]
+            self.pos += 1
+            length |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        return self._read_bytes(length).decode("utf-8")
+
+    def read(self) -> ET.Element:
+        """Read the root chunk and return it as a GHX-shaped element tree"""
+        root = ET.Element("Archive")
+        try:
+            self._read_chunk_into(root)
+        except _StopReading:
+            pass
+        except (struct.error, IndexError, UnicodeDecodeError) as e:
+            raise GHArchiveError(f"Malformed archive at offset {self.pos}: {e}")
+        return root
+
+    def _read_chunk_into(self, elem: ET.Element):
+        elem.set("name", self._read_string())
+        if elem.get("name") == self.stop_at:
+            raise _StopReading()
+        index = self._read_int32()
+        if index >= 0:
+            elem.set("index", str(index))
+        item_count = self._read_int32()
+        chunk_count = self._read_int32()
+
+        if item_count:
+            items = ET.SubElement(elem, "items", count=str(item_count))
+            for _ in range(item_count):
+                self._read_item_into(ET.SubElement(items, "item"))
+
+        if chunk_count:
+            chunks = ET.SubElement(elem, "chunks", count=str(chunk_count))
+            for _ in range(chunk_count):
+                self._read_chunk_into(ET.SubElement(chunks, "chunk"))
+
+    def _read_item_into(self, item: ET.Element):
+        item.set("name", self._read_string())
+        index = self._read_int32()
+        if index >= 0:
+            item.set("index", str(index))
+        code = self._read_int32()
+        type_name = TYPE_NAMES.get(code)
+        if type_name is None:
+            raise GHArchiveError(f"Unknown item type code {code} for item '{item.get('name')}'")
+        item.set("type_name", type_name)
+        item.set("type_code", str(code))
+
+        if code in _SCALAR_TYPES:
+            item.text = str(self._read(_SCALAR_TYPES[code])[0])
+        elif code == 1:
+            item.text = "true" if self._read_bytes(1)[0] else "false"
+        elif code == 5:
+            item.text = _format_single(self._read("<f")[0])
+        elif code == 6:
+            item.text = _format_double(self._read("<d")[0])
+        elif code == 7:
+            item.text = _format_decimal(self._read_bytes(16))
+        elif code == 9:
+            item.text = str(uuid.UUID(bytes_le=self._read_bytes(16)))
+        elif code == 10:
+            item.text = self._read_string()
+        elif code == 20:
+            data = self._read_bytes(self._read_int32())
+            stream = ET.SubElement(item, "stream", length=str(len(data)))
+            stream.text = base64.b64encode(data).decode("ascii")
+        elif code == 21:
+            count = self._read_int32()
+            array = ET.SubElement(item, "array", count=str(count))
+            for i, value in enumerate(self._read(f"<{count}d")):
+                ET.SubElement(array, "item", index=str(i)).text = _format_double(value)
+        elif code == 36:
+            argb = self._read("<I")[0]
+            color = ET.SubElement(item, "ARGB")
+            color.text = ";".join(str((argb >> shift) & 0xFF) for shift in (24, 16, 8, 0))
+        elif code == 37:
+            data = self._read_bytes(self._read_int32())
+            bitmap = ET.SubElement(item, "bitmap", length=str(len(data)))
+            bitmap.text = base64.b64encode(data).decode("ascii")
+        else:
+            fmt, fields = _STRUCT_TYPES[code]
+            values = self._read(fmt)
+            for field, value in zip(fields, values):
+                if isinstance(value, float):
+                    text = _format_single(value) if "f" in fmt else _format_double(value)
+                else:
+                    text = str(value)
+                ET.SubElement(item, field).text = text
+
+
+def decompress_gh(data: bytes) -> bytes:
+    """Inflate the raw-deflate stream of a .gh file"""
+    try:
+        return zlib.decompress(data, -zlib.MAX_WBITS)
+    except zlib.error as e:
+        raise GHArchiveError(f"Not a GH binary archive: {e}")
+
+
+def read_gh_archive(gh_path: str, stop_at: str = None) -> ET.Element:
+    """Read a .gh file and return its GHX-shaped root element
+
+    With ``stop_at`` the file is inflated incrementally and only as far as
+    needed to reach that chunk, so header queries never inflate the objects.
+    """
+    if stop_at is None:
+        with open(gh_path, "rb") as f:
+            payload = decompress_gh(f.read())
+        return GHArchiveReader(payload).read()
+
+    inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+    payload = b""
+    block = _HEADER_BLOCK_SIZE
+    with open(gh_path, "rb") as f:
+        while True:
+            data = f.read(block)
+            try:
+                payload += inflater.decompress(data)
+            except zlib.error as e:
+                raise GHArchiveError(f"Not a GH binary archive: {e}")
+            at_end = not data or inflater.eof
+            try:
+                return GHArchiveReader(payload, stop_at=stop_at).read()
+            except GHArchiveError:
+                if at_end:
+                    raise
+            block *= 2
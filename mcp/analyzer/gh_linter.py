@@ -2,83 +2,147 @@
 Grasshopper Linter
 Applies lint rules to GH definition JSON
 """
+import itertools
 import json
-from typing import List, Dict, Any
-from .lint_rules import LINT_RULES, SEVERITY_LEVELS
+from typing import List, Dict, Any, Optional, Type
 from .gh_analyzer import GHAnalyzer
+from .model_diff import ModelDiff, diff_models
+from .rule_engine import LintRule, RULE_REGISTRY, register_rule, rule_definition, iter_issues, run_rules
+
+
+# GH014 fires for component chains at least this deep
+DEEP_NESTING_DEPTH = 10
+
+# GH009 flags wires crossing at least this many others (long wires are flagged by percentile)
+WIRE_CROSSING_THRESHOLD = 5
+LONG_WIRE_PERCENTILE = 95.0
+
+# GH019 fires when a definition's decoded internalized data exceeds this
+INTERNALIZED_DATA_THRESHOLD = 1024 * 1024
+
+# GH008 fires for chains carrying at least this many flatten/graft/simplify/flip operations
+TREE_OPERATIONS_THRESHOLD = 3
+
+# GH006 fires for more expression components than this
+EXPRESSION_THRESHOLD = 10
+
+# GH010 flags panels feeding other objects with more characters than this
+PANEL_TEXT_THRESHOLD = 1000
+
+# GH013 fires for more data dams than this
+DATA_DAM_THRESHOLD = 3
+
+# GH015 fires for definitions of at least this many components without a scribble
+COMMENT_MIN_COMPONENTS = 50
+
+# GH016/GH018 flag components solving at least this long (ms); GH017 at least this share of the total
+SLOW_COMPONENT_MS = 100.0
+HEAVY_PREVIEW_MS = 50.0
+BOTTLENECK_SHARE = 0.2
+
+# Wall-time budget per rule in ms; a rule past it is cut short and marked partial (None: no limit)
+RULE_BUDGET_MS = None
 
 
 class GHLinter:
     """Lints Grasshopper definitions against quality rules"""
     
+    deep_nesting_depth = DEEP_NESTING_DEPTH
+    wire_crossing_threshold = WIRE_CROSSING_THRESHOLD
+    long_wire_percentile = LONG_WIRE_PERCENTILE
+    internalized_data_threshold = INTERNALIZED_DATA_THRESHOLD
+    tree_operations_threshold = TREE_OPERATIONS_THRESHOLD
+    expression_threshold = EXPRESSION_THRESHOLD
+    panel_text_threshold = PANEL_TEXT_THRESHOLD
+    data_dam_threshold = DATA_DAM_THRESHOLD
+    comment_min_components = COMMENT_MIN_COMPONENTS
+    slow_component_ms = SLOW_COMPONENT_MS
+    heavy_preview_ms = HEAVY_PREVIEW_MS
+    bottleneck_share = BOTTLENECK_SHARE
+    rule_budget_ms = RULE_BUDGET_MS
+    
     def __init__(self, json_path: str):
         self.analyzer = GHAnalyzer(json_path)
-        self.issues = []
+        # None until a full lint has run (an empty list means no issues)
+        self.issues = None
+        self.rule_stats = []
+        self.rules = list(RULE_REGISTRY)
+        # Finished rule instances by class, for an incremental lint of the next revision
+        self._rule_state = {}
+    
+    @classmethod
+    def from_analyzer(cls, analyzer: GHAnalyzer) -> "GHLinter":
+        """Create a linter over an existing analyzer"""
+        linter = cls.__new__(cls)
+        linter.analyzer = analyzer
+        linter.issues = None
+        linter.rule_stats = []
+        linter.rules = list(RULE_REGISTRY)
+        linter._rule_state = {}
+        return linter
+    
+    def add_rule(self, rule_class: Type[LintRule]) -> Type[LintRule]:
+        """Run an extra rule on this linter only"""
+        if rule_class not in self.rules:
+            self.rules.append(rule_class)
+        return rule_class
+    
+    register_rule = staticmethod(register_rule)
+    
+    def select_rules(self, rule_ids: List[str]):
+        """Run only the rules with these ids (e.g. ``["GH001", "GH009"]``)"""
+        self.rules = [r for r in self.rules if rule_definition(r)['id'] in rule_ids]
     
     def lint_all(self) -> List[Dict[str, Any]]:
-        """Run all lint checks"""
-        self.issues = []
-        
-        # GH001: Dangling inputs
-        dangling_in = self.analyzer.find_dangling_inputs()
-        if dangling_in:
-            self.issues.append({
-                "rule": LINT_RULES["dangling_inputs"],
-                "count": len(dangling_in),
-                "items": dangling_in
-            })
-        
-        # GH002: Dangling outputs
-        dangling_out = self.analyzer.find_dangling_outputs()
-        if dangling_out:
-            self.issues.append({
-                "rule": LINT_RULES["dangling_outputs"],
-                "count": len(dangling_out),
-                "items": dangling_out
-            })
-        
-        # GH003: Unnamed parameters
-        unnamed = self.analyzer.find_unnamed_params()
-        if unnamed:
-            self.issues.append({
-                "rule": LINT_RULES["unnamed_params"],
-                "count": len(unnamed),
-                "items": unnamed
-            })
-        
-        # GH004: Missing groups
-        has_groups = any(c.get('group') for c in self.analyzer.components)
-        if not has_groups and len(self.analyzer.components) > 10:
-            self.issues.append({
-                "rule": LINT_RULES["missing_groups"],
-                "count": 1,
-                "items": [{"message": "Definition has no groups"}]
-            })
-        
-        # GH011: Plugin dependencies
-        plugins = self.analyzer.get_plugin_usage()
-        non_core_plugins = [p for p in plugins if p.get('category') not in ['', 'Params', 'Maths', 'Sets', 'Vector', 'Curve', 'Surface', 'Mesh', 'Intersect', 'Transform', 'Display']]
-        if non_core_plugins:
-            self.issues.append({
-                "rule": LINT_RULES["plugin_dependencies"],
-                "count": len(non_core_plugins),
-                "items": [{"plugin": f"{p['category']}/{p['subcategory']}"} for p in non_core_plugins]
-            })
+        """Run all lint rules in one shared traversal, most severe issues first
         
-        # Sort by severity
-        self.issues.sort(key=lambda x: SEVERITY_LEVELS.get(x['rule']['severity'], 0), reverse=True)
+        Per-rule wall time, visits and issue counts land in ``rule_stats``;
+        rules past ``rule_budget_ms`` are cut short and flagged ``partial``.
+        """
+        self.issues, self.rule_stats = run_rules(self, self.rules, self.rule_budget_ms, state=self._rule_state)
+        return self.issues
+    
+    def lint_incremental(self, previous: "GHLinter", diff: Optional[ModelDiff] = None) -> List[Dict[str, Any]]:
+        """Lint this revision starting from ``previous``, a linter that ran on an earlier one
         
+        ``diff`` (from the previous model to this one) defaults to
+        ``diff_models``. Per-node rules and passes re-check only the
+        touched nodes and keep every other node's findings; duplicate
+        chains, wire crossings, deep chains and tree-operation chains are
+        patched around the change, carrying the previous revision's state
+        over; the remaining whole-graph rules are cheap and run in full.
+        The issues equal a full ``lint_all``. Falls back to ``lint_all``
+        when the models cannot be matched (repeated guids) or ``previous``
+        never linted.
+        """
+        if diff is None:
+            diff = diff_models(previous.analyzer.model, self.analyzer.model)
+        if diff is None or not previous._rule_state:
+            return self.lint_all()
+        self.analyzer.follow(previous.analyzer, diff)
+        self.issues, self.rule_stats = run_rules(self, self.rules, self.rule_budget_ms,
+                                                 previous=previous._rule_state, diff=diff,
+                                                 state=self._rule_state)
         return self.issues
     
-    def get_top_issues(self, n: int = 5) -> List[Dict[str, Any]]:
-        """Get top N most important issues"""
-        if not self.issues:
-            self.lint_all()
-        return self.issues[:n]
+    def get_top_issues(self, n: int = 5, items: bool = True) -> List[Dict[str, Any]]:
+        """Get top N most important issues
+        
+        Without a previous ``lint_all`` rules are run most severe first and
+        stop once ``n`` issues are found; ``items=False`` also skips
+        building item lists that rules defer. ``rule_stats`` covers the
+        rules that ran.
+        """
+        if self.issues is not None:
+            return self.issues[:n]
+        self.rule_stats = []
+        return list(itertools.islice(
+            iter_issues(self, self.rules, self.rule_budget_ms, self.rule_stats, items,
+                        state=self._rule_state), n))
     
     def generate_lint_report(self) -> str:
         """Generate a formatted lint report"""
-        if not self.issues:
+        if self.issues is None:
             self.lint_all()
         
         report = []
@@ -104,6 +168,11 @@ class GHLinter:
                 
                 report.append(f"{icon} {rule['id']}: {rule['title']} [{rule['severity'].upper()}]")
                 report.append(f"   Found: {count} occurrence(s)")
+                if 'threshold_bytes' in issue:
+                    report.append(f"   Total: {issue['decoded_bytes']:,} bytes "
+                                  f"(threshold {issue['threshold_bytes']:,} bytes)")
+                if issue.get('partial'):
+                    report.append("   ⏱️ Partial: the rule ran out of its time budget")
                 report.append(f"   {rule['description']}")
                 report.append("")
                 report.append(f"   Why it matters: {rule['why_it_matters']}")
@@ -114,8 +183,32 @@ class GHLinter:
                 if items:
                     report.append("   Examples:")
                     for item in items[:3]:  # Show first 3
-                        if 'component' in item:
-                            report.append(f"   • {item.get('component')} → {item.get('input', item.get('output', ''))}")
+                        if 'crossings' in item:
+                            report.append(f"   • {item['from']} → {item['to']}: {item['crossings']} crossing(s), "
+                                          f"length {item['length']}" + (" (long)" if item['long'] else ""))
+                        elif 'from_access' in item:
+                            report.append(f"   • {item['from']} ({item['from_access']}) → "
+                                          f"{item['to']}.{item['input']} ({item['to_access']})")
+                        elif 'chain_operations' in item:
+                            report.append(f"   • {item.get('component')}: {item['chain_operations']} tree operations "
+                                          f"along {' → '.join(item['chain'])}")
+                        elif 'instances' in item:
+                            report.append(f"   • {item.get('component')} chain of {item['chain_size']} × {item['instances']} "
+                                          f"(~{item['estimated_saving_bytes']:,} bytes to save)")
+                        elif 'depth' in item:
+                            report.append(f"   • {item.get('component')}: {item['depth']} deep")
+                        elif 'decoded_bytes' in item:
+                            report.append(f"   • {item.get('component')}: {item['decoded_bytes']:,} bytes")
+                        elif 'time_ms' in item:
+                            report.append(f"   • {item.get('component')}: {item['time_ms']} ms")
+                        elif 'characters' in item:
+                            report.append(f"   • {item.get('name')}: {item['characters']:,} characters")
+                        elif 'component' in item:
+                            port = item.get('input', item.get('output'))
+                            if port is not None:
+                                report.append(f"   • {item.get('component')} → {port}")
+                            else:
+                                report.append(f"   • {item.get('component')} at {item.get('pos')}")
                         elif 'type' in item:
                             report.append(f"   • {item.get('type')} at {item.get('pos')}")
                         elif 'plugin' in item:
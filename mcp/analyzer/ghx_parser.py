@@ -1,32 +1,291 @@
 """
 Enhanced GHX Parser
-Parses GHX files directly without needing Grasshopper
+Parses GHX (and binary GH) files directly without needing Grasshopper
 """
+import os
+import re
+import sys
+import mmap
+import hashlib
 import xml.etree.ElementTree as ET
 import base64
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Any
 from collections import defaultdict
+if __package__:
+    from .gh_archive import read_gh_archive, decompress_gh, GHArchiveReader, GHArchiveError
+else:  # run as a script: python ghx_parser.py <file>
+    from gh_archive import read_gh_archive, decompress_gh, GHArchiveReader, GHArchiveError
+
+
+# Nesting limit for cluster documents inside cluster documents
+DEFAULT_MAX_CLUSTER_DEPTH = 8
+
+# Child elements of an item that hold base64-encoded internalized data
+_BLOB_TAGS = ("stream", "bitmap")
+
+# Internalized data lives under PersistentData chunks or in serialized
+# geometry items; other blobs (icon overrides, cluster documents) are not data
+_DATA_CHUNKS = ("PersistentData",)
+_GEOMETRY_ITEMS = ("ON_Data", "Geometry")
+_SKIPPED_CHUNKS = ("Object", "ClusterDocument")
+
+# GH_ParamAccess and GH_DataMapping values as stored in param chunks
+_ACCESS_NAMES = {"0": "item", "1": "list", "2": "tree"}
+_MAPPING_NAMES = {"1": "flatten", "2": "graft"}
+
+
+def _base64_size(text: str) -> int:
+    """Decoded byte count of a base64 string, without decoding it
+    
+    Whitespace anywhere in the string (wrapped blobs) is ignored, as
+    ``b64decode`` ignores it.
+    """
+    text = "".join(text.split())
+    padding = 2 if text.endswith("==") else 1 if text.endswith("=") else 0
+    return len(text) * 3 // 4 - padding
+
+
+class ChunkIndex:
+    """One-pass index over the direct items and child chunks of a GHX chunk
+    
+    Items are keyed by name (first occurrence) and by ``(name, index)`` for
+    indexed items such as ``Source``; child chunks are keyed by
+    ``(name, index)`` with ``index=None`` for unindexed chunks. Only direct
+    children are indexed, so nested chunks never shadow the owner's fields.
+    """
+    
+    __slots__ = ("items", "chunks")
+    
+    def __init__(self, chunk):
+        self.items = {}
+        self.chunks = {}
+        for group in chunk:
+            if group.tag == "items":
+                for item in group:
+                    name = item.get("name")
+                    index = item.get("index")
+                    if index is not None:
+                        self.items.setdefault((name, int(index)), item)
+                    self.items.setdefault(name, item)
+            elif group.tag == "chunks":
+                for child in group:
+                    index = child.get("index")
+                    key = (child.get("name"), int(index) if index is not None else None)
+                    self.chunks.setdefault(key, child)
+    
+    def item(self, name, index=None):
+        """Get an item element by name (and index), or None"""
+        return self.items.get(name if index is None else (name, index))
+    
+    def value(self, name, index=None):
+        """Get the text of an item by name (and index), or an empty string"""
+        item = self.items.get(name if index is None else (name, index))
+        return item.text if item is not None and item.text is not None else ""
+    
+    def chunk(self, name, index=None):
+        """Get a child chunk by name (and index), or None"""
+        return self.chunks.get((name, index))
 
 
 class GHXParser:
-    """Parse GHX files directly"""
+    """Parse GHX files directly
+    
+    With ``streaming=True`` the file is read with ``iterparse`` and each
+    top-level ``Object`` chunk is parsed and released as soon as it is
+    complete, so memory stays bounded by the largest single object instead
+    of the whole document. ``tree`` and ``root`` are ``None`` in that mode.
+    
+    Binary ``.gh`` archives are decoded by ``read_gh_archive`` into the same
+    element tree a ``.ghx`` file produces; ``streaming`` does not apply.
+    
+    With ``header_only=True`` reading stops as soon as ``DefinitionObjects``
+    starts: only document info and the ``GHALibraries`` list are filled, and
+    the object lists stay empty.
+    
+    With ``workers`` > 1 the top-level ``Object`` chunks of a ``.ghx`` are
+    located by a byte scan and parsed by a process pool; results are merged
+    in document order, so ``data`` matches a serial parse.
+    
+    Cluster instances are tagged with the content hash of their embedded
+    cluster document and registered in ``data["clusters"]``; identical
+    bodies share one entry. Bodies are parsed on demand by ``get_cluster``,
+    or all at once with ``clusters=True``, each hash only once and never
+    deeper than ``max_cluster_depth``.
     
-    def __init__(self, ghx_path: str):
-        self.tree = ET.parse(ghx_path)
-        self.root = self.tree.getroot()
+    Objects carrying internalized data (byte streams and bitmaps stored as
+    base64 under PersistentData or in geometry items) get an
+    ``internalized`` entry with encoded and decoded byte counts per item.
+    Decoded sizes are computed from the base64 length; ``decode_data=True``
+    decodes each blob instead and counts the actual bytes.
+    """
+    
+    def __init__(self, ghx_path: str, streaming: bool = False, header_only: bool = False,
+                 workers: int = 0, clusters: bool = False,
+                 max_cluster_depth: int = DEFAULT_MAX_CLUSTER_DEPTH, decode_data: bool = False):
+        self.path = ghx_path
+        self.streaming = streaming
+        self.header_only = header_only
+        self.workers = workers
+        self.max_cluster_depth = max_cluster_depth
+        self.decode_data = decode_data
+        self.tree = None
+        self.root = None
+        self._reset()
+        is_gh = os.path.splitext(ghx_path)[1].lower() == ".gh"
+        if header_only:
+            self.streaming = False
+            if is_gh:
+                self.root = read_gh_archive(ghx_path, stop_at="DefinitionObjects")
+                self._parse_header(self.root.find('.//chunk[@name="DefinitionProperties"]'),
+                                   self.root.find('.//chunk[@name="GHALibraries"]'))
+            else:
+                self._parse_header_streaming()
+        elif is_gh:
+            self.streaming = False
+            self.root = read_gh_archive(ghx_path)
+            self.tree = ET.ElementTree(self.root)
+            self._parse()
+        elif workers and workers > 1:
+            self.streaming = False
+            self._parse_parallel(workers)
+        elif streaming:
+            self._parse_streaming()
+        else:
+            self.tree = ET.parse(ghx_path)
+            self.root = self.tree.getroot()
+            self._parse()
+        if clusters:
+            self.parse_clusters()
+    
+    def _reset(self):
+        """Start with an empty data model and wire join state"""
         self.data = {
             "document": {},
+            "libraries": [],
             "components": [],
             "params": [],
             "wires": [],
-            "groups": []
+            "groups": [],
+            "clusters": {}
         }
-        self._parse()
+        # Raw cluster documents by content hash, dropped once parsed
+        self._cluster_payloads = {}
+        self._cluster_depth = 0
+        # Wire join state: output param guid -> (owner guid, out index, out name)
+        # and (source guid, target guid, input name, input index) for every Source item
+        self._outputs_by_guid = {}
+        self._pending_sources = []
     
     def _parse(self):
         """Parse the GHX file"""
-        # Document info
         doc_props = self.root.find('.//chunk[@name="DefinitionProperties"]')
+        gh_libs = self.root.find('.//chunk[@name="GHALibraries"]')
+        self._parse_header(doc_props, gh_libs)
+        
+        # Parse top-level objects; Object chunks nested in a ClusterDocument
+        # belong to the cluster body and are parsed with it
+        def_objects = self.root.find('.//chunk[@name="DefinitionObjects"]')
+        if def_objects:
+            for obj in def_objects.findall('chunks/chunk[@name="Object"]'):
+                self._parse_object(obj)
+        self._resolve_wires()
+    
+    def _parse_streaming(self):
+        """Parse the GHX file incrementally, releasing each object once read"""
+        doc_props = None
+        gh_libs = None
+        objects_done = False
+        in_objects = False
+        object_depth = 0
+        open_elems = []
+        
+        for event, elem in ET.iterparse(self.path, events=("start", "end")):
+            if event == "start":
+                open_elems.append(elem)
+                if elem.tag != "chunk" or objects_done:
+                    continue
+                name = elem.get("name")
+                if name == "DefinitionObjects" and not in_objects:
+                    in_objects = True
+                elif name == "Object" and in_objects:
+                    object_depth += 1
+                continue
+            
+            open_elems.pop()
+            if elem.tag != "chunk":
+                continue
+            name = elem.get("name")
+            
+            if name == "DefinitionProperties" and doc_props is None:
+                doc_props = elem
+            elif name == "GHALibraries" and gh_libs is None:
+                gh_libs = elem
+            elif in_objects and name == "Object":
+                object_depth -= 1
+                if object_depth == 0:
+                    self._parse_object(elem)
+                    elem.clear()
+                    open_elems[-1].remove(elem)
+            elif in_objects and name == "DefinitionObjects" and object_depth == 0:
+                in_objects = False
+                objects_done = True
+        
+        self._parse_header(doc_props, gh_libs)
+        self._resolve_wires()
+    
+    def _parse_parallel(self, workers: int):
+        """Parse top-level objects in a process pool and merge in document order"""
+        self._parse_header_streaming()
+        ranges = scan_object_ranges(self.path)
+        
+        # Contiguous batches keep per-task overhead low and preserve order
+        batch_count = min(len(ranges), workers * 4)
+        if batch_count < 2:
+            results = [_parse_object_batch(self.path, ranges, self.decode_data)]
+        else:
+            size = -(-len(ranges) // batch_count)
+            batches = [ranges[i:i + size] for i in range(0, len(ranges), size)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_parse_object_batch, [self.path] * len(batches), batches,
+                                        [self.decode_data] * len(batches)))
+        
+        for components, params, outputs_by_guid, pending_sources, clusters, payloads in results:
+            self.data["components"].extend(components)
+            self.data["params"].extend(params)
+            self._outputs_by_guid.update(outputs_by_guid)
+            self._pending_sources.extend(pending_sources)
+            for cluster_hash, entry in clusters.items():
+                known = self.data["clusters"].get(cluster_hash)
+                if known is None:
+                    self.data["clusters"][cluster_hash] = entry
+                    self._cluster_payloads[cluster_hash] = payloads[cluster_hash]
+                else:
+                    known["instances"].extend(entry["instances"])
+        self._resolve_wires()
+    
+    def _parse_header_streaming(self):
+        """Read only until the header chunks are complete, then stop"""
+        doc_props = None
+        gh_libs = None
+        with open(self.path, "rb") as f:
+            for event, elem in ET.iterparse(f, events=("start", "end")):
+                if elem.tag != "chunk":
+                    continue
+                name = elem.get("name")
+                if event == "start":
+                    if name == "DefinitionObjects":
+                        break
+                elif name == "DefinitionProperties" and doc_props is None:
+                    doc_props = elem
+                elif name == "GHALibraries" and gh_libs is None:
+                    gh_libs = elem
+                if doc_props is not None and gh_libs is not None:
+                    break
+        self._parse_header(doc_props, gh_libs)
+    
+    def _parse_header(self, doc_props, gh_libs):
+        """Fill document info from the DefinitionProperties and GHALibraries chunks"""
         if doc_props:
             self.data["document"] = {
                 "title": self._get_item_value(doc_props, "Name"),
@@ -34,102 +293,352 @@ class GHXParser:
             }
         
         # Get GH version
-        gh_libs = self.root.find('.//chunk[@name="GHALibraries"]')
         if gh_libs:
             version_elem = gh_libs.find('.//item[@name="Version"]')
             if version_elem is not None:
                 self.data["document"]["gh_version"] = version_elem.text
-        
-        # Parse objects
-        def_objects = self.root.find('.//chunk[@name="DefinitionObjects"]')
-        if def_objects:
-            for obj in def_objects.findall('.//chunk[@name="Object"]'):
-                self._parse_object(obj)
+            
+            # Plugin libraries the definition depends on
+            for library in gh_libs.findall('chunks/chunk[@name="Library"]'):
+                library_index = ChunkIndex(library)
+                self.data["libraries"].append({
+                    "name": library_index.value("Name"),
+                    "author": library_index.value("Author"),
+                    "version": library_index.value("Version"),
+                    "id": library_index.value("Id")
+                })
     
     def _get_item_value(self, parent, name):
-        """Get value of an item by name"""
-        item = parent.find(f'.//item[@name="{name}"]')
+        """Get value of a direct item of a chunk by name"""
+        item = parent.find(f'items/item[@name="{name}"]')
         return item.text if item is not None else ""
     
     def _parse_object(self, obj):
         """Parse a single object (component or parameter)"""
-        guid = self._get_item_value(obj, "GUID")
-        name = self._get_item_value(obj, "Name")
+        obj_index = ChunkIndex(obj)
+        type_guid = obj_index.value("GUID")
+        name = obj_index.value("Name")
         
-        container = obj.find('.//chunk[@name="Container"]')
+        container = obj_index.chunk("Container")
         if not container:
             return
+        container_index = ChunkIndex(container)
+        guid = container_index.value("InstanceGuid") or type_guid
         
-        # Get position
-        attrs = container.find('.//chunk[@name="Attributes"]')
+        # Get position and canvas bounds
+        attrs = container_index.chunk("Attributes")
         pos = [0, 0]
+        bounds = None
         if attrs:
-            pivot = attrs.find('.//item[@name="Pivot"]')
+            attrs_index = ChunkIndex(attrs)
+            pivot = attrs_index.item("Pivot")
             if pivot:
                 x_elem = pivot.find('X')
                 y_elem = pivot.find('Y')
                 if x_elem is not None and y_elem is not None:
                     pos = [float(x_elem.text), float(y_elem.text)]
+            rect = attrs_index.item("Bounds")
+            if rect:
+                values = [rect.find(key) for key in ('X', 'Y', 'W', 'H')]
+                if all(elem is not None for elem in values):
+                    bounds = [float(elem.text) for elem in values]
         
         obj_data = {
             "guid": guid,
             "name": name,
             "pos": pos,
-            "type": self._get_item_value(container, "Description")
+            "type": sys.intern(container_index.value("Description")),
+            "type_guid": type_guid
         }
+        if bounds is not None:
+            obj_data["bounds"] = bounds
+        # GH only writes Hidden for objects with their preview switched off
+        if container_index.value("Hidden") == "true":
+            obj_data["hidden"] = True
+        
+        cluster_hash = self._register_cluster(container_index, guid, name)
+        if cluster_hash is not None:
+            obj_data["cluster"] = cluster_hash
+        
+        internalized = self._measure_internalized(obj)
+        if internalized is not None:
+            obj_data["internalized"] = internalized
         
         # Check if it's a component (has inputs/outputs)
-        param_data = container.find('.//chunk[@name="ParameterData"]')
+        param_data = container_index.chunk("ParameterData")
         if param_data:
             # It's a component
-            input_count = int(self._get_item_value(param_data, "InputCount") or "0")
-            output_count = int(self._get_item_value(param_data, "OutputCount") or "0")
+            param_index = ChunkIndex(param_data)
+            input_count = int(param_index.value("InputCount") or "0")
+            output_count = int(param_index.value("OutputCount") or "0")
             
             obj_data["inputs"] = []
             obj_data["outputs"] = []
             
             # Parse inputs
             for i in range(input_count):
-                inp = param_data.find(f'.//chunk[@name="InputParam"][@index="{i}"]')
-                if inp:
-                    obj_data["inputs"].append({
+                inp = param_index.chunk("InputParam", i)
+                if inp is not None:
+                    inp_index = ChunkIndex(inp)
+                    inp_name = sys.intern(inp_index.value("NickName") or inp_index.value("Name"))
+                    inp_data = {
                         "index": i,
-                        "name": self._get_item_value(inp, "NickName") or self._get_item_value(inp, "Name")
-                    })
+                        "name": inp_name
+                    }
+                    optional = inp_index.value("Optional")
+                    if optional:
+                        inp_data["optional"] = optional == "true"
+                    inp_data.update(self._tree_settings(inp_index))
+                    obj_data["inputs"].append(inp_data)
+                    self._collect_sources(inp_index, guid, inp_name, i)
             
             # Parse outputs
             for i in range(output_count):
-                out = param_data.find(f'.//chunk[@name="OutputParam"][@index="{i}"]')
-                if out:
-                    obj_data["outputs"].append({
+                out = param_index.chunk("OutputParam", i)
+                if out is not None:
+                    out_index = ChunkIndex(out)
+                    out_name = sys.intern(out_index.value("NickName") or out_index.value("Name"))
+                    out_data = {
                         "index": i,
-                        "name": self._get_item_value(out, "NickName") or self._get_item_value(out, "Name")
-                    })
+                        "name": out_name
+                    }
+                    out_data.update(self._tree_settings(out_index))
+                    obj_data["outputs"].append(out_data)
+                    out_guid = out_index.value("InstanceGuid")
+                    if out_guid:
+                        self._outputs_by_guid[out_guid] = (guid, i, out_name)
             
             self.data["components"].append(obj_data)
         else:
             # It's a parameter (slider, panel, etc)
             obj_data["param_kind"] = name
             
+            # A standalone param is its own single output and input
+            param_name = container_index.value("NickName") or container_index.value("Name") or name
+            obj_data.update(self._tree_settings(container_index))
+            self._outputs_by_guid[guid] = (guid, 0, param_name)
+            self._collect_sources(container_index, guid, param_name, 0)
+            
             # Try to get slider values
-            slider_val = self._get_item_value(container, "CurrentValue")
+            slider_val = container_index.value("CurrentValue")
+            if not slider_val:
+                slider = container_index.chunk("Slider")
+                if slider is not None:
+                    slider_val = ChunkIndex(slider).value("Value")
             if slider_val:
                 obj_data["slider_value"] = slider_val
             
             # Try to get panel text
-            panel_text = self._get_item_value(container, "UserText")
+            panel_text = container_index.value("UserText")
             if panel_text:
                 obj_data["panel_text"] = panel_text
             
             self.data["params"].append(obj_data)
     
+    def _measure_internalized(self, obj):
+        """Byte counts of the base64 blobs stored inside one object
+        
+        Only blobs under a PersistentData chunk or in a geometry item
+        count; icon overrides and nested Object and ClusterDocument chunks
+        (cluster bodies) are skipped. Returns None when the object holds no
+        internalized data.
+        """
+        items = {}
+        encoded_total = 0
+        decoded_total = 0
+        pending = [(obj, False)]
+        while pending:
+            chunk, in_data = pending.pop()
+            for group in chunk:
+                if group.tag == "chunks":
+                    pending.extend((c, in_data or c.get("name") in _DATA_CHUNKS) for c in group
+                                   if c.get("name") not in _SKIPPED_CHUNKS)
+                elif group.tag == "items":
+                    for item in group:
+                        if not in_data and item.get("name") not in _GEOMETRY_ITEMS:
+                            continue
+                        for blob in item:
+                            if blob.tag not in _BLOB_TAGS or not blob.text:
+                                continue
+                            encoded = len(blob.text)
+                            if self.decode_data:
+                                decoded = len(base64.b64decode(blob.text))
+                            else:
+                                decoded = _base64_size(blob.text)
+                            name = item.get("name")
+                            items[name] = items.get(name, 0) + decoded
+                            encoded_total += encoded
+                            decoded_total += decoded
+        if not encoded_total:
+            return None
+        return {
+            "encoded_bytes": encoded_total,
+            "decoded_bytes": decoded_total,
+            "items": items
+        }
+    
+    def get_internalized_data(self, top: int = 10) -> Dict[str, Any]:
+        """Internalized data totals and the largest objects by decoded size"""
+        carriers = [obj for obj in self.data["components"] + self.data["params"]
+                    if "internalized" in obj]
+        carriers.sort(key=lambda obj: obj["internalized"]["decoded_bytes"], reverse=True)
+        return {
+            "objects": len(carriers),
+            "encoded_bytes": sum(obj["internalized"]["encoded_bytes"] for obj in carriers),
+            "decoded_bytes": sum(obj["internalized"]["decoded_bytes"] for obj in carriers),
+            "top": [{
+                "guid": obj["guid"],
+                "name": obj["name"],
+                **obj["internalized"]
+            } for obj in carriers[:top]]
+        }
+    
+    def _register_cluster(self, container_index, guid, name):
+        """Record a cluster instance under the content hash of its document
+        
+        Returns the hash, or None if the object embeds no cluster document.
+        The document is either a nested ClusterDocument chunk or a
+        ClusterDocument byte array holding a binary GH archive.
+        """
+        chunk = container_index.chunk("ClusterDocument")
+        if chunk is not None:
+            payload = ("xml", ET.tostring(chunk))
+            digest_source = payload[1]
+        else:
+            item = container_index.item("ClusterDocument")
+            if item is None:
+                return None
+            stream = item.find("stream")
+            text = (stream.text if stream is not None else item.text) or ""
+            payload = ("base64", text.strip())
+            digest_source = payload[1].encode("ascii")
+        
+        cluster_hash = hashlib.sha1(digest_source).hexdigest()
+        entry = self.data["clusters"].get(cluster_hash)
+        if entry is None:
+            entry = {
+                "name": name,
+                "depth": self._cluster_depth + 1,
+                "status": "pending",
+                "instances": []
+            }
+            self.data["clusters"][cluster_hash] = entry
+            self._cluster_payloads[cluster_hash] = payload
+        entry["instances"].append(guid)
+        return cluster_hash
+    
+    def get_cluster(self, cluster_hash: str) -> Dict[str, Any]:
+        """Cluster entry by hash, parsing its document on first request"""
+        entry = self.data["clusters"].get(cluster_hash)
+        if entry is not None and entry["status"] == "pending":
+            self._parse_cluster(cluster_hash, entry)
+        return entry
+    
+    def parse_clusters(self) -> Dict[str, Any]:
+        """Parse every registered cluster body (each hash once), including nested ones"""
+        pending = [h for h, e in self.data["clusters"].items() if e["status"] == "pending"]
+        while pending:
+            for cluster_hash in pending:
+                self._parse_cluster(cluster_hash, self.data["clusters"][cluster_hash])
+            pending = [h for h, e in self.data["clusters"].items() if e["status"] == "pending"]
+        return self.data["clusters"]
+    
+    def _parse_cluster(self, cluster_hash: str, entry: Dict[str, Any]):
+        """Parse one cluster body into its shared entry"""
+        kind, payload = self._cluster_payloads.pop(cluster_hash, (None, None))
+        if entry["depth"] > self.max_cluster_depth:
+            entry["status"] = "depth_limit"
+            return
+        try:
+            if kind == "xml":
+                body = ET.fromstring(payload)
+            else:
+                raw = base64.b64decode(payload)
+                try:
+                    raw = decompress_gh(raw)
+                except GHArchiveError:
+                    pass  # stored uncompressed
+                body = GHArchiveReader(raw).read()
+        except (ET.ParseError, GHArchiveError, ValueError) as e:
+            entry["status"] = "error"
+            entry["error"] = str(e)
+            return
+        
+        # Nested clusters land in the same registry, one level deeper
+        collector = GHXParser.__new__(GHXParser)
+        collector._reset()
+        collector.path = self.path
+        collector.decode_data = self.decode_data
+        collector.root = body
+        collector.data["clusters"] = self.data["clusters"]
+        collector._cluster_payloads = self._cluster_payloads
+        collector._cluster_depth = entry["depth"]
+        collector._parse()
+        
+        entry["status"] = "parsed"
+        entry["components"] = collector.data["components"]
+        entry["params"] = collector.data["params"]
+        entry["wires"] = collector.data["wires"]
+    
+    @staticmethod
+    def _tree_settings(param_index):
+        """Access and data-tree flags of a param chunk (only those set)"""
+        settings = {}
+        access = _ACCESS_NAMES.get(param_index.value("Access"))
+        if access:
+            settings["tree_access"] = access
+        mapping = _MAPPING_NAMES.get(param_index.value("Mapping"))
+        if mapping:
+            settings["mapping"] = mapping
+        if param_index.value("Simplify") == "true":
+            settings["simplify"] = True
+        if param_index.value("Reverse") == "true":
+            settings["reverse"] = True
+        return settings
+    
+    def _collect_sources(self, param_index, target_guid, in_name, in_index):
+        """Queue the Source guids of an input param for the wire join"""
+        source_count = int(param_index.value("SourceCount") or "0")
+        for k in range(source_count):
+            source_guid = param_index.value("Source", k)
+            if source_guid:
+                self._pending_sources.append((source_guid, target_guid, in_name, in_index))
+    
+    def _resolve_wires(self):
+        """Join queued sources against the output map in one pass
+        
+        Sources that do not resolve (e.g. params inside clusters) are dropped,
+        matching export_to_json.py which only records wires it can resolve.
+        """
+        outputs = self._outputs_by_guid
+        for source_guid, target_guid, in_name, in_index in self._pending_sources:
+            source = outputs.get(source_guid)
+            if source is None:
+                continue
+            owner_guid, out_index, out_name = source
+            self.data["wires"].append({
+                "from": {
+                    "guid": owner_guid,
+                    "out_index": out_index,
+                    "out_name": out_name
+                },
+                "to": {
+                    "guid": target_guid,
+                    "in_index": in_index,
+                    "in_name": in_name
+                }
+            })
+        self._pending_sources = []
+    
     def to_json_format(self) -> Dict[str, Any]:
         """Convert to same format as export_to_json.py for compatibility"""
         return {
             "document": self.data["document"],
+            "libraries": self.data["libraries"],
             "components": self.data["components"],
             "params": self.data["params"],
-            "wires": self.data["wires"],  # Wire parsing is complex, may need enhancement
+            "wires": self.data["wires"],
+            "clusters": self.data["clusters"],
             "stats": {
                 "total_components": len(self.data["components"]),
                 "total_params": len(self.data["params"]),
@@ -155,8 +664,21 @@ class GHXParser:
         report.append(f"   Components: {len(self.data['components'])}")
         report.append(f"   Parameters: {len(self.data['params'])}")
         report.append(f"   Groups: {len(self.data['groups'])}")
+        clusters = self.data['clusters']
+        if clusters:
+            instances = sum(len(c['instances']) for c in clusters.values())
+            report.append(f"   Clusters: {instances} instance(s) of {len(clusters)} unique document(s)")
         report.append("")
         
+        internalized = self.get_internalized_data(top=5)
+        if internalized["objects"]:
+            report.append("💾 Internalized Data:")
+            report.append(f"   {internalized['decoded_bytes']:,} bytes in {internalized['objects']} object(s) "
+                          f"({internalized['encoded_bytes']:,} bytes as base64)")
+            for entry in internalized["top"]:
+                report.append(f"   {entry['name']}: {entry['decoded_bytes']:,} bytes")
+            report.append("")
+        
         # Component types
         comp_types = defaultdict(int)
         for comp in self.data['components']:
@@ -173,16 +695,74 @@ class GHXParser:
         return "\n".join(report)
 
 
-def parse_ghx(ghx_path: str):
-    """Parse a GHX file and return parser"""
-    parser = GHXParser(ghx_path)
+_CHUNK_TAG = re.compile(rb'<chunk\b[^>]*>|</chunk>')
+
+# Opening chunk tags by name attribute, wherever it sits and however it is quoted
+_OBJECTS_TAG = re.compile(rb'<chunk\b[^>]*\bname\s*=\s*["\']DefinitionObjects["\']')
+_OBJECT_TAG = re.compile(rb'<chunk\b[^>]*\bname\s*=\s*["\']Object["\']')
+
+
+def scan_object_ranges(ghx_path: str) -> List[tuple]:
+    """Byte ranges of the top-level Object chunks inside DefinitionObjects
+    
+    A single regex pass over the chunk tags with a depth counter; no XML
+    tree is built. Nested Object chunks stay inside their parent's range.
+    """
+    ranges = []
+    with open(ghx_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ranges
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            found = _OBJECTS_TAG.search(buf)
+            if found is None:
+                return ranges
+            start = found.start()
+            depth = 0
+            object_start = None
+            for match in _CHUNK_TAG.finditer(buf, start):
+                tag = match.group()
+                if tag.startswith(b'</'):
+                    depth -= 1
+                    if depth == 1 and object_start is not None:
+                        ranges.append((object_start, match.end()))
+                        object_start = None
+                    elif depth == 0:
+                        break
+                elif not tag.endswith(b'/>'):
+                    if depth == 1 and _OBJECT_TAG.match(tag):
+                        object_start = match.start()
+                    depth += 1
+    return ranges
+
+
+def _parse_object_batch(ghx_path: str, ranges: List[tuple], decode_data: bool = False):
+    """Process-pool worker: parse a batch of Object chunks from byte ranges"""
+    collector = GHXParser.__new__(GHXParser)
+    collector._reset()
+    collector.decode_data = decode_data
+    with open(ghx_path, "rb") as f:
+        for start, end in ranges:
+            f.seek(start)
+            collector._parse_object(ET.fromstring(f.read(end - start)))
+    return (collector.data["components"], collector.data["params"],
+            collector._outputs_by_guid, collector._pending_sources,
+            collector.data["clusters"], collector._cluster_payloads)
+
+
+def parse_ghx(ghx_path: str, streaming: bool = False, header_only: bool = False, workers: int = 0,
+              clusters: bool = False, decode_data: bool = False):
+    """Parse a GHX (or binary GH) file and return parser"""
+    parser = GHXParser(ghx_path, streaming=streaming, header_only=header_only, workers=workers,
+                       clusters=clusters, decode_data=decode_data)
     print(parser.generate_report())
     return parser
 
 
 if __name__ == "__main__":
-    import sys
     if len(sys.argv) > 1:
-        parse_ghx(sys.argv[1])
+        workers = next((int(a.split("=", 1)[1]) for a in sys.argv[2:] if a.startswith("--workers=")), 0)
+        parse_ghx(sys.argv[1], streaming="--stream" in sys.argv[2:],
+                  header_only="--header" in sys.argv[2:], workers=workers,
+                  clusters="--clusters" in sys.argv[2:], decode_data="--decode" in sys.argv[2:])
     else:
-        print("Usage: python ghx_parser.py <path_to_ghx>")
+        print("Usage: python ghx_parser.py <path_to_ghx_or_gh> [--stream] [--header] [--workers=N] [--clusters] [--decode]")
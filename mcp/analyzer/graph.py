@@ -0,0 +1,821 @@
+"""
+Definition Graph
+Compressed-sparse-row adjacency over a DefinitionModel's wires
+
+Built once per analyzer and shared by every query and lint rule. Node ids
+are the model's dense integer ids (records first, then unresolved wire
+endpoints), and edges are wire indices into the model's wire columns:
+
+- ``out_offsets`` / ``out_wires``: wires leaving node ``v`` are
+  ``out_wires[out_offsets[v]:out_offsets[v + 1]]``
+- ``in_offsets`` / ``in_wires``: the same for wires entering ``v``
+
+Within a node's slice wires keep their document order. Per-port edge
+lists group a node's slice by port name.
+
+``traverse`` walks every node and wire once and dispatches them to any
+number of ``GraphVisitor`` passes, so analyses and lint rules that only
+need local visits share a single walk. ``LocalVisitor`` passes keep their
+findings per node and can be brought up to date from a previous revision
+(see ``model_diff``) or filled from a ``subgraph_cache`` without walking
+every node.
+
+Reachability (``downstream`` / ``upstream``) works on the condensation of
+the graph into strongly connected components. Each component's cone is a
+Python int bitset over component ids, built from its neighbours' cones and
+memoized, so answering many queries costs little more than one pass. The
+bitsets take O(C²) bits for C components at worst (a long chain), so the
+memo is capped at ``CONE_MEMO_BITS``; past it cones are found by a plain
+search of the condensation per query.
+"""
+import itertools
+import math
+from array import array
+from collections import Counter, deque
+from itertools import accumulate, repeat
+from operator import eq, ne, not_, sub
+from time import perf_counter
+from typing import Any, Dict, List, Iterator, Optional, Sequence, Set, Tuple
+
+from .model import DefinitionModel
+
+
+# Total size of the memoized cone bitsets (both directions), 64 MB
+CONE_MEMO_BITS = 64 * 1024 * 1024 * 8
+
+
+def _csr(keys: array, n: int):
+    """Offsets and wire order grouping wire indices by key (stable sort)"""
+    counts = Counter(keys)
+    offsets = array("i", accumulate(map(counts.get, range(n), repeat(0)), initial=0))
+    order = array("i", sorted(range(len(keys)), key=keys.__getitem__))
+    return offsets, order
+
+
+class GraphVisitor:
+    """One pass run by ``DefinitionGraph.traverse``
+    
+    Subclasses override only the callbacks they need; ``traverse`` skips
+    the ones left at their defaults. Set ``topological`` to receive nodes
+    in Kahn order. ``key`` names the pass and its parameters so results
+    can be memoized. ``truncated`` is set once a time budget has cut the
+    visitor's callbacks off, leaving its results incomplete.
+    """
+    
+    topological = False
+    truncated = False
+    
+    @property
+    def key(self) -> Tuple:
+        return (type(self).__name__,)
+    
+    def begin(self, graph: "DefinitionGraph"):
+        """Called before the walk"""
+    
+    def visit_node(self, v: int, node):
+        """Called once per component/param record"""
+    
+    def visit_edge(self, w: int, src: int, dst: int):
+        """Called once per wire, right after its destination node"""
+    
+    def finish(self) -> Any:
+        """Called after the walk; returns the pass result"""
+        return None
+    
+    def update(self, graph: "DefinitionGraph", previous: "GraphVisitor", diff) -> bool:
+        """Take over the state of ``previous`` (same ``key``, run on the old
+        revision) and apply a ``ModelDiff`` instead of walking
+        
+        Returns False when the pass cannot, in which case it gets a full
+        walk; ``finish`` is called either way.
+        """
+        return False
+
+
+class LocalVisitor(GraphVisitor):
+    """A pass whose findings each belong to one node
+    
+    ``contribute(v, node)`` returns what node ``v`` adds (None for
+    nothing) and may read the node's own fields and wires only; with
+    ``reads_sources`` it may also read the nodes wired into it. Findings
+    are kept by guid in ``findings``, so ``update`` copies the untouched
+    nodes' findings and revisits only the nodes the diff touched (kept in
+    ``revisited`` with the removed ones, for patching a finished result).
+    
+    Set ``cacheable`` when findings are picklable and depend only on what
+    a subgraph fingerprint covers (no guids, positions, group ids or
+    timings); a ``SubgraphCache`` then reuses them across definitions.
+    """
+    
+    reads_sources = False
+    cacheable = False
+    
+    def begin(self, graph: "DefinitionGraph"):
+        self.graph = graph
+        self.findings = {}
+        self.revisited = None
+    
+    def contribute(self, v: int, node) -> Any:
+        return None
+    
+    def visit_node(self, v: int, node):
+        found = self.contribute(v, node)
+        if found is not None:
+            self.findings[node.guid] = found
+    
+    def update(self, graph: "DefinitionGraph", previous: "LocalVisitor", diff) -> bool:
+        self.begin(graph)
+        model = graph.model
+        node_ids, nodes, n_nodes = model.node_ids, model.nodes, model.n_nodes
+        revisit = diff.touched
+        if self.reads_sources:
+            # Wires keep their keys when a source changes, or comes or goes
+            # while still named by a wire (as an unresolved endpoint)
+            for guid in itertools.chain(diff.changed, diff.added, diff.removed):
+                if guid in node_ids:
+                    revisit.update(model.guids[u] for u in graph.successors(node_ids[guid]))
+        findings = self.findings = dict(previous.findings)
+        for guid in itertools.chain(diff.removed, revisit):
+            findings.pop(guid, None)
+        for guid in revisit:
+            v = node_ids.get(guid)
+            if v is not None and v < n_nodes:
+                self.visit_node(v, nodes[v])
+        self.revisited = revisit.union(diff.removed)
+        return True
+    
+    def ordered(self) -> List[Tuple[int, Any]]:
+        """(node id, finding) pairs in node id order"""
+        node_ids = self.graph.model.node_ids
+        return sorted(((node_ids[guid], found) for guid, found in self.findings.items()),
+                      key=lambda pair: pair[0])
+
+
+class DefinitionGraph:
+    """Forward and reverse CSR adjacency with per-port edge lists"""
+
+    __slots__ = ("model", "n", "out_offsets", "out_wires", "in_offsets", "in_wires",
+                 "_topo", "_leftover", "_rank", "_scc", "_cones", "_cone_bits")
+
+    def __init__(self, model: DefinitionModel):
+        self.model = model
+        self.n = model.n_ids
+        self.out_offsets, self.out_wires = _csr(model.wire_src, self.n)
+        self.in_offsets, self.in_wires = _csr(model.wire_dst, self.n)
+        self._topo = None
+        self._leftover = None
+        # Position of each node in a topological order, once known cycle-free
+        self._rank = None
+        self._scc = None
+        # Memoized cone bitsets per component id: downstream, upstream; and their total size
+        self._cones = ({}, {})
+        self._cone_bits = 0
+
+    def rebind(self, model: DefinitionModel) -> "DefinitionGraph":
+        """This graph over ``model``, a revision with the same node ids and wires
+        
+        Only positions or node data differ, so the adjacency and every
+        memoized order, component and cone carry over as they are.
+        """
+        graph = DefinitionGraph.__new__(DefinitionGraph)
+        graph.model = model
+        graph.n = self.n
+        graph.out_offsets, graph.out_wires = self.out_offsets, self.out_wires
+        graph.in_offsets, graph.in_wires = self.in_offsets, self.in_wires
+        graph._topo = self._topo
+        graph._leftover = self._leftover
+        graph._rank = self._rank
+        graph._scc = self._scc
+        graph._cones = tuple(dict(memo) for memo in self._cones)
+        graph._cone_bits = self._cone_bits
+        return graph
+
+    # ---------- edges ----------
+
+    def out_edges(self, v: int) -> array:
+        """Wire indices leaving node ``v``"""
+        return self.out_wires[self.out_offsets[v]:self.out_offsets[v + 1]]
+
+    def in_edges(self, v: int) -> array:
+        """Wire indices entering node ``v``"""
+        return self.in_wires[self.in_offsets[v]:self.in_offsets[v + 1]]
+
+    def out_degree(self, v: int) -> int:
+        return self.out_offsets[v + 1] - self.out_offsets[v]
+
+    def in_degree(self, v: int) -> int:
+        return self.in_offsets[v + 1] - self.in_offsets[v]
+
+    def successors(self, v: int) -> Iterator[int]:
+        """Target node ids of the wires leaving ``v`` (repeats per wire)"""
+        wire_dst = self.model.wire_dst
+        for w in self.out_edges(v):
+            yield wire_dst[w]
+
+    def predecessors(self, v: int) -> Iterator[int]:
+        """Source node ids of the wires entering ``v`` (repeats per wire)"""
+        wire_src = self.model.wire_src
+        for w in self.in_edges(v):
+            yield wire_src[w]
+
+    # ---------- ports ----------
+
+    def output_edges(self, v: int) -> Dict[str, List[int]]:
+        """Wires leaving ``v`` grouped by output name"""
+        names = self.model.wire_src_names
+        ports = {}
+        for w in self.out_edges(v):
+            ports.setdefault(names[w], []).append(w)
+        return ports
+
+    def input_edges(self, v: int) -> Dict[str, List[int]]:
+        """Wires entering ``v`` grouped by input name"""
+        names = self.model.wire_dst_names
+        ports = {}
+        for w in self.in_edges(v):
+            ports.setdefault(names[w], []).append(w)
+        return ports
+
+    def connected_outputs(self, v: int) -> Set[str]:
+        """Names of the outputs of ``v`` with at least one wire"""
+        names = self.model.wire_src_names
+        return {names[w] for w in self.out_edges(v)}
+
+    def connected_inputs(self, v: int) -> Set[str]:
+        """Names of the inputs of ``v`` with at least one wire"""
+        names = self.model.wire_dst_names
+        return {names[w] for w in self.in_edges(v)}
+
+    # ---------- whole graph ----------
+
+    def sources(self) -> List[int]:
+        """Record node ids with no incoming wires"""
+        return self._isolated(self.in_offsets)
+
+    def sinks(self) -> List[int]:
+        """Record node ids with no outgoing wires"""
+        return self._isolated(self.out_offsets)
+
+    def _isolated(self, offsets: array) -> List[int]:
+        n_nodes = self.model.n_nodes
+        return list(itertools.compress(range(n_nodes), map(eq, offsets, itertools.islice(offsets, 1, n_nodes + 1))))
+
+    def traverse(self, visitors: Sequence[GraphVisitor]) -> List[Any]:
+        """Walk every node and wire once, dispatching to all visitors
+        
+        Nodes come in id order, or in Kahn order (nodes on or behind a
+        cycle last) when any visitor is ``topological``. Each node's
+        incoming wires follow the node itself, so a topological visitor
+        sees every source of a wire before the wire. Unresolved endpoint
+        ids get no node visit but their wires are visited. Visitors that are
+        not topological may get either order and should not depend on it.
+        Returns each visitor's ``finish()`` result.
+        """
+        for visitor in visitors:
+            visitor.begin(self)
+        node_calls = [v.visit_node for v in visitors
+                      if type(v).visit_node is not GraphVisitor.visit_node]
+        edge_calls = [v.visit_edge for v in visitors
+                      if type(v).visit_edge is not GraphVisitor.visit_edge]
+        
+        if node_calls or edge_calls:
+            if any(v.topological for v in visitors):
+                order, leftover = self.topological_order()
+                ids = itertools.chain(order, (v for v in range(self.n) if leftover[v]))
+            else:
+                ids = range(self.n)
+            nodes = self.model.nodes
+            n_nodes = len(nodes)
+            in_offsets, in_wires, wire_src = self.in_offsets, self.in_wires, self.model.wire_src
+            for v in ids:
+                if node_calls and v < n_nodes:
+                    node = nodes[v]
+                    for call in node_calls:
+                        call(v, node)
+                if edge_calls and in_offsets[v] != in_offsets[v + 1]:
+                    for w in in_wires[in_offsets[v]:in_offsets[v + 1]]:
+                        u = wire_src[w]
+                        for call in edge_calls:
+                            call(w, u, v)
+        
+        return [visitor.finish() for visitor in visitors]
+    
+    def topological_order(self) -> Tuple[array, bytearray]:
+        """Kahn's algorithm over every node id
+        
+        Returns the order of the nodes that are not on or downstream of a
+        cycle, and a mask marking the nodes left over (``1`` = not ordered).
+        Memoized; callers must not modify the result.
+        """
+        if self._topo is not None:
+            return self._topo
+        n = self.n
+        in_offsets, out_offsets = self.in_offsets, self.out_offsets
+        indegree = array("i", map(sub, itertools.islice(in_offsets, 1, None), in_offsets))
+        order = array("i")
+        queue = deque(itertools.compress(range(n), map(not_, indegree)))
+        targets = array("i", map(self.model.wire_dst.__getitem__, self.out_wires))
+        while queue:
+            v = queue.popleft()
+            order.append(v)
+            for w in targets[out_offsets[v]:out_offsets[v + 1]]:
+                indegree[w] -= 1
+                if indegree[w] == 0:
+                    queue.append(w)
+        # Nodes never ordered still wait on a source
+        leftover = bytearray(map(bool, indegree))
+        self._topo = order, leftover
+        self._leftover = leftover
+        if len(order) == n:
+            rank = self._rank = array("d", bytes(8 * n))
+            for i, v in enumerate(order):
+                rank[v] = i
+        return self._topo
+    
+    def leftover(self) -> bytearray:
+        """The leftover mask of ``topological_order`` (nodes on or downstream of a cycle)
+        
+        Skips the ordering when ``follow_cycles`` already found the graph
+        cycle-free. Memoized; callers must not modify the result.
+        """
+        if self._leftover is None:
+            self._leftover = self.topological_order()[1]
+        return self._leftover
+    
+    def follow_cycles(self, previous: "DefinitionGraph", diff) -> None:
+        """Mark this graph cycle-free when ``previous``, an earlier revision
+        (``diff`` leads from it to this one), was and no added wire closes a cycle
+        
+        The previous revision's topological positions carry over (nodes
+        added since come first) and are kept valid one added wire at a time
+        as in Pearce and Kelly's dynamic ordering: a wire running forward
+        needs nothing, one running back is checked for a cycle among the
+        nodes positioned between its ends, which are then reordered.
+        Removed wires and nodes cannot close a cycle. Does nothing when the
+        previous positions are not known, past 16 added wires or when the
+        search grows past a quarter of the graph, where ordering afresh is
+        cheaper.
+        """
+        if previous._rank is None:
+            return
+        wires = diff.wires_added_at
+        if len(wires) > 16:
+            return
+        rank = diff.carry(previous._rank, math.nan)
+        # NaN is the one position unequal to itself
+        for k, v in enumerate(itertools.compress(range(self.n), map(ne, rank, rank))):
+            rank[v] = -1.0 - k
+        wire_src, wire_dst = self.model.wire_src, self.model.wire_dst
+        pending = set(wires)
+        budget = self.n // 4 + 64
+        for w in wires:
+            pending.discard(w)
+            u, v = wire_src[w], wire_dst[w]
+            if rank[u] < rank[v]:
+                continue
+            ahead = self._ranked_within(v, rank, rank[u], True, pending, budget)
+            if ahead is None or u in ahead:
+                return
+            behind = self._ranked_within(u, rank, rank[v], False, pending, budget)
+            if behind is None:
+                return
+            # What must follow ``u`` takes the positions after what must precede it
+            moved = sorted(behind, key=rank.__getitem__) + sorted(ahead, key=rank.__getitem__)
+            for node, position in zip(moved, sorted(map(rank.__getitem__, moved))):
+                rank[node] = position
+        self._leftover = bytearray(self.n)
+        self._rank = rank
+    
+    def _ranked_within(self, start: int, rank: array, bound: float, forward: bool,
+                       skipped: Set[int], budget: int) -> Optional[Set[int]]:
+        """Nodes reached from ``start`` along the wires (against them unless
+        ``forward``) through nodes positioned before ``bound`` (after it
+        when going backward), skipping the wires in ``skipped``; None past
+        ``budget`` nodes"""
+        if forward:
+            offsets, edges, ends = self.out_offsets, self.out_wires, self.model.wire_dst
+        else:
+            offsets, edges, ends = self.in_offsets, self.in_wires, self.model.wire_src
+        seen = {start}
+        stack = [start]
+        while stack:
+            x = stack.pop()
+            for w in edges[offsets[x]:offsets[x + 1]]:
+                y = ends[w]
+                if y in seen or w in skipped or (rank[y] > bound if forward else rank[y] < bound):
+                    continue
+                seen.add(y)
+                stack.append(y)
+            if len(seen) > budget:
+                return None
+        return seen
+    
+    def longest_paths(self, weights, topo=None) -> Tuple[array, array, bytearray]:
+        """Heaviest path ending at each node, in one topological pass
+        
+        ``weights[v]`` is the cost of visiting node ``v``. Returns
+        ``depth[v]`` (path weight including ``v``), ``parent[v]`` (previous
+        node on that path, ``-1`` at a path start) and the leftover mask of
+        ``topological_order``; leftover nodes keep depth 0. ``topo`` reuses
+        an existing ``topological_order`` result.
+        """
+        n = self.n
+        order, leftover = topo or self.topological_order()
+        depth = array("d", bytes(8 * n))
+        parent = array("i", [-1]) * n
+        in_offsets = self.in_offsets
+        sources = array("i", map(self.model.wire_src.__getitem__, self.in_wires))
+        for v in order:
+            best = 0.0
+            best_parent = -1
+            for u in sources[in_offsets[v]:in_offsets[v + 1]]:
+                if depth[u] > best:
+                    best = depth[u]
+                    best_parent = u
+            depth[v] = best + weights[v]
+            parent[v] = best_parent
+        return depth, parent, leftover
+
+    def critical_path(self, weights) -> Tuple[List[int], array, array, bytearray]:
+        """Heaviest path through the graph and every node's slack
+        
+        Forward pass: ``longest_paths`` gives each node's earliest finish.
+        Backward pass in reverse topological order: a node's latest finish
+        is the smallest latest start among its successors (the total for
+        nodes without any), and slack is latest minus earliest finish.
+        Returns the critical path, earliest finish, slack and the leftover
+        mask; leftover nodes (on or after a cycle) keep slack 0.
+        """
+        n = self.n
+        topo = self.topological_order()
+        order, leftover = topo
+        finish, parent, _ = self.longest_paths(weights, topo)
+        if not order:
+            return [], finish, array("d", bytes(8 * n)), leftover
+        end = max(order, key=finish.__getitem__)
+        total = finish[end]
+        
+        latest = array("d", [total]) * n
+        out_offsets, out_wires, wire_dst = self.out_offsets, self.out_wires, self.model.wire_dst
+        for v in reversed(order):
+            for k in range(out_offsets[v], out_offsets[v + 1]):
+                w = wire_dst[out_wires[k]]
+                start = latest[w] - weights[w]
+                if start < latest[v]:
+                    latest[v] = start
+        slack = array("d", bytes(8 * n))
+        for v in order:
+            slack[v] = max(latest[v] - finish[v], 0.0)
+        return self.path_to(parent, end), finish, slack, leftover
+    
+    def path_to(self, parent: array, v: int) -> List[int]:
+        """Node ids from the start of a ``longest_paths`` path to ``v``"""
+        path = []
+        while v >= 0:
+            path.append(v)
+            v = parent[v]
+        path.reverse()
+        return path
+
+    def neighborhood_labels(self, initial, rounds: int, deadline: Optional[float] = None,
+                            tables: Optional[List[Dict[Tuple, int]]] = None) -> List[array]:
+        """Weisfeiler-Lehman refinement over incoming wires
+        
+        ``labels[r][v]`` identifies the upstream neighbourhood of ``v`` ``r``
+        wires deep: its own initial label plus, per incoming wire, the port
+        pair and the source's label from round ``r - 1``. Labels are dense
+        ints numbered per round, so equal labels within a round mean equal
+        upstream trees. Stops early once a round no longer splits any class,
+        or before starting a round past ``deadline`` (a ``perf_counter`` value).
+        
+        ``tables`` (a list) receives each round's signature -> label table,
+        so nodes of a later revision can be labelled consistently; the
+        labels of the round that stopped refinement are then returned too.
+        """
+        model = self.model
+        wire_src = model.wire_src
+        in_offsets, in_wires = self.in_offsets, self.in_wires
+        # Port key per wire: index when known, else name
+        port_keys = [
+            ((0, dst_port) if dst_port >= 0 else (1, dst_name),
+             (0, src_port) if src_port >= 0 else (1, src_name))
+            for src_port, dst_port, src_name, dst_name in zip(
+                model.wire_src_port, model.wire_dst_port, model.wire_src_names, model.wire_dst_names)
+        ]
+        
+        labels = [array("i", initial)]
+        classes = len(set(labels[0]))
+        for _ in range(rounds):
+            if deadline is not None and perf_counter() > deadline:
+                break
+            prev = labels[-1]
+            table = {}
+            if tables is not None:
+                tables.append(table)
+            current = array("i", bytes(4 * self.n))
+            for v in range(self.n):
+                start, end = in_offsets[v], in_offsets[v + 1]
+                if start == end:
+                    signature = (prev[v],)
+                else:
+                    signature = (prev[v], tuple(sorted(
+                        (port_keys[w], prev[wire_src[w]]) for w in in_wires[start:end])))
+                current[v] = table.setdefault(signature, len(table))
+            if len(table) == classes:
+                if tables is not None:
+                    labels.append(current)
+                break
+            classes = len(table)
+            labels.append(current)
+        return labels
+    
+    def relabel(self, labels: List[array], tables: List[Dict[Tuple, int]], nodes) -> None:
+        """Recompute rounds 1 and up of ``neighborhood_labels`` output for ``nodes``, in place
+        
+        ``labels[0]`` must already hold the nodes' initial labels and
+        ``tables`` the signature tables of the run that produced the other
+        rounds. ``nodes`` must include every node whose upstream
+        neighbourhood changed within ``len(labels) - 1`` wires.
+        """
+        wire_src = self.model.wire_src
+        in_offsets, in_wires = self.in_offsets, self.in_wires
+        port_keys = {w: self.port_key(w) for v in nodes for w in in_wires[in_offsets[v]:in_offsets[v + 1]]}
+        for r in range(1, len(labels)):
+            prev, current, table = labels[r - 1], labels[r], tables[r - 1]
+            for v in nodes:
+                start, end = in_offsets[v], in_offsets[v + 1]
+                if start == end:
+                    signature = (prev[v],)
+                else:
+                    signature = (prev[v], tuple(sorted(
+                        (port_keys[w], prev[wire_src[w]]) for w in in_wires[start:end])))
+                current[v] = table.setdefault(signature, len(table))
+    
+    def port_key(self, w: int) -> Tuple:
+        """(target port, source port) of wire ``w`` as refinement signatures use them"""
+        model = self.model
+        src_port, dst_port = model.wire_src_port[w], model.wire_dst_port[w]
+        return ((0, dst_port) if dst_port >= 0 else (1, model.wire_dst_names[w]),
+                (0, src_port) if src_port >= 0 else (1, model.wire_src_names[w]))
+
+    def downstream_within(self, seeds, hops: int) -> Dict[int, int]:
+        """Node ids reachable from any of ``seeds`` along the wires in at
+        most ``hops`` steps (seeds included), with the steps from the nearest seed"""
+        out_offsets, out_wires, wire_dst = self.out_offsets, self.out_wires, self.model.wire_dst
+        seen = dict.fromkeys(seeds, 0)
+        frontier = list(seen)
+        for step in range(1, hops + 1):
+            next_frontier = []
+            for u in frontier:
+                for k in range(out_offsets[u], out_offsets[u + 1]):
+                    t = wire_dst[out_wires[k]]
+                    if t not in seen:
+                        seen[t] = step
+                        next_frontier.append(t)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return seen
+    
+    def upstream_depth(self, v: int, limit: int, memo: Optional[Dict[Tuple[int, int], int]] = None) -> int:
+        """Nodes on the longest wire path ending at ``v``, capped at ``limit``
+        
+        Equals ``min(limit, longest_paths(unit weights)[0][v])`` for nodes
+        not on or behind a cycle, looking only ``limit`` wires upstream.
+        ``memo`` can be shared between calls on the same graph.
+        """
+        if memo is None:
+            memo = {}
+        in_offsets, in_wires, wire_src = self.in_offsets, self.in_wires, self.model.wire_src
+        
+        def depth(u, k):
+            if k <= 1 or in_offsets[u] == in_offsets[u + 1]:
+                return 1
+            found = memo.get((u, k))
+            if found is None:
+                found = 1
+                for w in in_wires[in_offsets[u]:in_offsets[u + 1]]:
+                    found = max(found, 1 + depth(wire_src[w], k - 1))
+                    if found == k:
+                        break
+                memo[(u, k)] = found
+            return found
+        
+        return depth(v, limit)
+    
+    def upstream_within(self, v: int, hops: int) -> List[int]:
+        """Node ids reachable from ``v`` against the wires in at most ``hops`` steps (``v`` first)"""
+        in_offsets, in_wires, wire_src = self.in_offsets, self.in_wires, self.model.wire_src
+        seen = {v}
+        frontier = [v]
+        order = [v]
+        for _ in range(hops):
+            next_frontier = []
+            for u in frontier:
+                for k in range(in_offsets[u], in_offsets[u + 1]):
+                    s = wire_src[in_wires[k]]
+                    if s not in seen:
+                        seen.add(s)
+                        next_frontier.append(s)
+                        order.append(s)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        return order
+
+    def weakly_connected(self, labels: Optional[Sequence] = None) -> List[List[int]]:
+        """Node ids of every weakly connected part, each in id order
+
+        Wires with an unresolved endpoint connect nothing, nor do wires
+        between nodes with different ``labels`` (per node id) when given;
+        parts are ordered by their lowest node id.
+        """
+        n_nodes = self.model.n_nodes
+        parent = array("i", range(n_nodes))
+
+        def root(v):
+            while parent[v] != v:
+                parent[v] = parent[parent[v]]
+                v = parent[v]
+            return v
+
+        for u, v in zip(self.model.wire_src, self.model.wire_dst):
+            if u < n_nodes and v < n_nodes and (labels is None or labels[u] == labels[v]):
+                u, v = root(u), root(v)
+                if u != v:
+                    parent[max(u, v)] = min(u, v)
+        parts = {}
+        for v in range(n_nodes):
+            parts.setdefault(root(v), []).append(v)
+        return list(parts.values())
+
+    def strongly_connected(self) -> Tuple[array, List[List[int]]]:
+        """Strongly connected components (iterative Tarjan)
+        
+        Returns the component id of every node and the members of every
+        component. Components are numbered in reverse topological order:
+        a wire between two components always runs from the higher id to
+        the lower one.
+        """
+        n = self.n
+        out_offsets, out_wires, wire_dst = self.out_offsets, self.out_wires, self.model.wire_dst
+        index = array("i", [-1]) * n
+        low = array("i", bytes(4 * n))
+        comp = array("i", [-1]) * n
+        members = []
+        stack = []
+        counter = 0
+        for root in range(n):
+            if index[root] >= 0:
+                continue
+            # Frames of (node, next out-edge slot)
+            frames = [(root, out_offsets[root])]
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            while frames:
+                v, k = frames[-1]
+                if k < out_offsets[v + 1]:
+                    frames[-1] = (v, k + 1)
+                    w = wire_dst[out_wires[k]]
+                    if index[w] < 0:
+                        index[w] = low[w] = counter
+                        counter += 1
+                        stack.append(w)
+                        frames.append((w, out_offsets[w]))
+                    elif comp[w] < 0 and index[w] < low[v]:
+                        low[v] = index[w]
+                    continue
+                frames.pop()
+                if frames:
+                    u = frames[-1][0]
+                    if low[v] < low[u]:
+                        low[u] = low[v]
+                if low[v] == index[v]:
+                    group = []
+                    while True:
+                        w = stack.pop()
+                        comp[w] = len(members)
+                        group.append(w)
+                        if w == v:
+                            break
+                    members.append(group)
+        return comp, members
+    
+    def _condensation(self):
+        """Component ids, members and distinct successor/predecessor components"""
+        if self._scc is None:
+            comp, members = self.strongly_connected()
+            succ = [set() for _ in members]
+            pred = [set() for _ in members]
+            for src, dst in zip(self.model.wire_src, self.model.wire_dst):
+                a, b = comp[src], comp[dst]
+                if a != b:
+                    succ[a].add(b)
+                    pred[b].add(a)
+            self._scc = (comp, members, [tuple(s) for s in succ], [tuple(p) for p in pred])
+        return self._scc
+    
+    def _cone(self, c: int, forward: bool) -> Optional[int]:
+        """Bitset of the components reachable from component ``c`` (``c`` included)
+        
+        Downstream cones set bit ``id``; upstream cones set bit
+        ``last - id``, so both stay as short as the ids they can reach.
+        None once the memo is past ``CONE_MEMO_BITS``.
+        """
+        comp, members, succ, pred = self._condensation()
+        memo = self._cones[0 if forward else 1]
+        cone = memo.get(c)
+        if cone is not None or self._cone_bits > CONE_MEMO_BITS:
+            return cone
+        adjacent = succ if forward else pred
+        last = len(members) - 1
+        stack = [c]
+        while stack:
+            x = stack[-1]
+            if x in memo:
+                stack.pop()
+                continue
+            pending = [y for y in adjacent[x] if y not in memo]
+            if pending:
+                stack.extend(pending)
+                continue
+            bits = 1 << (x if forward else last - x)
+            for y in adjacent[x]:
+                bits |= memo[y]
+            memo[x] = bits
+            self._cone_bits += bits.bit_length()
+            if self._cone_bits > CONE_MEMO_BITS:
+                return None
+            stack.pop()
+        return memo[c]
+    
+    def _cone_components(self, c: int, forward: bool) -> List[int]:
+        """Components reachable from component ``c`` (``c`` included), from the memo or a search"""
+        comp, members, succ, pred = self._condensation()
+        cone = self._cone(c, forward)
+        if cone is None:
+            adjacent = succ if forward else pred
+            seen = {c}
+            queue = deque(seen)
+            while queue:
+                for y in adjacent[queue.popleft()]:
+                    if y not in seen:
+                        seen.add(y)
+                        queue.append(y)
+            return list(seen)
+        last = len(members) - 1
+        bits = bin(cone)[:1:-1]  # lowest bit first
+        found = []
+        i = bits.find("1")
+        while i >= 0:
+            found.append(i if forward else last - i)
+            i = bits.find("1", i + 1)
+        return found
+    
+    def _cone_nodes(self, v: int, forward: bool) -> List[int]:
+        comp, members, _, _ = self._condensation()
+        nodes = []
+        for c in self._cone_components(comp[v], forward):
+            nodes.extend(members[c])
+        nodes.remove(v)
+        nodes.sort()
+        return nodes
+    
+    def downstream(self, v: int) -> List[int]:
+        """Node ids reachable from ``v`` along the wires (``v`` itself excluded)"""
+        return self._cone_nodes(v, True)
+    
+    def upstream(self, v: int) -> List[int]:
+        """Node ids that reach ``v`` along the wires (``v`` itself excluded)"""
+        return self._cone_nodes(v, False)
+    
+    def find_cycles(self, leftover: bytearray) -> List[List[int]]:
+        """Disjoint cycles among the nodes ``topological_order`` left over
+        
+        Every leftover node has a leftover predecessor, so walking
+        predecessors from any of them must revisit a node; the revisited
+        stretch is a cycle. Each node is walked at most once.
+        """
+        cycles = []
+        seen = bytearray(self.n)
+        in_offsets, in_wires, wire_src = self.in_offsets, self.in_wires, self.model.wire_src
+        for start in itertools.compress(range(self.n), leftover):
+            if seen[start]:
+                continue
+            walk = {}
+            v = start
+            while v not in walk and not seen[v]:
+                walk[v] = len(walk)
+                for k in range(in_offsets[v], in_offsets[v + 1]):
+                    u = wire_src[in_wires[k]]
+                    if leftover[u]:
+                        break
+                v = u
+            if v in walk:
+                cycle = list(walk)[walk[v]:]
+                cycle.reverse()
+                cycles.append(cycle)
+            for u in walk:
+                seen[u] = 1
+        return cycles
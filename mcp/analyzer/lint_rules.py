@@ -164,6 +164,15 @@ LINT_RULES = {
         "description": "Components generating large preview geometry with preview enabled",
         "why_it_matters": "Preview generation can slow viewport interaction and canvas refresh",
         "how_to_fix": "Disable preview on heavy geometry components or use Custom Preview selectively"
+    },
+
+    "large_internalized_data": {
+        "id": "GH019",
+        "severity": "warning",
+        "title": "Large Internalized Data",
+        "description": "Internalized geometry or persistent data larger in total than the size threshold",
+        "why_it_matters": "Internalized data is stored as base64 in the file, making it large and slow to open and save",
+        "how_to_fix": "Reference geometry from Rhino or read data from external files instead of internalizing it"
     }
 }
 
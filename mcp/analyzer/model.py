@@ -0,0 +1,318 @@
+"""
+Compact Definition Model
+Slotted records and array columns for parsed GH definitions
+
+The JSON/GHX exports hold one dict per component, port and wire, repeating
+every key string. DefinitionModel keeps the same information as:
+
+- one ``NodeRecord`` (``__slots__``) per component or param, with interned
+  type/category/kind strings and ports as tuples of ``PortRecord`` tuples
+- node positions in ``array('d')`` columns indexed by node id
+- wires as ``array('i')`` columns of integer node ids and port indices
+
+Node ids are dense integers: components first, then params. Wire endpoints
+whose guid is not a node in the definition get an id past the last node so
+the graph stays integer-only; ``guids`` maps every id back to its guid.
+
+Dict views (``component_dicts``, ``wire_dicts``, ``to_dict``) rebuild the
+export format and are meant for JSON output only; ``DefinitionDict`` wraps
+them as a read-only mapping that builds each list once.
+"""
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Dict, List, Any, NamedTuple, Optional, Iterator
+
+
+_intern = sys.intern
+
+_NODE_KEYS = ("guid", "name", "type", "category", "subcategory", "pos", "group",
+              "inputs", "outputs", "param_kind")
+# Optional node keys; a bit in NodeRecord.absent marks a key the source lacked
+_OPTIONAL_KEYS = ("type", "category", "subcategory", "group", "param_kind")
+_ABSENT_BITS = {key: 1 << i for i, key in enumerate(_OPTIONAL_KEYS)}
+_PORT_KEYS = ("index", "name", "tree_access", "source_count", "recipient_count", "optional")
+_LIST_KEYS = ("components", "params", "wires")
+
+
+def _intern_str(value):
+    return _intern(value) if isinstance(value, str) else value
+
+
+def _extra(source: Dict[str, Any], known) -> Optional[Dict[str, Any]]:
+    """Keys not stored in slots, or None when there are none"""
+    if len(source) <= len(known):
+        if all(key in known for key in source):
+            return None
+    extra = {k: v for k, v in source.items() if k not in known}
+    return extra or None
+
+
+class PortRecord(NamedTuple):
+    """One component input or output
+
+    A tuple of its fields, so the ports of two revisions compare in C.
+    """
+
+    index: int
+    name: str
+    tree_access: Optional[str] = None
+    source_count: Optional[int] = None
+    recipient_count: Optional[int] = None
+    optional: Optional[bool] = None
+    extra: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_dict(cls, port: Dict[str, Any], position: int) -> "PortRecord":
+        return cls(port.get("index", position), _intern_str(port.get("name")),
+                   _intern_str(port.get("tree_access")), port.get("source_count"),
+                   port.get("recipient_count"), port.get("optional"), _extra(port, _PORT_KEYS))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style field access"""
+        if key in _PORT_KEYS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return self.extra.get(key, default) if self.extra else default
+
+    def to_dict(self) -> Dict[str, Any]:
+        port = {"index": self.index, "name": self.name}
+        for key in ("tree_access", "source_count", "recipient_count", "optional"):
+            value = getattr(self, key)
+            if value is not None:
+                port[key] = value
+        if self.extra:
+            port.update(self.extra)
+        return port
+
+
+class NodeRecord:
+    """One component (``inputs``/``outputs`` set) or param (``param_kind`` set)"""
+
+    __slots__ = ("id", "guid", "name", "type", "category", "subcategory", "group",
+                 "param_kind", "inputs", "outputs", "extra", "absent", "model")
+
+    def __init__(self, node_id: int, model: "DefinitionModel"):
+        self.id = node_id
+        self.model = model
+        self.guid = None
+        self.name = None
+        self.type = None
+        self.category = None
+        self.subcategory = None
+        self.group = None
+        self.param_kind = None
+        self.inputs = None
+        self.outputs = None
+        self.extra = None
+        self.absent = 0
+
+    @property
+    def is_component(self) -> bool:
+        return self.id < self.model.n_components
+
+    @property
+    def pos(self) -> List[float]:
+        return [self.model.xs[self.id], self.model.ys[self.id]]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style field access, matching the export dict"""
+        if key == "pos":
+            return self.pos
+        if key in _NODE_KEYS:
+            if self.absent & _ABSENT_BITS.get(key, 0):
+                return default
+            value = getattr(self, key)
+            return default if value is None and key in ("inputs", "outputs") else value
+        return self.extra.get(key, default) if self.extra else default
+
+    def to_dict(self) -> Dict[str, Any]:
+        node = {"guid": self.guid, "name": self.name, "pos": self.pos}
+        for key in _OPTIONAL_KEYS:
+            if not self.absent & _ABSENT_BITS[key]:
+                node[key] = getattr(self, key)
+        if self.inputs is not None:
+            node["inputs"] = [p.to_dict() for p in self.inputs]
+        if self.outputs is not None:
+            node["outputs"] = [p.to_dict() for p in self.outputs]
+        if self.extra:
+            node.update(self.extra)
+        return node
+
+
+class DefinitionModel:
+    """Compact in-memory model of a parsed definition"""
+
+    def __init__(self):
+        self.meta = {}
+        self.nodes = []
+        self.n_components = 0
+        self.guids = []
+        self.node_ids = {}
+        self.xs = array("d")
+        self.ys = array("d")
+        self.wire_src = array("i")
+        self.wire_src_port = array("i")
+        self.wire_dst = array("i")
+        self.wire_dst_port = array("i")
+        self.wire_src_names = []
+        self.wire_dst_names = []
+
+    # ---------- construction ----------
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DefinitionModel":
+        """Build the model from an export/GHX dict (the dict is not kept)"""
+        model = cls()
+        model.meta = {k: v for k, v in data.items() if k not in _LIST_KEYS}
+        components = data.get("components", [])
+        params = data.get("params", [])
+        model.n_components = len(components)
+        for comp in components:
+            model._add_node(comp, is_component=True)
+        for param in params:
+            model._add_node(param, is_component=False)
+        for wire in data.get("wires", []):
+            model._add_wire(wire)
+        return model
+
+    def _node_id(self, guid: str) -> int:
+        node_id = self.node_ids.get(guid)
+        if node_id is None:
+            node_id = len(self.guids)
+            self.guids.append(guid)
+            self.node_ids[guid] = node_id
+        return node_id
+
+    def _add_node(self, source: Dict[str, Any], is_component: bool):
+        node = NodeRecord(len(self.nodes), self)
+        guid = source.get("guid")
+        node.guid = guid
+        if guid not in self.node_ids:
+            self.node_ids[guid] = node.id
+        self.guids.append(guid)
+        node.name = _intern_str(source.get("name"))
+        for key in _OPTIONAL_KEYS:
+            if key in source:
+                setattr(node, key, _intern_str(source[key]))
+            else:
+                node.absent |= _ABSENT_BITS[key]
+        if is_component or "inputs" in source:
+            node.inputs = tuple(PortRecord.from_dict(p, i) for i, p in enumerate(source.get("inputs", [])))
+        if is_component or "outputs" in source:
+            node.outputs = tuple(PortRecord.from_dict(p, i) for i, p in enumerate(source.get("outputs", [])))
+        node.extra = _extra(source, _NODE_KEYS)
+        pos = source.get("pos") or (0.0, 0.0)
+        self.xs.append(float(pos[0]))
+        self.ys.append(float(pos[1]))
+        self.nodes.append(node)
+
+    def _add_wire(self, wire: Dict[str, Any]):
+        src = wire.get("from", {})
+        dst = wire.get("to", {})
+        self.wire_src.append(self._node_id(src.get("guid", "")))
+        self.wire_src_port.append(src.get("out_index", -1))
+        self.wire_src_names.append(_intern_str(src.get("out_name", "")))
+        self.wire_dst.append(self._node_id(dst.get("guid", "")))
+        self.wire_dst_port.append(dst.get("in_index", -1))
+        self.wire_dst_names.append(_intern_str(dst.get("in_name", "")))
+
+    # ---------- access ----------
+
+    @property
+    def n_nodes(self) -> int:
+        """Number of component and param records"""
+        return len(self.nodes)
+
+    @property
+    def n_ids(self) -> int:
+        """Size of the node id space (records plus unresolved wire endpoints)"""
+        return len(self.guids)
+
+    @property
+    def n_wires(self) -> int:
+        return len(self.wire_src)
+
+    @property
+    def components(self) -> List[NodeRecord]:
+        return self.nodes[:self.n_components]
+
+    @property
+    def params(self) -> List[NodeRecord]:
+        return self.nodes[self.n_components:]
+
+    def iter_components(self) -> Iterator[NodeRecord]:
+        for i in range(self.n_components):
+            yield self.nodes[i]
+
+    def iter_params(self) -> Iterator[NodeRecord]:
+        for i in range(self.n_components, len(self.nodes)):
+            yield self.nodes[i]
+
+    def node(self, guid: str) -> Optional[NodeRecord]:
+        """Node record for a guid, or None"""
+        node_id = self.node_ids.get(guid)
+        if node_id is None or node_id >= len(self.nodes):
+            return None
+        return self.nodes[node_id]
+
+    # ---------- dict views (JSON output) ----------
+
+    def component_dicts(self) -> List[Dict[str, Any]]:
+        return [node.to_dict() for node in self.iter_components()]
+
+    def param_dicts(self) -> List[Dict[str, Any]]:
+        return [node.to_dict() for node in self.iter_params()]
+
+    def wire_dict(self, i: int) -> Dict[str, Any]:
+        src = {"guid": self.guids[self.wire_src[i]]}
+        if self.wire_src_port[i] >= 0:
+            src["out_index"] = self.wire_src_port[i]
+        src["out_name"] = self.wire_src_names[i]
+        dst = {"guid": self.guids[self.wire_dst[i]], "in_name": self.wire_dst_names[i]}
+        if self.wire_dst_port[i] >= 0:
+            dst["in_index"] = self.wire_dst_port[i]
+        return {"from": src, "to": dst}
+
+    def wire_dicts(self) -> List[Dict[str, Any]]:
+        return [self.wire_dict(i) for i in range(self.n_wires)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Full export-format dict"""
+        data = dict(self.meta)
+        data["components"] = self.component_dicts()
+        data["params"] = self.param_dicts()
+        data["wires"] = self.wire_dicts()
+        return data
+
+
+class DefinitionDict(Mapping):
+    """Read-only export dict over a model
+    
+    Document keys come straight from ``meta``; ``components``, ``params``
+    and ``wires`` are built on first access and then kept, so repeated
+    reads cost nothing. ``dict(view)`` gives a plain (JSON-serializable)
+    dict.
+    """
+
+    def __init__(self, model: DefinitionModel):
+        self.model = model
+        self._lists = {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _LIST_KEYS:
+            value = self._lists.get(key)
+            if value is None:
+                value = self._lists[key] = getattr(self.model, key[:-1] + "_dicts")()
+            return value
+        return self.model.meta[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.model.meta
+        yield from _LIST_KEYS
+
+    def __len__(self) -> int:
+        return len(self.model.meta) + len(_LIST_KEYS)
+
+    def __contains__(self, key: object) -> bool:
+        return key in _LIST_KEYS or key in self.model.meta
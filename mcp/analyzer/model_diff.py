@@ -0,0 +1,377 @@
+"""
+Model Diff
+Structural difference between two revisions of a definition
+
+Nodes are matched by guid and wires by their endpoints and ports, so a
+diff can be computed between any two ``DefinitionModel``s and handed to
+``GHLinter.lint_incremental`` to re-check only what changed.
+"""
+from array import array
+from bisect import insort
+from itertools import compress, islice, repeat
+from operator import add, attrgetter, ge, gt, lt, ne, not_
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from weakref import WeakKeyDictionary
+
+from .model import DefinitionModel
+
+
+WireKey = Tuple[str, int, str, str, int, str]
+
+
+def wire_keys(model: DefinitionModel, wires: Optional[Iterable[int]] = None) -> List[WireKey]:
+    """(source guid, port, port name, target guid, port, port name) per wire, or per wire in ``wires``"""
+    wires = range(model.n_wires) if wires is None else list(wires)
+    guid = model.guids.__getitem__
+    return list(zip(map(guid, map(model.wire_src.__getitem__, wires)), map(model.wire_src_port.__getitem__, wires),
+                    map(model.wire_src_names.__getitem__, wires), map(guid, map(model.wire_dst.__getitem__, wires)),
+                    map(model.wire_dst_port.__getitem__, wires), map(model.wire_dst_names.__getitem__, wires)))
+
+
+_node_fields = attrgetter("name", "type", "category", "subcategory", "group", "param_kind", "absent", "extra")
+_inputs = attrgetter("inputs")
+_outputs = attrgetter("outputs")
+
+# Skips over dropped, inserted or replaced wires while pairing wires up in
+# place, and the most wires dropped or inserted at once in one skip
+ALIGN_STEPS = 16
+ALIGN_SKIP = 4
+
+
+# Node records per live model, so each revision builds its own only once
+_SIGNATURES: "WeakKeyDictionary[DefinitionModel, List[Tuple]]" = WeakKeyDictionary()
+
+
+def _signatures(model: DefinitionModel) -> List[Tuple]:
+    """Comparable record of each node's data, position and kind (component/param) aside
+
+    One tuple per node of its fields and its port tuples as they are
+    (``PortRecord``s are tuples too, so records compare in C), built with
+    ``map``/``zip`` on a model's first diff and kept while the model
+    lives, so diffing a revision against the next one reuses them. Models
+    are not modified once built.
+    """
+    signatures = _SIGNATURES.get(model)
+    if signatures is None:
+        nodes = model.nodes
+        signatures = _SIGNATURES[model] = list(zip(map(_node_fields, nodes), map(_inputs, nodes),
+                                                   map(_outputs, nodes)))
+    return signatures
+
+
+def _kept_runs(id_runs: List[Tuple[int, int]], n_old: int, n_new: int,
+               boundaries: Tuple[int, int]) -> List[Tuple[int, int, int]]:
+    """(old start, new start, length) of the runs of nodes kept in order,
+    from the id runs (see ``_runs``), split where either revision's
+    ``boundaries`` (component count) falls"""
+    kept = []
+    position = 0
+    for start, length in id_runs:
+        if 0 <= start < n_old and position < n_new:
+            i, j = start, position
+            stop = min(length, n_old - i, n_new - j)
+            cuts = sorted({0, stop} | {b - i for b in boundaries[:1] if 0 < b - i < stop}
+                          | {b - j for b in boundaries[1:] if 0 < b - j < stop})
+            kept.extend((i + lo, j + lo, hi - lo) for lo, hi in zip(cuts, cuts[1:]))
+        position += length
+    return kept
+
+
+def _differing(runs: List[Tuple[int, int, int]], same: Callable[[int, int, int], bool]) -> List[int]:
+    """New indices in ``runs`` at which ``same(old start, new start, 1)`` fails
+
+    ``same`` compares whole spans (slices compare in C), and spans that
+    differ are halved until the differing indices are found.
+    """
+    found = []
+    stack = list(reversed(runs))
+    while stack:
+        i, j, length = stack.pop()
+        if not length or same(i, j, length):
+            continue
+        if length == 1:
+            found.append(j)
+            continue
+        half = length // 2
+        stack.append((i + half, j + half, length - half))
+        stack.append((i, j, half))
+    return found
+
+
+def _wire_columns(model: DefinitionModel, ids: Optional[array] = None) -> Tuple:
+    """Wire endpoint and port columns, endpoints translated through ``ids`` when given"""
+    src, dst = model.wire_src, model.wire_dst
+    if ids is not None:
+        src, dst = array("i", map(ids.__getitem__, src)), array("i", map(ids.__getitem__, dst))
+    return src, model.wire_src_port, model.wire_src_names, dst, model.wire_dst_port, model.wire_dst_names
+
+
+def _run_length(old_columns: Tuple, new_columns: Tuple, i: int, j: int, limit: int,
+                backwards: bool = False) -> int:
+    """Number of equal wires from old index ``i`` and new index ``j`` on
+    (or back from them, exclusive, when ``backwards``), at most ``limit``
+
+    Column slices compare in C (array buffers, interned strings by
+    identity), so the end of the run is found by bisecting on slices.
+    """
+    for a, b in zip(old_columns, new_columns):
+        if limit <= 0:
+            return 0
+        if backwards:
+            def same(lo, hi):
+                return a[i - hi:i - lo] == b[j - hi:j - lo]
+        else:
+            def same(lo, hi):
+                return a[i + lo:i + hi] == b[j + lo:j + hi]
+        if not same(0, limit):
+            lo, hi = 0, limit
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if same(lo, mid):
+                    lo = mid
+                else:
+                    hi = mid
+            limit = lo
+    return limit
+
+
+def _runs(origin: array) -> List[Tuple[int, int]]:
+    """(first old index or -1 for new ones, length) of each run of consecutive new indices"""
+    n = len(origin)
+    # A run breaks where the old index does not follow on from the previous
+    # one, and after new indices (-1, which 0 would otherwise follow on from)
+    starts = list(compress(range(1, n), map(ne, islice(origin, 1, None), map(add, origin, repeat(1)))))
+    if 0 in origin and origin.index(0) > 0:
+        insort(starts, origin.index(0))
+    bounds = [0] + starts
+    return [(origin[i], j - i) for i, j in zip(bounds, starts + [n]) if j > i]
+
+
+def _carry(values, missing, runs: List[Tuple[int, int]]):
+    """``values`` re-indexed along ``runs`` (see ``_runs``), ``missing`` for new indices"""
+    carried = values[:0]
+    for start, length in runs:
+        if start < 0:
+            carried.extend(repeat(missing, length))
+        else:
+            carried += values[start:start + length]
+    return carried
+
+
+class ModelDiff:
+    """What changed from one revision of a definition to the next
+
+    Node sets hold guids: ``added``/``removed`` nodes, ``changed`` nodes
+    (any field or port other than the position) and ``moved`` nodes
+    (position only). Wires are ``WireKey`` lists; for the wires present in
+    both revisions ``wire_map`` holds the new index of each old wire and
+    ``wire_origin`` the old index of each new one (-1 for wires present in
+    only one revision), and ``wires_added_at``/``wires_removed_at`` the
+    indices of the added (new) and removed (old) wires. ``node_map`` and
+    ``node_origin`` do the same for node ids, unresolved wire endpoints
+    included. ``reordered`` is set when
+    unchanged nodes or wires appear in a different relative order, which
+    results ordered by walk order cannot carry over.
+    """
+
+    __slots__ = ("added", "removed", "changed", "moved", "wires_added", "wires_removed",
+                 "wires_added_at", "wires_removed_at", "wire_map", "wire_origin", "node_map", "node_origin",
+                 "reordered", "_runs", "_wire_runs")
+
+    def __init__(self):
+        self.added: Set[str] = set()
+        self.removed: Set[str] = set()
+        self.changed: Set[str] = set()
+        self.moved: Set[str] = set()
+        self.wires_added: List[WireKey] = []
+        self.wires_removed: List[WireKey] = []
+        self.wires_added_at: List[int] = []
+        self.wires_removed_at: List[int] = []
+        self.wire_map = array("i")
+        self.wire_origin = array("i")
+        self.node_map = array("i")
+        self.node_origin = array("i")
+        self.reordered = False
+        self._runs = None
+        self._wire_runs = None
+
+    @property
+    def empty(self) -> bool:
+        return not (self.added or self.removed or self.changed or self.moved
+                    or self.wires_added or self.wires_removed or self.reordered)
+
+    @property
+    def moves_only(self) -> bool:
+        """Whether only positions changed, so node ids, wires and node data are as before"""
+        return not (self.added or self.removed or self.changed
+                    or self.wires_added or self.wires_removed or self.reordered)
+
+    @property
+    def rewired(self) -> Set[str]:
+        """Guids at either end of an added or removed wire (including endpoints that are not nodes)"""
+        rewired = set()
+        for wire in self.wires_added + self.wires_removed:
+            rewired.add(wire[0])
+            rewired.add(wire[3])
+        return rewired
+
+    @property
+    def touched(self) -> Set[str]:
+        """Guids whose own data, position or wires changed"""
+        return self.added | self.changed | self.moved | self.rewired
+
+    def carry(self, values, missing=0, ids: bool = False):
+        """Per-id ``values`` (an array or list) of the old revision re-indexed by new ids
+
+        New ids get ``missing``. With ``ids`` the values are node ids
+        themselves (-1 for none) and are translated too. Values are copied
+        a slice at a time along the runs of ids kept in order.
+        """
+        if self._runs is None:
+            self._runs = _runs(self.node_origin)
+        carried = _carry(values, missing, self._runs)
+        if ids and self._runs != [(0, len(self.node_map))]:
+            moves = self.node_map + array("i", [-1])
+            carried = array(values.typecode, map(moves.__getitem__, carried))
+        return carried
+
+    def carry_wires(self, values, missing=0):
+        """Per-wire ``values`` of the old revision re-indexed by new wire indices, as ``carry``"""
+        if self._wire_runs is None:
+            self._wire_runs = _runs(self.wire_origin)
+        return _carry(values, missing, self._wire_runs)
+
+    def shifted_wires(self) -> Iterator[Tuple[int, int]]:
+        """(first new index, length) of each run of kept wires whose index changed"""
+        if self._wire_runs is None:
+            self._wire_runs = _runs(self.wire_origin)
+        position = 0
+        for start, length in self._wire_runs:
+            if 0 <= start != position:
+                yield position, length
+            position += length
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "added": len(self.added),
+            "removed": len(self.removed),
+            "changed": len(self.changed),
+            "moved": len(self.moved),
+            "wires_added": len(self.wires_added),
+            "wires_removed": len(self.wires_removed)
+        }
+
+
+def diff_models(old: DefinitionModel, new: DefinitionModel) -> Optional[ModelDiff]:
+    """Diff two revisions; None when either repeats a node guid (nodes cannot be matched)
+
+    Kept nodes and wires compare as whole slices along the runs kept in
+    order, and the rest runs through ``map``/``compress``, so a 50k-node
+    diff stays well under the cost of an incremental lint.
+    """
+    if len(old.node_ids) < old.n_ids or len(new.node_ids) < new.n_ids:
+        return None
+    diff = ModelDiff()
+    n_old, n_new = old.n_nodes, new.n_nodes
+    old_guids, new_guids = old.guids[:n_old], new.guids[:n_new]
+    matched = list(map(old.node_ids.get, new_guids, repeat(n_old)))
+    kept = list(map(lt, matched, repeat(n_old)))
+    if all(kept):
+        new_kept, old_kept = list(range(n_new)), matched
+    else:
+        diff.added = set(compress(new_guids, map(not_, kept)))
+        new_kept, old_kept = list(compress(range(n_new), kept)), list(compress(matched, kept))
+    diff.reordered = any(map(gt, old_kept, islice(old_kept, 1, None)))
+    if len(old_kept) < n_old:
+        diff.removed = set(compress(old_guids, map(ge, map(new.node_ids.get, old_guids, repeat(n_new)),
+                                                   repeat(n_new))))
+
+    diff.node_origin = array("i", map(old.node_ids.get, new.guids, repeat(-1)))
+    diff.node_map = array("i", map(new.node_ids.get, old.guids, repeat(-1)))
+
+    # Kept nodes compare a run at a time; a node changing kind starts a run of its own
+    diff._runs = _runs(diff.node_origin)
+    runs = _kept_runs(diff._runs, n_old, n_new, (old.n_components, new.n_components))
+    old_signatures, new_signatures = _signatures(old), _signatures(new)
+
+    def same_data(i, j, length):
+        if (i < old.n_components) != (j < new.n_components):
+            return False
+        return old_signatures[i:i + length] == new_signatures[j:j + length]
+
+    def same_position(i, j, length):
+        return old.xs[i:i + length] == new.xs[j:j + length] and old.ys[i:i + length] == new.ys[j:j + length]
+
+    diff.changed = set(map(new_guids.__getitem__, _differing(runs, same_data)))
+    diff.moved = set(map(new_guids.__getitem__, _differing(runs, same_position)))
+
+    # Wires pair up in place along equal runs: the common prefix and
+    # suffix, then runs resumed past a few dropped or inserted wires or one
+    # replaced wire (at most ALIGN_STEPS times). Wires left in the gaps between runs match
+    # as multisets gap by gap, repeated keys pairing up in order; a wire
+    # moved out of its gap is removed and added.
+    n_old_wires, n_new_wires = old.n_wires, new.n_wires
+    # Endpoints compare as ids once old ids are translated to new ones
+    # (equal guids, equal ids), which is needed only when the ids differ
+    same_ids = old.guids == new.guids
+    old_columns = _wire_columns(old, None if same_ids else array("i", map(new.node_ids.get, old.guids, repeat(-1))))
+    new_columns = _wire_columns(new)
+    wire_map = diff.wire_map = array("i", [-1]) * n_old_wires
+    wire_origin = diff.wire_origin = array("i", [-1]) * n_new_wires
+
+    runs = []
+
+    def pair(i, j, run):
+        runs.append((i, j, run))
+        wire_map[i:i + run] = array("i", range(j, j + run))
+        wire_origin[j:j + run] = array("i", range(i, i + run))
+
+    shorter = min(n_old_wires, n_new_wires)
+    head = _run_length(old_columns, new_columns, 0, 0, shorter)
+    tail = _run_length(old_columns, new_columns, n_old_wires, n_new_wires, shorter - head, backwards=True)
+    old_end, new_end = n_old_wires - tail, n_new_wires - tail
+    pair(0, 0, head)
+    i = j = head
+    for _ in range(ALIGN_STEPS):
+        if i == old_end or j == new_end:
+            break
+        for skip in range(1, ALIGN_SKIP + 1):
+            dropped = _run_length(old_columns, new_columns, i + skip, j, min(old_end - i - skip, new_end - j))
+            inserted = _run_length(old_columns, new_columns, i, j + skip, min(old_end - i, new_end - j - skip))
+            if dropped or inserted:
+                break
+        if dropped >= inserted > 0 or dropped > inserted:
+            i, run = i + skip, dropped
+        elif inserted:
+            j, run = j + skip, inserted
+        else:
+            # Both wires differ: a replaced wire
+            i, j = i + 1, j + 1
+            run = _run_length(old_columns, new_columns, i, j, min(old_end - i, new_end - j))
+        pair(i, j, run)
+        i, j = i + run, j + run
+    pair(old_end, new_end, tail)
+
+    # Gaps between the runs
+    for (i, j, run), (old_stop, new_stop, _) in zip(runs, runs[1:]):
+        i, j = i + run, j + run
+        if i == old_stop or j == new_stop:
+            continue
+        unmatched: Dict[WireKey, List[int]] = {}
+        for k, key in zip(range(old_stop - 1, i - 1, -1), reversed(wire_keys(old, range(i, old_stop)))):
+            unmatched.setdefault(key, []).append(k)
+        last = -1
+        for k, key in enumerate(wire_keys(new, range(j, new_stop)), j):
+            stack = unmatched.get(key)
+            if stack:
+                matched_wire = stack.pop()
+                if matched_wire < last:
+                    diff.reordered = True
+                last = matched_wire
+                wire_map[matched_wire] = k
+                wire_origin[k] = matched_wire
+    diff.wires_added_at = list(compress(range(n_new_wires), map(lt, wire_origin, repeat(0))))
+    diff.wires_removed_at = list(compress(range(n_old_wires), map(lt, wire_map, repeat(0))))
+    diff.wires_added = wire_keys(new, diff.wires_added_at)
+    diff.wires_removed = wire_keys(old, diff.wires_removed_at)
+    return diff
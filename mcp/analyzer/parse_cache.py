@@ -0,0 +1,197 @@
+"""
+Persistent Parse Cache
+Stores parsed definition models on disk so repeated tool calls skip parsing
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+from typing import Dict, Any, Optional
+
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "gh-analyzer")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Modules whose code shapes the cached model; editing any of them
+# changes the version stamp and invalidates every entry
+_PARSER_MODULES = ("ghx_parser.py", "gh_archive.py", "parse_cache.py")
+
+# Bump when the entry layout itself changes
+_ENTRY_FORMAT = 1
+
+
+def parser_version() -> str:
+    """Version stamp derived from the parser sources"""
+    digest = hashlib.sha1(str(_ENTRY_FORMAT).encode())
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in _PARSER_MODULES:
+        try:
+            with open(os.path.join(here, name), "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(name.encode())
+    return digest.hexdigest()[:16]
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DiskCache:
+    """Directory of pickled entries with least-recently-used eviction
+
+    Entries are written atomically; once the directory grows past
+    ``max_bytes`` the least recently used ones are removed. A read
+    refreshes the entry's mtime, which serves as its last-use time.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _entry_path(self, identity) -> str:
+        key = hashlib.sha1(repr(identity).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, key + ".pickle")
+
+    def _read(self, entry_path: str) -> Optional[Dict[str, Any]]:
+        """The entry at ``entry_path``, or None when missing or unreadable"""
+        try:
+            with open(entry_path, "rb") as f:
+                entry = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError,
+                ImportError, IndexError, KeyError, TypeError):
+            # Truncated, damaged or written by an incompatible version
+            return None
+        if not isinstance(entry, dict):
+            return None
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return entry
+
+    def _write(self, entry_path: str, entry: Dict[str, Any], evict: bool = True):
+        """Store an entry; ``evict=False`` leaves trimming to a later ``_evict``"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry_path)
+        except OSError:
+            self._remove(tmp_path)
+            return
+        if evict:
+            self._evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".pickle"):
+                continue
+            entry_path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(entry_path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry_path))
+        return entries
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits max_bytes"""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for _, size, entry_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(entry_path)
+            total -= size
+            self.evictions += 1
+
+    def _remove(self, entry_path: str):
+        try:
+            os.remove(entry_path)
+        except OSError:
+            pass
+
+    def clear(self):
+        """Remove every cache entry"""
+        for _, _, entry_path in self._entries():
+            self._remove(entry_path)
+
+
+class ParseCache(DiskCache):
+    """On-disk cache of parsed definitions keyed by file identity
+
+    An entry is keyed by absolute path, size, mtime, format and the parser
+    version stamp, and holds the pickled model. With ``verify_hash=True`` a
+    hit also re-hashes the file and is rejected if the content changed
+    (covers tools that rewrite files without touching mtime).
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 verify_hash: bool = False):
+        super().__init__(cache_dir, max_bytes)
+        self.verify_hash = verify_hash
+        self.version = parser_version()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _identity(self, path: str, format_type: str):
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns, format_type, self.version)
+
+    def get(self, path: str, format_type: str) -> Optional[Dict[str, Any]]:
+        """Return the cached model for a file, or None on a miss"""
+        identity = self._identity(path, format_type)
+        entry_path = self._entry_path(identity)
+        entry = self._read(entry_path)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.get("identity") != identity or (
+                self.verify_hash and entry.get("hash") != file_hash(path)):
+            self.invalidations += 1
+            self.misses += 1
+            self._remove(entry_path)
+            return None
+
+        self.hits += 1
+        return entry["data"]
+
+    def put(self, path: str, format_type: str, data: Dict[str, Any]):
+        """Store a parsed model for a file"""
+        identity = self._identity(path, format_type)
+        entry = {
+            "identity": identity,
+            "hash": file_hash(path) if self.verify_hash else None,
+            "data": data
+        }
+        self._write(self._entry_path(identity), entry)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            "cache_dir": self.cache_dir,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes
+        }
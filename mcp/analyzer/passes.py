@@ -0,0 +1,438 @@
+"""
+Graph Passes
+Single-walk analyses run through DefinitionGraph.traverse
+
+Each pass is a ``GraphVisitor``; the analyzer memoizes results by the
+pass ``key`` and runs every pending pass (plus any lint rule visitors) in
+one shared traversal. Per-node passes are ``LocalVisitor``s, which an
+analyzer following an earlier revision updates instead of re-running.
+"""
+import itertools
+from array import array
+from bisect import bisect_left
+from collections import Counter, deque
+from itertools import compress
+from operator import itemgetter, not_
+from typing import Dict, List, Any, Tuple
+
+from .graph import GraphVisitor, LocalVisitor
+
+
+_guid = itemgetter("guid")
+
+# Data-tree components and the operation each one counts as
+TREE_COMPONENTS = {
+    "Flatten Tree": "flatten",
+    "Graft Tree": "graft",
+    "Simplify Tree": "simplify",
+    "Flip Matrix": "flip",
+    "Path Mapper": "restructure",
+    "Shift Paths": "restructure",
+    "Trim Tree": "restructure",
+    "Explode Tree": "restructure",
+    "Unflatten Tree": "restructure",
+    "Entwine": "restructure",
+    "Clean Tree": "restructure",
+    "Prune Tree": "restructure",
+    "Match Tree": "restructure"
+}
+
+
+def find_port(ports, index: int, name: str):
+    """Port record by wire port index, falling back to name"""
+    if ports:
+        if 0 <= index < len(ports) and ports[index].index == index:
+            return ports[index]
+        for port in ports:
+            if port.name == name:
+                return port
+    return None
+
+
+def tree_operations(node) -> Counter:
+    """Flatten/graft/simplify/reverse flags on a node's params, plus tree components"""
+    ops = Counter()
+    ports = list(node.inputs or ()) + list(node.outputs or ())
+    for settings in ports + ([node] if node.inputs is None else []):
+        mapping = settings.get('mapping')
+        if mapping:
+            ops[mapping.lower()] += 1
+        if settings.get('simplify'):
+            ops["simplify"] += 1
+        if settings.get('reverse'):
+            ops["reverse"] += 1
+    for label in (node.name, node.get('type')):
+        operation = TREE_COMPONENTS.get(label)
+        if operation:
+            ops[operation] += 1
+            break
+    return ops
+
+
+class DanglingPorts(LocalVisitor):
+    """Unconnected component inputs and outputs
+
+    Each component marks the ports its own wires use, by port index or,
+    for wires without one, every port with a matching name. Inputs report
+    ``optional`` when the source recorded it. Findings are the unconnected
+    input and output positions.
+    """
+
+    cacheable = True
+    # The finished lists, patched by the next revision's pass
+    result = None
+
+    def begin(self, graph):
+        super().begin(graph)
+        self.previous = None
+
+    @staticmethod
+    def _unconnected(ports, wires, indices, names) -> List[int]:
+        if not ports:
+            return []
+        marks = bytearray(len(ports))
+        for w in wires:
+            index = indices[w]
+            if 0 <= index < len(ports):
+                marks[index] = 1
+            else:
+                name = names[w]
+                for position, port in enumerate(ports):
+                    if port.name == name:
+                        marks[position] = 1
+        return [position for position in range(len(ports)) if not marks[position]]
+
+    def contribute(self, v, node):
+        if not node.is_component:
+            return None
+        graph, model = self.graph, self.graph.model
+        inputs = self._unconnected(node.inputs, graph.in_edges(v), model.wire_dst_port, model.wire_dst_names)
+        outputs = self._unconnected(node.outputs, graph.out_edges(v), model.wire_src_port, model.wire_src_names)
+        if inputs or outputs:
+            return inputs, outputs
+        return None
+
+    def update(self, graph, previous, diff) -> bool:
+        super().update(graph, previous, diff)
+        # Without a change of node order the previous lists are patched in place
+        self.previous = None if diff.reordered else previous.result
+        return True
+
+    def _items(self, v: int, inputs: List[int], outputs: List[int]) -> Tuple[List, List]:
+        node = self.graph.model.nodes[v]
+        dangling_in = []
+        for position in inputs:
+            inp = node.inputs[position]
+            item = {
+                "component": node.name,
+                "guid": node.guid,
+                "input": inp.name,
+                "index": inp.index,
+                "pos": node.pos
+            }
+            if inp.optional is not None:
+                item["optional"] = inp.optional
+            dangling_in.append(item)
+        dangling_out = [{
+            "component": node.name,
+            "guid": node.guid,
+            "output": node.outputs[position].name,
+            "index": node.outputs[position].index,
+            "pos": node.pos
+        } for position in outputs]
+        return dangling_in, dangling_out
+
+    def finish(self) -> Dict[str, List[Dict[str, Any]]]:
+        if self.previous is None:
+            dangling_in = []
+            dangling_out = []
+            for v, (inputs, outputs) in self.ordered():
+                found_in, found_out = self._items(v, inputs, outputs)
+                dangling_in.extend(found_in)
+                dangling_out.extend(found_out)
+        else:
+            # Drop the revisited nodes' items, then slot their new ones in by node id
+            model, revisited = self.graph.model, self.revisited
+            node_ids = model.node_ids
+            dangling_in, dangling_out = (list(compress(items, map(not_, map(revisited.__contains__, map(_guid, items)))))
+                                         for items in (self.previous["inputs"], self.previous["outputs"]))
+            for v in sorted(map(node_ids.__getitem__, revisited & self.findings.keys())):
+                found = self._items(v, *self.findings[model.guids[v]])
+                for items, node_items in zip((dangling_in, dangling_out), found):
+                    position = bisect_left(items, v, key=lambda item: node_ids[item["guid"]])
+                    items[position:position] = node_items
+        self.result = {"inputs": dangling_in, "outputs": dangling_out}
+        return self.result
+
+
+class UnnamedParams(LocalVisitor):
+    """Panels/sliders without custom names"""
+
+    cacheable = True
+
+    def contribute(self, v, node):
+        if node.is_component:
+            return None
+        name = node.get('name', '')
+        param_kind = node.get('param_kind', '')
+
+        # Check if name is default/generic
+        if not name or name == param_kind or name.startswith('Number Slider') or name.startswith('Panel'):
+            return True
+        return None
+
+    def finish(self) -> List[Dict[str, Any]]:
+        nodes = self.graph.model.nodes
+        return [{
+            "type": nodes[v].get('param_kind', ''),
+            "name": nodes[v].get('name', ''),
+            "guid": nodes[v].guid,
+            "pos": nodes[v].pos
+        } for v, _ in self.ordered()]
+
+
+class InternalizedData(LocalVisitor):
+    """Internalized data totals and the ``top`` largest carriers by decoded size
+
+    Uses the per-object ``internalized`` byte counts recorded by the
+    GHX/GH parser; JSON exports carry none and report zero.
+    """
+
+    cacheable = True
+
+    def __init__(self, top: int = 10):
+        self.top = top
+
+    @property
+    def key(self) -> Tuple:
+        return ("InternalizedData", self.top)
+
+    def contribute(self, v, node):
+        return node.get('internalized') or None
+
+    def finish(self) -> Dict[str, Any]:
+        carriers = self.ordered()
+        carriers.sort(key=lambda c: (-c[1].get('decoded_bytes', 0), c[0]))
+        nodes = self.graph.model.nodes
+        return {
+            "objects": len(carriers),
+            "encoded_bytes": sum(i.get('encoded_bytes', 0) for _, i in carriers),
+            "decoded_bytes": sum(i.get('decoded_bytes', 0) for _, i in carriers),
+            "top": [{
+                "component": nodes[v].name,
+                "guid": nodes[v].guid,
+                "decoded_bytes": internalized.get('decoded_bytes', 0),
+                "encoded_bytes": internalized.get('encoded_bytes', 0),
+                "items": internalized.get('items', {}),
+                "pos": nodes[v].pos
+            } for v, internalized in carriers[:self.top]]
+        }
+
+
+class TimedNodes(LocalVisitor):
+    """(node, time_ms) for every object the export timed, slowest first"""
+
+    def contribute(self, v, node):
+        return node.get('time_ms') or None
+
+    def finish(self) -> List[Tuple[Any, float]]:
+        timed = self.ordered()
+        timed.sort(key=lambda t: -t[1])
+        nodes = self.graph.model.nodes
+        return [(nodes[v], time_ms) for v, time_ms in timed]
+
+
+class MixedAccess(LocalVisitor):
+    """Wires with tree access at exactly one end, listed under their target
+
+    Missing access means item, the value GH leaves unwritten. Findings
+    are (position among the target's incoming wires, source access,
+    target access).
+    """
+
+    reads_sources = True
+    cacheable = True
+
+    @staticmethod
+    def _access(node, ports, index, name):
+        port = find_port(ports, index, name) if node.inputs is not None else node
+        return ((port.get('tree_access') if port is not None else None) or 'item').lower()
+
+    def contribute(self, v, node):
+        model = self.graph.model
+        n_nodes = model.n_nodes
+        mixed = []
+        for position, w in enumerate(self.graph.in_edges(v)):
+            src = model.wire_src[w]
+            if src >= n_nodes:
+                continue
+            source = model.nodes[src]
+            src_access = self._access(source, source.outputs, model.wire_src_port[w], model.wire_src_names[w])
+            dst_access = self._access(node, node.inputs, model.wire_dst_port[w], model.wire_dst_names[w])
+            if (src_access == 'tree') != (dst_access == 'tree'):
+                mixed.append((position, src_access, dst_access))
+        return mixed or None
+
+    def finish(self) -> List[Dict[str, Any]]:
+        graph, model = self.graph, self.graph.model
+        items = []
+        for v, mixed in self.ordered():
+            node, wires = model.nodes[v], graph.in_edges(v)
+            for position, src_access, dst_access in mixed:
+                w = wires[position]
+                source = model.nodes[model.wire_src[w]]
+                items.append({
+                    "from": source.name,
+                    "to": node.name,
+                    "from_guid": source.guid,
+                    "to_guid": node.guid,
+                    "from_access": src_access,
+                    "to_access": dst_access,
+                    "input": model.wire_dst_names[w]
+                })
+        return items
+
+
+class TreeOperations(GraphVisitor):
+    """Data-tree churn, visiting nodes in Kahn order
+
+    Each node counts its own tree operations (flatten/graft/simplify/
+    reverse flags on its params, or being a tree component) and adds the
+    largest operation count among its incoming wires' sources, so
+    ``chain`` is the most tree operations on any chain ending there.
+
+    Hotspots are nodes with operations whose chain reaches
+    ``min_chain_operations``, minus those already on a reported
+    hotspot's chain; ranked by chain count, then by solve time when the
+    export recorded ``time_ms``, then by node id. Each lists the
+    operating nodes on its chain.
+    """
+
+    topological = True
+
+    def __init__(self, min_chain_operations: int = 3):
+        self.min_chain_operations = min_chain_operations
+
+    @property
+    def key(self) -> Tuple:
+        return ("TreeOperations", self.min_chain_operations)
+
+    def begin(self, graph):
+        self.model = graph.model
+        self.n = graph.n
+        self.own = {}
+        self.own_count = {}
+        self.totals = Counter()
+        self.chain = array('i', bytes(4 * graph.n))
+        self.parent = array('i', [-1]) * graph.n
+
+    def visit_node(self, v, node):
+        ops = tree_operations(node)
+        if ops:
+            self.own[v] = ops
+            self.totals.update(ops)
+            self.chain[v] = self.own_count[v] = sum(ops.values())
+
+    def visit_edge(self, w, src, dst):
+        chain = self.chain
+        candidate = chain[src] + self.own_count.get(dst, 0)
+        if candidate > chain[dst]:
+            chain[dst] = candidate
+            self.parent[dst] = src
+
+    def update(self, graph, previous, diff):
+        """Carry the chains over and redo only the nodes a change reaches
+
+        Changed and added nodes recount their own operations; they and
+        every rewired node then take the best of their sources again, and
+        so on downstream while chains keep changing. Gives up when wires
+        were reordered (ties between sources follow wire order) or the
+        change reaches a node on or behind a cycle, whose chain depends on
+        walk order.
+        """
+        if diff.reordered:
+            return False
+        old, model = previous.model, graph.model
+        new_ids, n_nodes = model.node_ids, model.n_nodes
+        leftover = graph.leftover()
+        self.begin(graph)
+        chain = self.chain = diff.carry(previous.chain)
+        parent = self.parent = diff.carry(previous.parent, -1, ids=True)
+        own, own_count, totals = self.own, self.own_count, self.totals
+        if old.guids == model.guids:
+            own.update(previous.own)
+            own_count.update(previous.own_count)
+        else:
+            for u, ops in previous.own.items():
+                # A removed node still named by a wire is an unresolved endpoint now
+                v = new_ids.get(old.guids[u], n_nodes)
+                if v < n_nodes:
+                    own[v] = ops
+                    own_count[v] = previous.own_count[u]
+        totals.update(previous.totals)
+        for guid in itertools.chain(diff.removed, diff.changed):
+            ops = previous.own.get(old.node_ids[guid])
+            if ops:
+                totals -= ops
+        dirty = {new_ids[guid] for guid in itertools.chain(diff.rewired, diff.removed) if guid in new_ids}
+        for guid in itertools.chain(diff.changed, diff.added):
+            v = new_ids[guid]
+            dirty.add(v)
+            own.pop(v, None)
+            own_count.pop(v, None)
+            ops = tree_operations(model.nodes[v]) if v < n_nodes else None
+            if ops:
+                own[v] = ops
+                own_count[v] = sum(ops.values())
+                totals.update(ops)
+
+        in_offsets, in_wires, wire_src = graph.in_offsets, graph.in_wires, model.wire_src
+        queue = deque(dirty)
+        while queue:
+            v = queue.popleft()
+            if leftover[v]:
+                return False
+            best, source = 0, -1
+            for w in in_wires[in_offsets[v]:in_offsets[v + 1]]:
+                u = wire_src[w]
+                if chain[u] > best:
+                    best, source = chain[u], u
+            parent[v] = source
+            value = best + own_count.get(v, 0)
+            if value != chain[v]:
+                chain[v] = value
+                queue.extend(graph.successors(v))
+        return True
+
+    def finish(self) -> Dict[str, Any]:
+        model = self.model
+        own, chain, parent = self.own, self.chain, self.parent
+        candidates = [v for v in own if chain[v] >= self.min_chain_operations]
+        candidates.sort(key=lambda v: (-chain[v], -(model.nodes[v].get('time_ms') or 0.0), v))
+        covered = bytearray(self.n)
+        hotspots = []
+        for v in candidates:
+            if covered[v]:
+                continue
+            path = []
+            u = v
+            while u >= 0:
+                covered[u] = 1
+                if u in own:
+                    path.append(u)
+                u = parent[u]
+            node = model.nodes[v]
+            hotspots.append({
+                "component": node.name,
+                "guid": node.guid,
+                "operations": dict(own[v]),
+                "chain_operations": chain[v],
+                "chain": [model.nodes[u].name for u in reversed(path)],
+                "time_ms": node.get('time_ms'),
+                "pos": node.pos
+            })
+
+        return {
+            "operations": dict(self.totals),
+            "hotspots": hotspots
+        }
@@ -0,0 +1,598 @@
+"""
+Lint Rule Engine
+Registry of lint rules run over one shared graph traversal
+
+A rule is a ``LintRule`` (itself a ``GraphVisitor``) that may:
+
+- override ``visit_node``/``visit_edge`` to inspect the definition
+  during the shared walk
+- declare analyzer ``passes()`` whose memoized results it reads
+- turn what it saw into issues in ``issues()``
+
+``run_rules`` collects every pass the rules need and runs the pending
+ones together with the rule visitors in a single ``traverse``, so adding
+a rule adds callbacks, not walks. Register custom rules with
+``register_rule`` (all linters) or ``GHLinter.add_rule`` (one linter).
+
+Every rule is metered: wall time in its callbacks and ``issues()``,
+nodes and wires it visited, issues it emitted. A rule past its time
+budget is cut short and marked partial instead of holding up the lint.
+
+An incremental run hands each rule its instance from the previous
+revision's run and the ``ModelDiff``; rules that can ``update`` from it
+(``NodeRule``s) skip the walk.
+"""
+import re
+from bisect import bisect_right
+from itertools import compress
+from operator import itemgetter
+from time import perf_counter
+from typing import Callable, Dict, List, Any, Iterator, Optional, Sequence, Tuple, Type, Union
+
+from .graph import GraphVisitor, LocalVisitor
+from .lint_rules import LINT_RULES, SEVERITY_LEVELS
+from .model_diff import ModelDiff
+from .passes import DanglingPorts, UnnamedParams, InternalizedData, MixedAccess, TimedNodes, TreeOperations
+
+
+# Component categories that ship with Grasshopper (GH011 lists everything else)
+CORE_CATEGORIES = ('', 'Params', 'Maths', 'Sets', 'Vector', 'Curve', 'Surface', 'Mesh',
+                   'Intersect', 'Transform', 'Display')
+
+# Name/type fragments identifying expression components, data dams and scribbles
+EXPRESSION_KEYWORDS = re.compile("Expression|Evaluate")
+DATA_DAM_KEYWORDS = re.compile("Data ?Dam")
+SCRIBBLE_KEYWORDS = re.compile("Scribble")
+
+
+def _matches(node, keywords) -> bool:
+    """Whether the pattern occurs in the node's name, type or param kind"""
+    for label in (node.name, node.type, node.param_kind):
+        if label and keywords.search(label):
+            return True
+    return False
+
+
+def _negative_crossings(item: Dict[str, Any]) -> int:
+    return -item["crossings"]
+
+
+def _item(node) -> Dict[str, Any]:
+    return {"component": node.name, "guid": node.guid, "pos": node.pos}
+
+
+def _node_items(rule: "NodeRule") -> Callable[[], List[Dict[str, Any]]]:
+    """Lazy issue items for the nodes a rule found, in id order"""
+    nodes = rule.graph.model.nodes
+    return lambda: [_item(nodes[v]) for v, _ in rule.ordered()]
+
+
+class LintRule(GraphVisitor):
+    """One lint rule; ``rule`` is a ``LINT_RULES`` key or a full rule dict
+
+    ``budget_ms`` overrides the linter's per-rule time budget. Rules doing
+    their work in ``issues()`` should hand ``deadline`` to analyzer calls
+    that accept one and then check ``out_of_time()``.
+    """
+
+    rule: Union[str, Dict[str, Any]] = None
+    budget_ms: Optional[float] = None
+
+    def __init__(self, linter):
+        self.linter = linter
+        self.analyzer = linter.analyzer
+        self.deadline = None
+        self.partial = False
+
+    def out_of_time(self) -> bool:
+        """Whether the deadline has passed; if so the rule is marked partial"""
+        if self.deadline is not None and perf_counter() > self.deadline:
+            self.partial = True
+        return self.partial
+
+    @property
+    def definition(self) -> Dict[str, Any]:
+        return rule_definition(type(self))
+
+    def passes(self) -> Sequence[GraphVisitor]:
+        """Analyzer passes whose results ``issues`` receives, in order"""
+        return ()
+
+    def issues(self, *results) -> List[Dict[str, Any]]:
+        """Issues found, given the results of ``passes()``"""
+        return []
+
+    def issue(self, items: Union[List[Any], Callable[[], List[Any]]], count: int = None,
+              **extra) -> Dict[str, Any]:
+        """Issue dict in the shape ``GHLinter`` reports
+
+        ``items`` may be a callable building the list, in which case
+        ``count`` is required; it is only called when items are wanted.
+        """
+        issue = {"rule": self.definition, "count": len(items) if count is None else count}
+        issue.update(extra)
+        if self.partial:
+            issue["partial"] = True
+        issue["items"] = items
+        return issue
+
+
+class NodeRule(LocalVisitor, LintRule):
+    """A rule whose findings each belong to one node (see ``LocalVisitor``)
+
+    Implement ``contribute``; findings must not depend on linter
+    thresholds (apply those in ``issues``), since an incremental run keeps
+    the previous revision's findings for untouched nodes.
+    """
+
+
+RULE_REGISTRY: List[Type[LintRule]] = []
+
+
+def rule_definition(rule_class: Type[LintRule]) -> Dict[str, Any]:
+    """Rule dict (id, severity, title, ...) of a rule class"""
+    rule = rule_class.rule
+    return LINT_RULES[rule] if isinstance(rule, str) else rule
+
+
+def register_rule(rule_class: Type[LintRule]) -> Type[LintRule]:
+    """Class decorator adding a rule to the rules every new linter runs"""
+    if rule_class not in RULE_REGISTRY:
+        RULE_REGISTRY.append(rule_class)
+    return rule_class
+
+
+class _Meter:
+    """Wall time and visits spent in one visitor, cut off past ``limit`` seconds
+
+    Once cut off, the visitor's ``truncated`` is set as well. Callbacks
+    made from within a metered call (``update`` calling ``begin`` and
+    ``visit_node``) are counted but not timed again.
+    """
+
+    __slots__ = ("seconds", "nodes", "edges", "limit", "truncated", "visitor", "started")
+
+    def __init__(self, limit: Optional[float] = None):
+        self.seconds = 0.0
+        self.nodes = 0
+        self.edges = 0
+        self.limit = limit
+        self.truncated = False
+        self.visitor = None
+        # Start of the outermost metered call in progress, if any
+        self.started = None
+
+    def wrap(self, visitor: GraphVisitor) -> "_Meter":
+        """Route the visitor's overridden callbacks through the meter"""
+        self.visitor = visitor
+        cls = type(visitor)
+        if cls.visit_node is not GraphVisitor.visit_node:
+            visitor.visit_node = self._node_meter(visitor.visit_node)
+        if cls.visit_edge is not GraphVisitor.visit_edge:
+            visitor.visit_edge = self._edge_meter(visitor.visit_edge)
+        visitor.begin = self._call_meter(visitor.begin)
+        visitor.update = self._call_meter(visitor.update)
+        visitor.finish = self._call_meter(visitor.finish)
+        return self
+
+    def _over(self) -> bool:
+        if self.limit is not None:
+            spent = self.seconds
+            if self.started is not None:
+                spent += perf_counter() - self.started
+            if spent > self.limit:
+                self.truncated = self.visitor.truncated = True
+        return self.truncated
+
+    def _node_meter(self, call):
+        def visit_node(v, node):
+            if self.truncated or self._over():
+                return
+            if self.started is not None:
+                call(v, node)
+            else:
+                start = perf_counter()
+                call(v, node)
+                self.seconds += perf_counter() - start
+            self.nodes += 1
+        return visit_node
+
+    def _edge_meter(self, call):
+        def visit_edge(w, src, dst):
+            if self.truncated or self._over():
+                return
+            if self.started is not None:
+                call(w, src, dst)
+            else:
+                start = perf_counter()
+                call(w, src, dst)
+                self.seconds += perf_counter() - start
+            self.edges += 1
+        return visit_edge
+
+    def _call_meter(self, call):
+        def metered(*args):
+            if self.started is not None:
+                return call(*args)
+            self.started = perf_counter()
+            try:
+                return call(*args)
+            finally:
+                self.seconds += perf_counter() - self.started
+                self.started = None
+        return metered
+
+
+def iter_issues(linter, rule_classes: Sequence[Type[LintRule]], budget_ms: Optional[float] = None,
+                stats: Optional[List[Dict[str, Any]]] = None, items: bool = True,
+                previous: Optional[Dict[Type[LintRule], LintRule]] = None, diff: Optional[ModelDiff] = None,
+                state: Optional[Dict[Type[LintRule], LintRule]] = None) -> Iterator[Dict[str, Any]]:
+    """Yield the rules' issues lazily, most severe rules first
+
+    Rules are ordered by severity, keeping registration order within a
+    severity. One shared traversal runs every rule visitor and pending
+    pass up front (per-node checks, cheap). Each rule's ``issues()``,
+    where whole-graph analyses run, is called only when the consumer gets
+    that far, so stopping early skips the remaining rules. Item lists
+    given as callables are built only when ``items`` is true; otherwise
+    issues carry no ``items``.
+
+    A rule's budget is its ``budget_ms``, else ``budget_ms`` here (None:
+    unlimited). Once a rule's callbacks have used it up the rule gets no
+    more callbacks; ``issues()`` then runs with whatever budget is left as
+    its ``deadline``. Shared passes are never cut short (their results are
+    memoized), and their time is reported as ``pass_ms`` on every rule
+    reading them. Per-rule stats are appended to ``stats`` as rules finish.
+    
+    ``previous`` maps rule classes to their finished instances from a run
+    over an earlier revision and ``diff`` leads from it to this one; a
+    rule whose ``update`` accepts them stays out of the walk. Rules that
+    finish within budget are recorded in ``state`` for the next revision.
+    """
+    rule_classes = sorted(rule_classes, reverse=True,
+                          key=lambda r: SEVERITY_LEVELS.get(rule_definition(r)['severity'], 0))
+    rules = [rule_class(linter) for rule_class in rule_classes]
+    wanted = [list(rule.passes()) for rule in rules]
+    unique = {}
+    for passes in wanted:
+        for p in passes:
+            unique.setdefault(p.key, p)
+    pass_meters = {key: _Meter().wrap(p) for key, p in unique.items()}
+    rule_meters = []
+    for rule in rules:
+        budget = budget_ms if rule.budget_ms is None else rule.budget_ms
+        rule_meters.append(_Meter(None if budget is None else budget / 1000.0).wrap(rule))
+    walkers = []
+    for rule in rules:
+        before = previous.get(type(rule)) if previous else None
+        if before is None or not rule.update(linter.analyzer.graph, before, diff):
+            walkers.append(rule)
+    results = dict(zip(unique, linter.analyzer.run_passes(*unique.values(), visitors=walkers)))
+
+    for rule, passes, meter in zip(rules, wanted, rule_meters):
+        rule.partial = meter.truncated
+        start = perf_counter()
+        if meter.limit is not None:
+            rule.deadline = start + max(meter.limit - meter.seconds, 0.0)
+        found = rule.issues(*(results[p.key] for p in passes))
+        for issue in found:
+            if not items:
+                issue.pop("items", None)
+            elif callable(issue["items"]):
+                issue["items"] = issue["items"]()
+        meter.seconds += perf_counter() - start
+        if stats is not None:
+            stats.append({
+                "rule": rule.definition["id"],
+                "time_ms": round(meter.seconds * 1000.0, 3),
+                "pass_ms": round(sum(pass_meters[p.key].seconds for p in passes) * 1000.0, 3),
+                "nodes": meter.nodes,
+                "edges": meter.edges,
+                "issues": sum(issue["count"] for issue in found),
+                "partial": rule.partial
+            })
+        if state is not None and not rule.partial:
+            state[type(rule)] = rule
+        yield from found
+
+
+def run_rules(linter, rule_classes: Sequence[Type[LintRule]], budget_ms: Optional[float] = None,
+              previous: Optional[Dict[Type[LintRule], LintRule]] = None, diff: Optional[ModelDiff] = None,
+              state: Optional[Dict[Type[LintRule], LintRule]] = None) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Run every rule; returns their issues, most severe first, and per-rule stats"""
+    stats = []
+    issues = list(iter_issues(linter, rule_classes, budget_ms, stats, previous=previous, diff=diff, state=state))
+    return issues, stats
+
+
+# ==================== BUILT-IN RULES ====================
+
+@register_rule
+class DanglingInputs(LintRule):
+    """GH001: unconnected component inputs"""
+    rule = "dangling_inputs"
+
+    def passes(self):
+        return (DanglingPorts(),)
+
+    def issues(self, dangling):
+        return [self.issue(dangling["inputs"])] if dangling["inputs"] else []
+
+
+@register_rule
+class DanglingOutputs(LintRule):
+    """GH002: unconnected component outputs"""
+    rule = "dangling_outputs"
+
+    def passes(self):
+        return (DanglingPorts(),)
+
+    def issues(self, dangling):
+        return [self.issue(dangling["outputs"])] if dangling["outputs"] else []
+
+
+@register_rule
+class UnnamedParamsRule(LintRule):
+    """GH003: panels/sliders left with default names"""
+    rule = "unnamed_params"
+
+    def passes(self):
+        return (UnnamedParams(),)
+
+    def issues(self, unnamed):
+        return [self.issue(unnamed)] if unnamed else []
+
+
+@register_rule
+class MissingGroups(NodeRule):
+    """GH004: more than ten components and no groups"""
+    rule = "missing_groups"
+    cacheable = True
+
+    def contribute(self, v, node):
+        return True if node.group and node.is_component else None
+
+    def issues(self):
+        if not self.findings and self.analyzer.model.n_components > 10:
+            return [self.issue([{"message": "Definition has no groups"}], count=1)]
+        return []
+
+
+@register_rule
+class MixedTreeAccess(LintRule):
+    """GH005: wires with tree access at exactly one end"""
+    rule = "tree_access_mixing"
+
+    def passes(self):
+        return (MixedAccess(),)
+
+    def issues(self, mixed):
+        return [self.issue(mixed)] if mixed else []
+
+
+@register_rule
+class FlattenGraftChurn(LintRule):
+    """GH008: chains carrying many flatten/graft/simplify/flip operations"""
+    rule = "excessive_flatten_graft"
+
+    def passes(self):
+        return (TreeOperations(self.linter.tree_operations_threshold),)
+
+    def issues(self, tree):
+        if not tree["hotspots"]:
+            return []
+        return [self.issue(tree["hotspots"], operations=tree["operations"])]
+
+
+@register_rule
+class PluginDependencies(LintRule):
+    """GH011: components from non-core categories"""
+    rule = "plugin_dependencies"
+
+    def issues(self):
+        plugins = [p for p in self.analyzer.get_plugin_usage() if p.get('category') not in CORE_CATEGORIES]
+        if not plugins:
+            return []
+        return [self.issue(lambda: [{"plugin": f"{p['category']}/{p['subcategory']}"} for p in plugins],
+                           count=len(plugins))]
+
+
+@register_rule
+class DuplicateChains(LintRule):
+    """GH007: repeated component chains"""
+    rule = "duplicate_chains"
+
+    def issues(self):
+        duplicates = self.analyzer.find_duplicate_chains(deadline=self.deadline)
+        self.out_of_time()
+        if not duplicates:
+            return []
+        return [self.issue(duplicates,
+                           estimated_saving_bytes=sum(d['estimated_saving_bytes'] for d in duplicates))]
+
+
+@register_rule
+class LongWireCrossings(LintRule):
+    """GH009: long wires and wires crossing many others"""
+    rule = "long_wire_crossings"
+
+    def issues(self):
+        crossings = self.analyzer.find_wire_crossings(self.linter.long_wire_percentile,
+                                                      deadline=self.deadline)
+        self.out_of_time()
+        wires = crossings['wires']
+        # Most crossed first, so the wires crossed often enough lead; past them only long ones count
+        crossed = bisect_right(wires, -self.linter.wire_crossing_threshold, key=_negative_crossings)
+        rest = wires[crossed:]
+        items = wires[:crossed] + list(compress(rest, map(itemgetter('long'), rest)))
+        if not items:
+            return []
+        return [self.issue(items, total_crossings=crossings['total_crossings'],
+                           long_threshold=crossings['long_threshold'])]
+
+
+@register_rule
+class DeepNesting(LintRule):
+    """GH014: deep component chains, and wire cycles (no finite depth)"""
+    rule = "deep_nesting"
+
+    def issues(self):
+        deep = self.analyzer.find_deep_chains(self.linter.deep_nesting_depth)
+        items = [{
+            "message": "Cycle: " + " → ".join(str(node["component"]) for node in cycle + cycle[:1]),
+            "cycle": cycle
+        } for cycle in deep["cycles"]]
+        items.extend(deep["chains"])
+        return [self.issue(items, max_depth=deep["max_depth"])] if items else []
+
+
+@register_rule
+class LargeInternalizedData(LintRule):
+    """GH019: decoded internalized data above the threshold"""
+    rule = "large_internalized_data"
+
+    def passes(self):
+        return (InternalizedData(),)
+
+    def issues(self, internalized):
+        if internalized['decoded_bytes'] <= self.linter.internalized_data_threshold:
+            return []
+        return [self.issue(internalized['top'], count=internalized['objects'],
+                           decoded_bytes=internalized['decoded_bytes'],
+                           threshold_bytes=self.linter.internalized_data_threshold)]
+
+
+@register_rule
+class ExcessiveExpressions(NodeRule):
+    """GH006: more expression components than the threshold"""
+    rule = "excessive_expressions"
+    cacheable = True
+
+    def contribute(self, v, node):
+        return True if node.is_component and _matches(node, EXPRESSION_KEYWORDS) else None
+
+    def issues(self):
+        if len(self.findings) <= self.linter.expression_threshold:
+            return []
+        return [self.issue(_node_items(self), count=len(self.findings))]
+
+
+@register_rule
+class LargePanelInputs(NodeRule):
+    """GH010: panels holding long text that feed other objects"""
+    rule = "large_panel_inputs"
+    cacheable = True
+
+    def contribute(self, v, node):
+        text = node.get('panel_text')
+        return len(text) if text and self.graph.out_degree(v) else None
+
+    def issues(self):
+        nodes = self.graph.model.nodes
+        found = [(nodes[v], characters) for v, characters in self.ordered()
+                 if characters > self.linter.panel_text_threshold]
+        if not found:
+            return []
+        return [self.issue(lambda: [{
+            "name": node.name,
+            "guid": node.guid,
+            "characters": characters,
+            "pos": node.pos
+        } for node, characters in found], count=len(found))]
+
+
+@register_rule
+class PreviewOff(NodeRule):
+    """GH012: components with preview disabled"""
+    rule = "no_preview"
+    cacheable = True
+
+    def contribute(self, v, node):
+        return True if node.is_component and node.get('hidden') else None
+
+    def issues(self):
+        return [self.issue(_node_items(self), count=len(self.findings))] if self.findings else []
+
+
+@register_rule
+class DataDamOveruse(NodeRule):
+    """GH013: more data dams than the threshold"""
+    rule = "data_dam_overuse"
+    cacheable = True
+
+    def contribute(self, v, node):
+        return True if _matches(node, DATA_DAM_KEYWORDS) else None
+
+    def issues(self):
+        if len(self.findings) <= self.linter.data_dam_threshold:
+            return []
+        return [self.issue(_node_items(self), count=len(self.findings))]
+
+
+@register_rule
+class MissingComments(NodeRule):
+    """GH015: a large definition without any scribble"""
+    rule = "missing_comments"
+    cacheable = True
+
+    def contribute(self, v, node):
+        return True if not node.is_component and _matches(node, SCRIBBLE_KEYWORDS) else None
+
+    def issues(self):
+        n_components = self.analyzer.model.n_components
+        if self.findings or n_components < self.linter.comment_min_components:
+            return []
+        return [self.issue([{"message": f"{n_components} components and no scribbles"}], count=1)]
+
+
+def _timed_items(timed) -> List[Dict[str, Any]]:
+    return [dict(_item(node), time_ms=round(time_ms, 3)) for node, time_ms in timed]
+
+
+@register_rule
+class SlowComponents(LintRule):
+    """GH016: components at or above the slow solve time"""
+    rule = "slow_component_execution"
+
+    def passes(self):
+        return (TimedNodes(),)
+
+    def issues(self, timed):
+        slow = [t for t in timed if t[1] >= self.linter.slow_component_ms]
+        return [self.issue(lambda: _timed_items(slow), count=len(slow))] if slow else []
+
+
+@register_rule
+class PerformanceBottleneck(LintRule):
+    """GH017: objects taking at least the bottleneck share of the total solve time"""
+    rule = "performance_bottleneck"
+
+    def passes(self):
+        return (TimedNodes(),)
+
+    def issues(self, timed):
+        total = sum(t[1] for t in timed)
+        if total <= 0:
+            return []
+        heavy = [t for t in timed if t[1] >= self.linter.bottleneck_share * total]
+        if not heavy:
+            return []
+        return [self.issue(lambda: _timed_items(heavy), count=len(heavy), total_ms=round(total, 3))]
+
+
+@register_rule
+class HeavyPreview(LintRule):
+    """GH018: previewed objects slow enough to suggest heavy preview geometry
+
+    Exports carry no geometry sizes, so solve time of visible,
+    preview-capable objects stands in for preview weight.
+    """
+    rule = "heavy_preview_geometry"
+
+    def passes(self):
+        return (TimedNodes(),)
+
+    def issues(self, timed):
+        heavy = [t for t in timed if t[1] >= self.linter.heavy_preview_ms
+                 and t[0].get('preview_capable') and not t[0].get('hidden')]
+        return [self.issue(lambda: _timed_items(heavy), count=len(heavy))] if heavy else []
@@ -0,0 +1,470 @@
+"""
+Spatial Queries
+Grid-bucketed geometry on the canvas positions of a definition
+
+``SpatialIndex`` answers range, nearest-neighbour and overlapping-pair
+queries over object boxes. Wires are treated as straight segments between
+their endpoints' pivots (Grasshopper draws them as curves, but the straight
+chord crosses the same wires in all but contrived layouts).
+"""
+import heapq
+import math
+from array import array
+from time import perf_counter
+from typing import Dict, List, Set, Tuple, Sequence, Optional
+
+
+# Footprint assumed for objects whose bounds were not recorded
+DEFAULT_OBJECT_SIZE = (100.0, 50.0)
+
+
+def object_box(pos: Sequence[float], bounds: Optional[Sequence[float]] = None) -> Tuple[float, float, float, float]:
+    """(min_x, min_y, max_x, max_y) of an object from its bounds [x, y, w, h], or around its pivot"""
+    if bounds:
+        x, y, w, h = bounds
+        return (x, y, x + w, y + h)
+    half_w, half_h = DEFAULT_OBJECT_SIZE[0] / 2, DEFAULT_OBJECT_SIZE[1] / 2
+    return (pos[0] - half_w, pos[1] - half_h, pos[0] + half_w, pos[1] + half_h)
+
+
+class SpatialIndex:
+    """Uniform grid over axis-aligned boxes
+    
+    Each box is registered in every cell it touches; the cell size
+    defaults to twice the median box extent so a typical box touches up to
+    four cells. Queries visit only the cells they cover:
+    
+    - ``query_range``: boxes intersecting a rectangle
+    - ``nearest``: k nearest boxes to a point, searching rings of cells
+      outward until the ring is farther than the k-th hit
+    - ``overlapping_pairs``: every pair of intersecting boxes, each pair
+      reported once from the cell holding the corner of its intersection
+    
+    Box ids are positions in the input sequence.
+    """
+    
+    def __init__(self, boxes: Sequence[Tuple[float, float, float, float]], cell_size: float = 0.0):
+        self.min_x = array("d", (b[0] for b in boxes))
+        self.min_y = array("d", (b[1] for b in boxes))
+        self.max_x = array("d", (b[2] for b in boxes))
+        self.max_y = array("d", (b[3] for b in boxes))
+        n = len(self.min_x)
+        if cell_size <= 0:
+            if n:
+                extents = sorted(max(self.max_x[i] - self.min_x[i], self.max_y[i] - self.min_y[i])
+                                 for i in range(n))
+                cell_size = 2.0 * extents[n // 2]
+            cell_size = max(cell_size, 1.0)
+        self.cell_size = cell_size
+        self.inv = 1.0 / cell_size
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        for i in range(n):
+            x0, y0, x1, y1 = self._cell_span(self.min_x[i], self.min_y[i], self.max_x[i], self.max_y[i])
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    bucket = self.cells.get((cx, cy))
+                    if bucket is None:
+                        self.cells[(cx, cy)] = [i]
+                    else:
+                        bucket.append(i)
+        if self.cells:
+            self.bounds = (min(c[0] for c in self.cells), min(c[1] for c in self.cells),
+                           max(c[0] for c in self.cells), max(c[1] for c in self.cells))
+        else:
+            self.bounds = (0, 0, -1, -1)
+    
+    def __len__(self) -> int:
+        return len(self.min_x)
+    
+    def _cell_span(self, min_x, min_y, max_x, max_y):
+        inv = self.inv
+        return (math.floor(min_x * inv), math.floor(min_y * inv),
+                math.floor(max_x * inv), math.floor(max_y * inv))
+    
+    def query_range(self, min_x: float, min_y: float, max_x: float, max_y: float) -> List[int]:
+        """Ids of the boxes intersecting the rectangle, in id order"""
+        x0, y0, x1, y1 = self._cell_span(min_x, min_y, max_x, max_y)
+        gx0, gy0, gx1, gy1 = self.bounds
+        x0, y0, x1, y1 = max(x0, gx0), max(y0, gy0), min(x1, gx1), min(y1, gy1)
+        found = set()
+        cells = self.cells
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for i in cells.get((cx, cy), ()):
+                    if (self.min_x[i] <= max_x and self.max_x[i] >= min_x and
+                            self.min_y[i] <= max_y and self.max_y[i] >= min_y):
+                        found.add(i)
+        return sorted(found)
+    
+    def _distance(self, i: int, x: float, y: float) -> float:
+        dx = max(self.min_x[i] - x, 0.0, x - self.max_x[i])
+        dy = max(self.min_y[i] - y, 0.0, y - self.max_y[i])
+        return math.hypot(dx, dy)
+    
+    def nearest(self, x: float, y: float, k: int = 1) -> List[Tuple[float, int]]:
+        """The ``k`` boxes closest to a point as (distance, id), nearest first
+        
+        Rings start at the first one that meets the populated cells and are
+        clipped to them, so a point far outside the grid costs no more than
+        one inside it.
+        """
+        if not len(self) or k <= 0:
+            return []
+        cx, cy = math.floor(x * self.inv), math.floor(y * self.inv)
+        bounds = gx0, gy0, gx1, gy1 = self.bounds
+        # Rings closer than this miss the populated cells, rings beyond the other hold none
+        first_ring = max(gx0 - cx, cx - gx1, gy0 - cy, cy - gy1, 0)
+        max_ring = max(abs(cx - gx0), abs(cx - gx1), abs(cy - gy0), abs(cy - gy1))
+        best = []  # max-heap of (-distance, id)
+        seen = set()
+        for ring in range(first_ring, max_ring + 1):
+            # Every box in ring r or beyond is at least (r - 1) cells away
+            if len(best) == k and (ring - 1) * self.cell_size > -best[0][0]:
+                break
+            for cell in self._ring(cx, cy, ring, bounds):
+                for i in self.cells.get(cell, ()):
+                    if i in seen:
+                        continue
+                    seen.add(i)
+                    d = self._distance(i, x, y)
+                    if len(best) < k:
+                        heapq.heappush(best, (-d, i))
+                    elif d < -best[0][0]:
+                        heapq.heapreplace(best, (-d, i))
+        return sorted((-d, i) for d, i in best)
+    
+    @staticmethod
+    def _ring(cx: int, cy: int, r: int, bounds: Tuple[int, int, int, int]):
+        """Cells at Chebyshev distance ``r`` from (cx, cy) that lie inside ``bounds``"""
+        gx0, gy0, gx1, gy1 = bounds
+        if r == 0:
+            if gx0 <= cx <= gx1 and gy0 <= cy <= gy1:
+                yield (cx, cy)
+            return
+        x0, x1 = max(cx - r, gx0), min(cx + r, gx1)
+        for row in (cy - r, cy + r):
+            if gy0 <= row <= gy1:
+                for col in range(x0, x1 + 1):
+                    yield (col, row)
+        y0, y1 = max(cy - r + 1, gy0), min(cy + r - 1, gy1)
+        for col in (cx - r, cx + r):
+            if gx0 <= col <= gx1:
+                for row in range(y0, y1 + 1):
+                    yield (col, row)
+    
+    def overlapping_pairs(self) -> List[Tuple[int, int]]:
+        """Every pair of intersecting boxes as (lower id, higher id)"""
+        pairs = []
+        inv = self.inv
+        min_x, min_y, max_x, max_y = self.min_x, self.min_y, self.max_x, self.max_y
+        for (cell_x, cell_y), members in self.cells.items():
+            if len(members) < 2:
+                continue
+            members = sorted(members, key=min_x.__getitem__)
+            for p in range(len(members)):
+                i = members[p]
+                i_max_x, i_min_y, i_max_y = max_x[i], min_y[i], max_y[i]
+                for q in range(p + 1, len(members)):
+                    j = members[q]
+                    if min_x[j] > i_max_x:
+                        break
+                    if max_y[j] < i_min_y or min_y[j] > i_max_y:
+                        continue
+                    # Report from the cell holding the intersection's min corner only
+                    corner_x = min_x[j] if min_x[j] > min_x[i] else min_x[i]
+                    corner_y = min_y[j] if min_y[j] > i_min_y else i_min_y
+                    if math.floor(corner_x * inv) != cell_x or math.floor(corner_y * inv) != cell_y:
+                        continue
+                    pairs.append((i, j) if i < j else (j, i))
+        pairs.sort()
+        return pairs
+
+
+def _grid_cells(x0: float, y0: float, x1: float, y1: float, inv: float) -> List[Tuple[int, int]]:
+    """Grid cells a segment passes through (Amanatides-Woo traversal)"""
+    cx, cy = math.floor(x0 * inv), math.floor(y0 * inv)
+    ex, ey = math.floor(x1 * inv), math.floor(y1 * inv)
+    cells = [(cx, cy)]
+    steps = abs(ex - cx) + abs(ey - cy)
+    if not steps:
+        return cells
+    dx, dy = x1 - x0, y1 - y0
+    step_x = 1 if dx > 0 else -1
+    step_y = 1 if dy > 0 else -1
+    if dx:
+        t_max_x = ((cx + (step_x > 0)) / inv - x0) / dx
+        t_delta_x = abs(1.0 / (inv * dx))
+    else:
+        t_max_x = t_delta_x = math.inf
+    if dy:
+        t_max_y = ((cy + (step_y > 0)) / inv - y0) / dy
+        t_delta_y = abs(1.0 / (inv * dy))
+    else:
+        t_max_y = t_delta_y = math.inf
+    for _ in range(steps):
+        if t_max_x < t_max_y:
+            cx += step_x
+            t_max_x += t_delta_x
+        else:
+            cy += step_y
+            t_max_y += t_delta_y
+        cells.append((cx, cy))
+    return cells
+
+
+def _crossing_point(ax, ay, bx, by, cx, cy, dx, dy):
+    """Interior intersection point of segments AB and CD, or None"""
+    rx, ry = bx - ax, by - ay
+    sx, sy = dx - cx, dy - cy
+    denom = rx * sy - ry * sx
+    if not denom:
+        return None  # parallel or collinear
+    qx, qy = cx - ax, cy - ay
+    t = (qx * sy - qy * sx) / denom
+    u = (qx * ry - qy * rx) / denom
+    if 0.0 < t < 1.0 and 0.0 < u < 1.0:
+        return ax + t * rx, ay + t * ry
+    return None
+
+
+# Crossing points closer than this (in cells) to a cell edge may fall outside a segment's walk
+_EDGE = 1e-7
+
+
+def _crossing_cell(point: Tuple[float, float], cells_i: Set[Tuple[int, int]],
+                   cells_j: Set[Tuple[int, int]], inv: float) -> Optional[Tuple[int, int]]:
+    """The one grid cell a crossing of segments i and j is counted in
+
+    That is the cell holding the crossing point when both segments pass
+    through it. A point on a cell boundary (or rounded across one) can
+    land in a cell one of the walks skipped; the lowest cell both walks
+    share is used instead. None when they share no cell.
+    """
+    cell = (math.floor(point[0] * inv), math.floor(point[1] * inv))
+    if cell in cells_i and cell in cells_j:
+        return cell
+    shared = cells_i & cells_j
+    return min(shared) if shared else None
+
+
+class SegmentGrid:
+    """Segments bucketed by the grid cells they pass through
+
+    ``buckets`` maps each cell to the segments whose walk (see
+    ``_grid_cells``) enters it, by their position when the grid was built.
+    A grid can follow later revisions of the segments without rebuilding:
+    ``current`` maps built positions to present ones (-1 once a segment is
+    gone) and ``extra`` buckets segments drawn since, by present position.
+    """
+
+    __slots__ = ("cell_size", "inv", "buckets", "current", "extra", "drawn")
+
+    def __init__(self, cell_size: float, buckets: Dict[Tuple[int, int], List[int]], current: array,
+                 extra: Optional[Dict[Tuple[int, int], List[int]]] = None, drawn: int = 0):
+        self.cell_size = cell_size
+        self.inv = 1.0 / cell_size
+        self.buckets = buckets
+        self.current = current
+        self.extra = extra or {}
+        # Segments bucketed in ``extra`` since the build, for deciding when to rebuild
+        self.drawn = drawn
+
+    @classmethod
+    def build(cls, xa: array, ya: array, xb: array, yb: array, cell_size: float,
+              segments: Optional[Sequence[int]] = None) -> "SegmentGrid":
+        """Bucket every segment, or only the positions in ``segments``"""
+        inv = 1.0 / cell_size
+        buckets: Dict[Tuple[int, int], List[int]] = {}
+        for i in range(len(xa)) if segments is None else segments:
+            for cell in _grid_cells(xa[i], ya[i], xb[i], yb[i], inv):
+                bucket = buckets.get(cell)
+                if bucket is None:
+                    buckets[cell] = [i]
+                else:
+                    bucket.append(i)
+        return cls(cell_size, buckets, array("i", range(len(xa))))
+
+    def candidates(self, cells: Sequence[Tuple[int, int]]) -> Set[int]:
+        """Present positions of the segments entering any of ``cells``"""
+        current = self.current
+        found = set()
+        for cell in cells:
+            bucket = self.buckets.get(cell)
+            if bucket:
+                found.update(map(current.__getitem__, bucket))
+            bucket = self.extra.get(cell)
+            if bucket:
+                found.update(bucket)
+        found.discard(-1)
+        return found
+
+    def follow(self, moves: array, drawn: Sequence[int],
+               xa: array, ya: array, xb: array, yb: array) -> "SegmentGrid":
+        """The grid over a new revision of the segments
+
+        ``moves`` gives each present segment's new position (-1: gone or
+        redrawn) and ``drawn`` the new positions of segments to bucket
+        afresh, whose coordinates are read from ``xa``..``yb``. The built
+        buckets are shared, not copied.
+        """
+        # A trailing -1 keeps segments that are already gone at -1
+        moves = moves + array("i", [-1])
+        current = array("i", map(moves.__getitem__, self.current))
+        extra: Dict[Tuple[int, int], List[int]] = {}
+        for cell, bucket in self.extra.items():
+            kept = [j for j in map(moves.__getitem__, bucket) if j >= 0]
+            if kept:
+                extra[cell] = kept
+        for j in drawn:
+            for cell in _grid_cells(xa[j], ya[j], xb[j], yb[j], self.inv):
+                extra.setdefault(cell, []).append(j)
+        return SegmentGrid(self.cell_size, self.buckets, current, extra, self.drawn + len(drawn))
+
+
+def segment_crossings(xa: array, ya: array, xb: array, yb: array,
+                      ends_a: array, ends_b: array, cell_size: float = 0.0,
+                      deadline: Optional[float] = None, grid: Optional[SegmentGrid] = None) -> Tuple[array, int]:
+    """Crossing count per segment, and the total number of crossing pairs
+
+    Segments are bucketed into a uniform grid (cell size defaults to the
+    median segment length) by walking the cells each one passes through.
+    Only segments sharing a cell are tested, sweeping each cell's segments
+    by x so boxes that cannot overlap are never compared. A crossing is counted in
+    the cell that contains its intersection point (see ``_crossing_cell``),
+    so each pair is counted once without a seen-pairs set. Segments sharing an endpoint id
+    (``ends_a``/``ends_b``, e.g. wires from one output) never count as
+    crossing. Past ``deadline`` (a ``perf_counter`` value) the remaining
+    cells are skipped, so the counts are a lower bound. A freshly built
+    ``grid`` over the same segments is used instead of bucketing them
+    again (its cell size then applies).
+    """
+    n = len(xa)
+    counts = array("i", bytes(4 * n))
+    if n < 2:
+        return counts, 0
+    if grid is None:
+        if cell_size <= 0:
+            cell_size = median_cell_size(sorted(math.hypot(xb[i] - xa[i], yb[i] - ya[i]) for i in range(n)))
+        grid = SegmentGrid.build(xa, ya, xb, yb, cell_size)
+    inv, buckets = grid.inv, grid.buckets
+
+    min_x = array("d", map(min, xa, xb))
+    max_x = array("d", map(max, xa, xb))
+    min_y = array("d", map(min, ya, yb))
+    max_y = array("d", map(max, ya, yb))
+
+    total = 0
+    for (cell_x, cell_y), members in buckets.items():
+        if len(members) < 2:
+            continue
+        if deadline is not None and perf_counter() > deadline:
+            break
+        # Sweep the bucket left to right; stop once boxes can no longer overlap in x
+        members.sort(key=min_x.__getitem__)
+        for p in range(len(members)):
+            i = members[p]
+            ax, ay, bx, by = xa[i], ya[i], xb[i], yb[i]
+            i_max_x, i_min_y, i_max_y = max_x[i], min_y[i], max_y[i]
+            rx, ry = bx - ax, by - ay
+            i_a, i_b = ends_a[i], ends_b[i]
+            for q in range(p + 1, len(members)):
+                j = members[q]
+                if min_x[j] > i_max_x:
+                    break
+                if max_y[j] < i_min_y or min_y[j] > i_max_y:
+                    continue
+                if ends_a[j] == i_a or ends_a[j] == i_b or ends_b[j] == i_a or ends_b[j] == i_b:
+                    continue
+                cx, cy, dx, dy = xa[j], ya[j], xb[j], yb[j]
+                # Orientation test first: C and D strictly on opposite sides of AB
+                side_c = rx * (cy - ay) - ry * (cx - ax)
+                side_d = rx * (dy - ay) - ry * (dx - ax)
+                if (side_c > 0) == (side_d > 0) or not side_c or not side_d:
+                    continue
+                point = _crossing_point(ax, ay, bx, by, cx, cy, dx, dy)
+                if point is None:
+                    continue
+                px, py = point[0] * inv, point[1] * inv
+                hit_x, hit_y = math.floor(px), math.floor(py)
+                if hit_x != cell_x or hit_y != cell_y:
+                    # Well inside its cell the point is on both walks and counted there
+                    if (_EDGE < px - hit_x < 1.0 - _EDGE) and (_EDGE < py - hit_y < 1.0 - _EDGE):
+                        continue
+                    cells_i = set(_grid_cells(ax, ay, bx, by, inv))
+                    cells_j = set(_grid_cells(cx, cy, dx, dy, inv))
+                    if _crossing_cell(point, cells_i, cells_j, inv) != (cell_x, cell_y):
+                        continue
+                counts[i] += 1
+                counts[j] += 1
+                total += 1
+    return counts, total
+
+
+def median_cell_size(lengths: Sequence[float]) -> float:
+    """Default ``segment_crossings`` cell size from ascending segment lengths"""
+    return max(lengths[len(lengths) // 2], 1.0)
+
+
+def count_crossings(xa: array, ya: array, xb: array, yb: array, ends_a: array, ends_b: array,
+                    queries: Sequence[int], cell_size: float,
+                    grid: Optional[SegmentGrid] = None) -> List[Tuple[int, int]]:
+    """The crossing pairs ``segment_crossings`` counts that involve ``queries``
+
+    Each query segment is tested against every segment whose box overlaps
+    its own, or with a ``grid`` over the present segments (at
+    ``cell_size``) every segment sharing one of its cells, with the same
+    predicate, sweep order and per-cell attribution as the full pass, so
+    counts from a full pass can be patched after a few segments change.
+    Returns (query, other) pairs; pairs of two queries appear once.
+    """
+    n = len(xa)
+    inv = 1.0 / cell_size
+    if grid is None:
+        min_x = array("d", map(min, xa, xb))
+        max_x = array("d", map(max, xa, xb))
+        min_y = array("d", map(min, ya, yb))
+        max_y = array("d", map(max, ya, yb))
+    is_query = set(queries)
+    pairs = []
+    for i in queries:
+        i_a, i_b = ends_a[i], ends_b[i]
+        i_min_x = min(xa[i], xb[i])
+        cells_i = None
+        if grid is None:
+            i_max_x, i_min_y, i_max_y = max_x[i], min_y[i], max_y[i]
+            candidates = [j for j in range(n) if min_x[j] <= i_max_x and max_x[j] >= i_min_x
+                          and min_y[j] <= i_max_y and max_y[j] >= i_min_y]
+        else:
+            cells_i = set(_grid_cells(xa[i], ya[i], xb[i], yb[i], inv))
+            candidates = sorted(grid.candidates(cells_i))
+        for j in candidates:
+            if j == i or (j < i and j in is_query):
+                continue
+            if ends_a[j] == i_a or ends_a[j] == i_b or ends_b[j] == i_a or ends_b[j] == i_b:
+                continue
+            # The full pass tests each pair with the segment that comes first in its x sweep as AB
+            a, b = (i, j) if (i_min_x, i) <= (min(xa[j], xb[j]), j) else (j, i)
+            ax, ay, bx, by = xa[a], ya[a], xb[a], yb[a]
+            cx, cy, dx, dy = xa[b], ya[b], xb[b], yb[b]
+            rx, ry = bx - ax, by - ay
+            side_c = rx * (cy - ay) - ry * (cx - ax)
+            side_d = rx * (dy - ay) - ry * (dx - ax)
+            if (side_c > 0) == (side_d > 0) or not side_c or not side_d:
+                continue
+            point = _crossing_point(ax, ay, bx, by, cx, cy, dx, dy)
+            if point is None:
+                continue
+            if cells_i is None:
+                cells_i = set(_grid_cells(xa[i], ya[i], xb[i], yb[i], inv))
+            cells_j = set(_grid_cells(xa[j], ya[j], xb[j], yb[j], inv))
+            if _crossing_cell(point, cells_i, cells_j, inv) is not None:
+                pairs.append((i, j))
+    return pairs
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100.0 * len(sorted_values)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
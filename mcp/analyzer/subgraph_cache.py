@@ -0,0 +1,252 @@
+"""
+Subgraph Cache
+Shares per-node lint findings between definitions with the same subgraphs
+
+Definitions often repeat a copy-pasted section or cluster body. The
+wire graph is split into parts, connected runs of nodes in the same
+group (or in none), and each part is fingerprinted by its nodes' types,
+names, ports and settings and its wiring, inside and across its border
+(not guids, positions, group ids or timings). The findings of every
+``cacheable`` ``LocalVisitor`` for a part are stored on disk under that
+fingerprint, so a part seen before, in this definition or in an earlier
+one, is filled from the cache instead of visited.
+"""
+import hashlib
+import os
+import sys
+from collections import Counter
+from operator import attrgetter
+from typing import Any, Dict, List, Optional, Sequence
+
+from .graph import DefinitionGraph, GraphVisitor, LocalVisitor
+from .parse_cache import DiskCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+
+
+DEFAULT_SUBGRAPH_DIR = os.path.join(DEFAULT_CACHE_DIR, "subgraphs")
+
+# Parts smaller than this are visited directly; a disk read costs more
+MIN_SUBGRAPH_NODES = 8
+
+# Modules whose code shapes fingerprints; editing any of them changes
+# the version stamp and invalidates every entry
+_FINGERPRINT_MODULES = ("graph.py", "model.py", "subgraph_cache.py")
+
+# Bump when the entry layout itself changes
+_ENTRY_FORMAT = 1
+
+# Extra node keys that place or time a node rather than define it
+_PLACEMENT_KEYS = ("bounds", "time_ms")
+
+# Port fields a signature covers (wire counts depend on the wiring, which is hashed separately)
+_port_fields = attrgetter("index", "name", "tree_access", "optional", "extra")
+
+
+def _source_digest(paths: Sequence[str]) -> str:
+    digest = hashlib.sha1(str(_ENTRY_FORMAT).encode())
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        except OSError:
+            digest.update(path.encode())
+    return digest.hexdigest()[:16]
+
+
+def fingerprint_version() -> str:
+    """Version stamp derived from the fingerprinting sources"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    return _source_digest([os.path.join(here, name) for name in _FINGERPRINT_MODULES])
+
+
+_visitor_versions: Dict[str, str] = {}
+
+
+def visitor_version(visitor: GraphVisitor) -> str:
+    """Version stamp of the module defining a visitor's class"""
+    module = type(visitor).__module__
+    if module not in _visitor_versions:
+        path = getattr(sys.modules.get(module), "__file__", None)
+        _visitor_versions[module] = _source_digest([path or module])
+    return _visitor_versions[module]
+
+
+def node_signature(node) -> str:
+    """A node's fields and ports, without guid, position, group id, timing or wire counts"""
+    extra = node.extra
+    if extra and any(key in extra for key in _PLACEMENT_KEYS):
+        extra = {k: v for k, v in extra.items() if k not in _PLACEMENT_KEYS} or None
+    return repr((node.is_component, node.name, node.type, node.category, node.subcategory,
+                 bool(node.group), node.param_kind, node.absent, extra,
+                 node.inputs and list(map(_port_fields, node.inputs)),
+                 node.outputs and list(map(_port_fields, node.outputs))))
+
+
+def subgraph_parts(graph: DefinitionGraph) -> List[List[int]]:
+    """Connected runs of nodes sharing a group, or sharing none
+
+    A group id held by a single node (some exports record the object
+    itself) counts as none.
+    """
+    groups = [node.group for node in graph.model.nodes]
+    shared = Counter(groups)
+    return graph.weakly_connected([group if shared[group] > 1 else None for group in groups])
+
+
+def subgraph_fingerprint(graph: DefinitionGraph, members: List[int],
+                         signatures: Optional[Dict[int, str]] = None) -> str:
+    """Structural hash of a part (``members`` in id order)
+
+    Covers each member's ``node_signature`` in order, its incoming wires
+    in order (by source position inside the part, else by the source's
+    signature) with their ports, and the ports of its wires leaving the
+    part. ``signatures`` memoizes signatures by node id.
+    """
+    model = graph.model
+    nodes, n_nodes = model.nodes, model.n_nodes
+    wire_src, wire_dst = model.wire_src, model.wire_dst
+    src_port, src_names = model.wire_src_port, model.wire_src_names
+    dst_port, dst_names = model.wire_dst_port, model.wire_dst_names
+    if signatures is None:
+        signatures = {}
+
+    def signature(v):
+        if v >= n_nodes:
+            return None
+        if v not in signatures:
+            signatures[v] = node_signature(nodes[v])
+        return signatures[v]
+
+    local = {v: i for i, v in enumerate(members)}
+    parts = []
+    for v in members:
+        inputs = []
+        for w in graph.in_edges(v):
+            u = wire_src[w]
+            inputs.append((local[u] if u in local else signature(u),
+                           src_port[w], src_names[w], dst_port[w], dst_names[w]))
+        outputs = [(src_port[w], src_names[w], dst_port[w], dst_names[w])
+                   for w in graph.out_edges(v) if wire_dst[w] not in local]
+        parts.append(signature(v))
+        parts.append(repr((inputs, outputs)))
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class SubgraphCache(DiskCache):
+    """On-disk findings of cacheable local passes and rules, by subgraph fingerprint
+
+    An entry holds, per visitor key and visitor source version, the
+    findings of one part by member position. ``traverse`` stands in for
+    ``DefinitionGraph.traverse``: cacheable ``LocalVisitor``s are filled
+    from entries (or, for a part first met in this run, from one visited
+    copy) and only the remaining nodes are visited; other visitors walk
+    as usual. A visitor cut off by a time budget (``truncated``) has
+    incomplete findings: they are never stored, and it gets no more
+    findings from entries either.
+
+    Set it as an analyzer's ``subgraph_cache`` to use it; it is off by
+    default because fingerprinting makes a cold lint slower than walking
+    (see ``create_subgraph_cache`` in the MCP server). Counters
+    accumulate over every ``traverse``: lookups of a part's findings for
+    one visitor (``hits``, ``misses``) and node visits made or skipped,
+    in total and per visitor.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_SUBGRAPH_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 min_nodes: int = MIN_SUBGRAPH_NODES):
+        super().__init__(cache_dir, max_bytes)
+        self.min_nodes = min_nodes
+        self.version = fingerprint_version()
+        self.hits = 0
+        self.misses = 0
+        self.visitors: Dict[str, Dict[str, int]] = {}
+
+    def traverse(self, graph: DefinitionGraph, visitors: Sequence[GraphVisitor]) -> List[Any]:
+        """``graph.traverse(visitors)``, reusing cached findings where possible"""
+        cached = [p for p in visitors if isinstance(p, LocalVisitor) and p.cacheable]
+        if not cached:
+            return graph.traverse(visitors)
+        walked = [p for p in visitors if not (isinstance(p, LocalVisitor) and p.cacheable)]
+        results = dict(zip(map(id, walked), graph.traverse(walked)))
+        self._fill(graph, cached)
+        return [results[id(p)] if id(p) in results else p.finish() for p in visitors]
+
+    def _fill(self, graph: DefinitionGraph, visitors: List[LocalVisitor]):
+        model = graph.model
+        nodes, guids = model.nodes, model.guids
+        keys = [(repr(p.key), visitor_version(p)) for p in visitors]
+        counts = [self.visitors.setdefault(p.key[0], {"visited": 0, "skipped": 0}) for p in visitors]
+        for p in visitors:
+            p.begin(graph)
+
+        copies: Dict[str, List[List[int]]] = {}
+        loose = []
+        signatures = {}
+        for members in subgraph_parts(graph):
+            if len(members) < self.min_nodes:
+                loose.extend(members)
+            else:
+                copies.setdefault(subgraph_fingerprint(graph, members, signatures), []).append(members)
+
+        for p, count in zip(visitors, counts):
+            for v in loose:
+                p.visit_node(v, nodes[v])
+            count["visited"] += len(loose)
+
+        written = False
+        for fingerprint, parts in copies.items():
+            entry_path = self._entry_path((fingerprint, self.version))
+            entry = self._read(entry_path)
+            if entry is None or entry.get("fingerprint") != fingerprint:
+                entry = {"fingerprint": fingerprint, "findings": {}}
+            stored = entry["findings"]
+            changed = False
+            for p, key, count in zip(visitors, keys, counts):
+                if p.truncated:
+                    continue
+                findings = p.findings
+                found = stored.get(key)
+                reuse = parts
+                if found is None:
+                    self.misses += 1
+                    members, reuse = parts[0], parts[1:]
+                    for v in members:
+                        p.visit_node(v, nodes[v])
+                    count["visited"] += len(members)
+                    if p.truncated:
+                        continue
+                    found = stored[key] = {i: findings[guids[v]] for i, v in enumerate(members)
+                                           if guids[v] in findings}
+                    changed = True
+                else:
+                    self.hits += 1
+                for members in reuse:
+                    for i, value in found.items():
+                        findings[guids[members[i]]] = value
+                    count["skipped"] += len(members)
+            if changed:
+                self._write(entry_path, entry, evict=False)
+                written = True
+        if written:
+            self._evict()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Lookup counters, node visits skipped and current size"""
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        visited = sum(c["visited"] for c in self.visitors.values())
+        skipped = sum(c["skipped"] for c in self.visitors.values())
+        return {
+            "cache_dir": self.cache_dir,
+            "version": self.version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "node_visits": visited,
+            "node_visits_skipped": skipped,
+            "skipped_share": skipped / (visited + skipped) if visited + skipped else 0.0,
+            "visitors": {name: dict(c) for name, c in self.visitors.items()},
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes
+        }
@@ -0,0 +1,108 @@
+"""
+Incremental lint times against a full lint after one-component edits
+
+Lints a layered definition of ``count`` components (50k by default),
+then applies each edit to a copy and times a full ``lint_all`` of the
+edited definition against ``lint_incremental`` from the first lint,
+model diff included, best of ``REPEAT`` runs. Loading the definition is
+not timed, and garbage collection is off while timing. With ``--check`` the incremental
+issues are also compared against the full lint.
+
+    python benchmarks/bench_incremental.py [count] [--check]
+"""
+import copy
+import gc
+import json
+import os
+import random
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer.gh_analyzer import GHAnalyzer
+from analyzer.gh_linter import GHLinter
+from generators import layered_definition
+
+REPEAT = 3
+
+
+def timed(call):
+    gc.collect()
+    gc.disable()
+    try:
+        start = perf_counter()
+        call()
+        return perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def _component(data, guid):
+    return next(c for c in data["components"] if c["guid"] == guid)
+
+
+def edits(data, rng):
+    """(name, edit) pairs, each touching one component or wire of ``data``"""
+    guids = [c["guid"] for c in data["components"]]
+    moved, retyped, copied, removed = rng.sample(guids, 4)
+    rewired = rng.randrange(len(data["wires"]))
+    # Components come in column order, so an earlier one is never downstream
+    target = rng.choice(guids[:guids.index(data["wires"][rewired]["to"]["guid"])])
+
+    def move(d):
+        x, y = _component(d, moved)["pos"]
+        _component(d, moved)["pos"] = [x + 537.0, y - 211.0]
+
+    def retype(d):
+        _component(d, retyped).update(name="Expression", type="Expression", hidden=True)
+
+    def rewire(d):
+        # Exports list wires by target input, so a reconnected input keeps its place
+        d["wires"][rewired]["from"]["guid"] = target
+
+    def add(d):
+        new = copy.deepcopy(_component(d, copied))
+        new["guid"] = "added"
+        new["pos"] = [new["pos"][0] + 40.0, new["pos"][1] + 40.0]
+        d["components"].append(new)
+        d["wires"].append({"from": {"guid": target, "out_index": 0, "out_name": "R"},
+                           "to": {"guid": "added", "in_index": 0, "in_name": "A"}})
+
+    def remove(d):
+        d["components"] = [c for c in d["components"] if c["guid"] != removed]
+        d["wires"] = [w for w in d["wires"] if removed not in (w["from"]["guid"], w["to"]["guid"])]
+
+    return [("move", move), ("retype", retype), ("rewire", rewire), ("add", add), ("remove", remove)]
+
+
+def linter_for(data):
+    return GHLinter.from_analyzer(GHAnalyzer.from_data(copy.deepcopy(data)))
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    count = int(args[0]) if args else 50_000
+    data = layered_definition(count)
+    print(f"{count} components, {len(data['wires'])} wires")
+    base = linter_for(data)
+    print(f"first lint: {timed(base.lint_all):.3f} s")
+    for name, edit in edits(data, random.Random(1)):
+        edited = copy.deepcopy(data)
+        edit(edited)
+        full_time = incremental_time = float("inf")
+        for _ in range(REPEAT):
+            full, incremental = linter_for(edited), linter_for(edited)
+            full_time = min(full_time, timed(full.lint_all))
+            incremental_time = min(incremental_time, timed(lambda: incremental.lint_incremental(base)))
+        print(f"{name}: full {full_time:.3f} s, incremental {incremental_time:.3f} s "
+              f"(x{full_time / incremental_time:.1f})")
+        if "--check" in sys.argv:
+            assert json.dumps(full.issues, sort_keys=True, default=str) == \
+                json.dumps(incremental.issues, sort_keys=True, default=str), f"{name}: issues differ"
+    if "--check" in sys.argv:
+        print("full lint check: ok")
+
+
+if __name__ == "__main__":
+    main()
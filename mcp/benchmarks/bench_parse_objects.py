@@ -0,0 +1,49 @@
+"""
+Object pass of GHXParser over a preloaded tree, on wide components
+
+Times ``_parse_object`` over every object of a synthetic GHX whose
+components have many inputs and outputs (40 x 200/200 by default), so
+per-field lookup cost dominates. Run it on checkouts before and after a
+parser change to compare.
+
+    python benchmarks/bench_parse_objects.py [components] [width] [repeats]
+"""
+import os
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer.ghx_parser import GHXParser
+from generators import wide_ghx
+
+
+def object_pass(path: str) -> float:
+    """Seconds spent parsing every object of an already loaded tree"""
+    # A full parse sets up whatever state the checkout's parser keeps
+    parser = GHXParser(path)
+    parser.data["components"].clear()
+    parser.data["params"].clear()
+    root = ET.parse(path).getroot()
+    objects = root.find('.//chunk[@name="DefinitionObjects"]').findall('chunks/chunk[@name="Object"]')
+    start = perf_counter()
+    for obj in objects:
+        parser._parse_object(obj)
+    return perf_counter() - start
+
+
+def main():
+    components = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    with tempfile.TemporaryDirectory() as tmp:
+        path = wide_ghx(os.path.join(tmp, "wide.ghx"), components, width)
+        best = min(object_pass(path) for _ in range(repeats))
+    print(f"{components} components x {width} inputs/{width} outputs: object pass {best:.3f} s "
+          f"(best of {repeats})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+SpatialIndex build and query times on random canvas boxes
+
+Builds the index over ``count`` boxes (100k by default) and times all
+overlapping pairs, 1000 range queries and 1000 5-nearest queries. With
+``--check`` every result is also compared against a brute-force scan
+(slow: the pair check is quadratic, so use a smaller count).
+
+    python benchmarks/bench_spatial.py [count] [--check]
+"""
+import os
+import random
+import sys
+from time import perf_counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer.spatial import SpatialIndex
+from generators import random_boxes
+
+QUERIES = 1000
+NEAREST_K = 5
+
+
+def timed(label, call):
+    start = perf_counter()
+    result = call()
+    print(f"{label}: {perf_counter() - start:.3f} s")
+    return result
+
+
+def brute_force_check(index, boxes, pairs, ranges, range_hits, points, nearest_hits):
+    def intersects(a, b):
+        return a[0] <= b[2] and a[2] >= b[0] and a[1] <= b[3] and a[3] >= b[1]
+
+    expected_pairs = [(i, j) for i in range(len(boxes)) for j in range(i + 1, len(boxes))
+                      if intersects(boxes[i], boxes[j])]
+    assert pairs == expected_pairs, "overlapping pairs differ"
+    for rect, hits in zip(ranges, range_hits):
+        assert hits == [i for i, box in enumerate(boxes) if intersects(box, rect)], "range differs"
+    for (x, y), hits in zip(points, nearest_hits):
+        distances = sorted(index._distance(i, x, y) for i in range(len(boxes)))[:NEAREST_K]
+        assert [d for d, _ in hits] == distances, "nearest differs"
+    print("brute-force check: ok")
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    count = int(args[0]) if args else 100_000
+    boxes = random_boxes(count)
+    extent = max(box[2] for box in boxes)
+    rng = random.Random(1)
+    ranges = []
+    for _ in range(QUERIES):
+        x, y = rng.uniform(0, extent), rng.uniform(0, extent)
+        ranges.append((x, y, x + 500.0, y + 300.0))
+    points = [(rng.uniform(0, extent), rng.uniform(0, extent)) for _ in range(QUERIES)]
+
+    print(f"{count} boxes")
+    index = timed("build", lambda: SpatialIndex(boxes))
+    pairs = timed("all overlapping pairs", index.overlapping_pairs)
+    range_hits = timed(f"{QUERIES} range queries", lambda: [index.query_range(*rect) for rect in ranges])
+    nearest_hits = timed(f"{QUERIES} {NEAREST_K}-NN queries",
+                         lambda: [index.nearest(x, y, NEAREST_K) for x, y in points])
+    print(f"{len(pairs)} overlapping pairs")
+    if "--check" in sys.argv:
+        brute_force_check(index, boxes, pairs, ranges, range_hits, points, nearest_hits)
+
+
+if __name__ == "__main__":
+    main()
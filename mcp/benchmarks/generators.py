@@ -0,0 +1,83 @@
+"""
+Benchmark Inputs
+Synthetic definitions and canvas boxes for the scripts in this directory
+
+Every generator is seeded, so reruns produce the same inputs.
+"""
+import copy
+import os
+import random
+import xml.etree.ElementTree as ET
+from typing import List, Tuple
+
+SAMPLE_GHX = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                          "utilities", "dual_save.ghx")
+
+
+def wide_ghx(path: str, components: int = 40, width: int = 200, source: str = SAMPLE_GHX) -> str:
+    """Write a GHX of ``components`` copies of the source's first component, each with
+    ``width`` inputs and ``width`` outputs"""
+    tree = ET.parse(source)
+    chunks = tree.getroot().find('.//chunk[@name="DefinitionObjects"]').find("chunks")
+    prototype = list(chunks)[0]
+    param_data = prototype.find('.//chunk[@name="ParameterData"]')
+    param_chunks = param_data.find("chunks")
+    inputs = [c for c in param_chunks if c.get("name") == "InputParam"]
+    outputs = [c for c in param_chunks if c.get("name") == "OutputParam"]
+    for chunk in list(param_chunks):
+        param_chunks.remove(chunk)
+    for template in (inputs[0], outputs[-1]):
+        for i in range(width):
+            chunk = copy.deepcopy(template)
+            chunk.set("index", str(i))
+            param_chunks.append(chunk)
+    for item in param_data.find("items"):
+        if item.get("name") in ("InputCount", "OutputCount"):
+            item.text = str(width)
+    for obj in list(chunks):
+        chunks.remove(obj)
+    for i in range(components):
+        obj = copy.deepcopy(prototype)
+        obj.set("index", str(i))
+        chunks.append(obj)
+    chunks.set("count", str(components))
+    tree.write(path, encoding="utf-8", xml_declaration=True)
+    return path
+
+
+def random_boxes(count: int, seed: int = 16) -> List[Tuple[float, float, float, float]]:
+    """Component-sized boxes scattered over a canvas that grows with ``count``"""
+    rng = random.Random(seed)
+    extent = 150.0 * count ** 0.5
+    boxes = []
+    for _ in range(count):
+        x, y = rng.uniform(0, extent), rng.uniform(0, extent)
+        w, h = rng.uniform(40, 160), rng.uniform(20, 80)
+        boxes.append((x, y, x + w, y + h))
+    return boxes
+
+
+def layered_definition(count: int, seed: int = 7, column: int = 60) -> dict:
+    """A definition dict of ``count`` two-input components laid out in columns of
+    ``column``, each input wired (nine times in ten) from a nearby row one to four
+    columns to the left"""
+    rng = random.Random(seed)
+    components, wires = [], []
+    for i in range(count):
+        col, row = divmod(i, column)
+        components.append({
+            "guid": f"{rng.getrandbits(128):032x}", "name": f"C{i % 7}", "type": f"T{i % 7}",
+            "category": "Maths", "subcategory": "Ops",
+            "pos": [col * 220.0 + rng.uniform(-20, 20), row * 70.0 + rng.uniform(-10, 10)],
+            "inputs": [{"index": 0, "name": "A"}, {"index": 1, "name": "B"}],
+            "outputs": [{"index": 0, "name": "R"}],
+        })
+    for i in range(column, count):
+        col, row = divmod(i, column)
+        for k in range(2):
+            if rng.random() < 0.9:
+                back = 1 if rng.random() < 0.8 else rng.randint(2, 4)
+                source = max(col - back, 0) * column + min(max(row + rng.randint(-4, 4), 0), column - 1)
+                wires.append({"from": {"guid": components[source]["guid"], "out_index": 0, "out_name": "R"},
+                              "to": {"guid": components[i]["guid"], "in_index": k, "in_name": "AB"[k]}})
+    return {"document": {"title": "layered"}, "components": components, "params": [], "wires": wires}
@@ -2,7 +2,7 @@
 # -*- coding: utf-8 -*-
 """
 Grasshopper Analyzer MCP Server
-Analyzes Grasshopper definitions (JSON and GHX formats)
+Analyzes Grasshopper definitions (JSON, GHX and binary GH formats)
 Provides parsing, linting, suggestions, and diff tools
 """
 import asyncio
@@ -27,6 +27,8 @@ except ImportError:
 try:
     from analyzer import GHAnalyzer, GHLinter, LINT_RULES
     from analyzer.ghx_parser import GHXParser
+    from analyzer.parse_cache import ParseCache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+    from analyzer.subgraph_cache import SubgraphCache
 except ImportError as e:
     print(f"Error importing analyzer modules: {e}", file=sys.stderr)
     print("Make sure analyzer package is in PYTHONPATH", file=sys.stderr)
@@ -38,43 +40,99 @@ def detect_format(path: str) -> str:
     ext = os.path.splitext(path)[1].lower()
     if ext == ".json":
         return "json"
-    elif ext in [".ghx", ".gh"]:
+    elif ext == ".ghx":
         return "ghx"
+    elif ext == ".gh":
+        return "gh"
     return "json"
 
 
-def load_analyzer(path: str, format_type: str = "auto"):
-    """Load appropriate analyzer based on format"""
+def create_parse_cache():
+    """Create the on-disk parse cache from environment settings
+    
+    GH_ANALYZER_CACHE=0 disables it; GH_ANALYZER_CACHE_DIR, GH_ANALYZER_CACHE_MB
+    and GH_ANALYZER_CACHE_VERIFY=1 (content hash check) configure it.
+    """
+    if os.environ.get("GH_ANALYZER_CACHE", "1") == "0":
+        return None
+    try:
+        max_mb = os.environ.get("GH_ANALYZER_CACHE_MB")
+        return ParseCache(
+            cache_dir=os.environ.get("GH_ANALYZER_CACHE_DIR", DEFAULT_CACHE_DIR),
+            max_bytes=int(max_mb) * 1024 * 1024 if max_mb else DEFAULT_MAX_BYTES,
+            verify_hash=os.environ.get("GH_ANALYZER_CACHE_VERIFY", "0") == "1"
+        )
+    except (OSError, ValueError) as e:
+        print(f"Parse cache disabled: {e}", file=sys.stderr)
+        return None
+
+
+parse_cache = create_parse_cache()
+
+
+def create_subgraph_cache():
+    """Create the on-disk cache of per-subgraph lint findings from environment settings
+    
+    Opt-in with GH_ANALYZER_SUBGRAPH_CACHE=1 (GH_ANALYZER_CACHE=0 still
+    disables it). Fingerprinting costs about as much per node as the
+    per-node rules it saves, so a cold lint runs about 30% slower for a
+    10-25% gain once warm; it pays off only when many definitions share
+    copy-pasted sections. Lives in a ``subgraphs`` directory under the
+    parse cache directory, with the same size limit.
+    """
+    if os.environ.get("GH_ANALYZER_CACHE", "1") == "0" or os.environ.get("GH_ANALYZER_SUBGRAPH_CACHE", "0") != "1":
+        return None
+    try:
+        max_mb = os.environ.get("GH_ANALYZER_CACHE_MB")
+        return SubgraphCache(
+            cache_dir=os.path.join(os.environ.get("GH_ANALYZER_CACHE_DIR", DEFAULT_CACHE_DIR), "subgraphs"),
+            max_bytes=int(max_mb) * 1024 * 1024 if max_mb else DEFAULT_MAX_BYTES
+        )
+    except (OSError, ValueError) as e:
+        print(f"Subgraph cache disabled: {e}", file=sys.stderr)
+        return None
+
+
+subgraph_cache = create_subgraph_cache()
+
+# Process-pool size for GHX parsing (GH_ANALYZER_WORKERS, 0 = serial streaming)
+try:
+    PARSE_WORKERS = int(os.environ.get("GH_ANALYZER_WORKERS", "0"))
+except ValueError:
+    PARSE_WORKERS = 0
+
+
+def load_definition(path: str, format_type: str = "auto") -> dict:
+    """Load the parsed definition dict, from the parse cache when possible"""
     if format_type == "auto":
         format_type = detect_format(path)
     
-    if format_type == "ghx":
-        parser = GHXParser(path)
-        json_data = parser.to_json_format()
-        analyzer = GHAnalyzer.__new__(GHAnalyzer)
-        analyzer.data = json_data
-        analyzer.components = json_data.get('components', [])
-        analyzer.params = json_data.get('params', [])
-        analyzer.wires = json_data.get('wires', [])
-        analyzer.warnings = json_data.get('warnings', [])
-        return analyzer
+    if parse_cache is not None:
+        data = parse_cache.get(path, format_type)
+        if data is not None:
+            return data
+    
+    if format_type in ("ghx", "gh"):
+        data = GHXParser(path, streaming=True, workers=PARSE_WORKERS).to_json_format()
     else:
-        return GHAnalyzer(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    
+    if parse_cache is not None:
+        parse_cache.put(path, format_type, data)
+    return data
+
+
+def load_analyzer(path: str, format_type: str = "auto"):
+    """Load appropriate analyzer based on format"""
+    analyzer = GHAnalyzer.from_data(load_definition(path, format_type))
+    analyzer.subgraph_cache = subgraph_cache
+    return analyzer
 
 
 def load_linter(path: str, format_type: str = "auto"):
     """Load linter for the definition"""
-    if format_type == "auto":
-        format_type = detect_format(path)
-    
-    if format_type == "ghx":
-        analyzer = load_analyzer(path, format_type)
-        linter = GHLinter.__new__(GHLinter)
-        linter.analyzer = analyzer
-        linter.issues = []
-        return linter
-    else:
-        return GHLinter(path)
+    return GHLinter.from_analyzer(load_analyzer(path, format_type))
 
 
 def generate_suggestions(overview: dict, issues: list, goal: str) -> list:
@@ -140,18 +198,20 @@ def generate_suggestions(overview: dict, issues: list, goal: str) -> list:
 
 def calculate_diff(analyzer_a, analyzer_b) -> dict:
     """Calculate differences between two definitions"""
-    guids_a = set(c['guid'] for c in analyzer_a.components)
-    guids_b = set(c['guid'] for c in analyzer_b.components)
+    model_a = analyzer_a.model
+    model_b = analyzer_b.model
+    guids_a = set(c.guid for c in model_a.iter_components())
+    guids_b = set(c.guid for c in model_b.iter_components())
     
     added = guids_b - guids_a
     removed = guids_a - guids_b
     common = guids_a & guids_b
     
-    added_comps = [c for c in analyzer_b.components if c['guid'] in added]
-    removed_comps = [c for c in analyzer_a.components if c['guid'] in removed]
+    added_comps = [c.to_dict() for c in model_b.iter_components() if c.guid in added][:10]
+    removed_comps = [c.to_dict() for c in model_a.iter_components() if c.guid in removed][:10]
     
-    wires_a_set = set((w['from']['guid'], w['to']['guid']) for w in analyzer_a.wires)
-    wires_b_set = set((w['from']['guid'], w['to']['guid']) for w in analyzer_b.wires)
+    wires_a_set = set((model_a.guids[s], model_a.guids[d]) for s, d in zip(model_a.wire_src, model_a.wire_dst))
+    wires_b_set = set((model_b.guids[s], model_b.guids[d]) for s, d in zip(model_b.wire_src, model_b.wire_dst))
     
     wires_added = len(wires_b_set - wires_a_set)
     wires_removed = len(wires_a_set - wires_b_set)
@@ -161,8 +221,8 @@ def calculate_diff(analyzer_a, analyzer_b) -> dict:
             "added": len(added),
             "removed": len(removed),
             "unchanged": len(common),
-            "added_details": added_comps[:10],
-            "removed_details": removed_comps[:10]
+            "added_details": added_comps,
+            "removed_details": removed_comps
         },
         "wires": {
             "added": wires_added,
@@ -182,7 +242,7 @@ async def list_tools() -> list[Tool]:
     return [
         Tool(
             name="gh_parse",
-            description="Parse and analyze a Grasshopper definition file (JSON or GHX format). Returns overview, statistics, and metrics.",
+            description="Parse and analyze a Grasshopper definition file (JSON, GHX or binary GH format). Returns overview, statistics, and metrics.",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -192,9 +252,14 @@ async def list_tools() -> list[Tool]:
                     },
                     "format": {
                         "type": "string",
-                        "enum": ["auto", "json", "ghx"],
+                        "enum": ["auto", "json", "ghx", "gh"],
                         "default": "auto",
                         "description": "File format (auto-detected if not specified)"
+                    },
+                    "header_only": {
+                        "type": "boolean",
+                        "default": False,
+                        "description": "Only read document info and plugin libraries (fast on huge GHX/GH files)"
                     }
                 },
                 "required": ["path"]
@@ -212,13 +277,18 @@ async def list_tools() -> list[Tool]:
                     },
                     "format": {
                         "type": "string",
-                        "enum": ["auto", "json", "ghx"],
+                        "enum": ["auto", "json", "ghx", "gh"],
                         "default": "auto"
                     },
                     "rules": {
                         "type": "array",
                         "items": {"type": "string"},
                         "description": "Optional: Specific rule IDs to check"
+                    },
+                    "budget_ms": {
+                        "type": "number",
+                        "default": 30000,
+                        "description": "Wall-time budget per rule in milliseconds; a rule past it is cut short and marked partial"
                     }
                 },
                 "required": ["path"]
@@ -240,7 +310,7 @@ async def list_tools() -> list[Tool]:
                     },
                     "format": {
                         "type": "string",
-                        "enum": ["auto", "json", "ghx"],
+                        "enum": ["auto", "json", "ghx", "gh"],
                         "default": "auto"
                     }
                 },
@@ -263,13 +333,124 @@ async def list_tools() -> list[Tool]:
                     },
                     "format": {
                         "type": "string",
-                        "enum": ["auto", "json", "ghx"],
+                        "enum": ["auto", "json", "ghx", "gh"],
                         "default": "auto"
                     }
                 },
                 "required": ["path_a", "path_b"]
             }
         ),
+        Tool(
+            name="gh_impact",
+            description="Which components recompute when an object changes (downstream cone) or feed into it (upstream cone). Without a guid, ranks every unwired input (sliders, panels, toggles) by how many components it drives.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "Path to GH definition file"
+                    },
+                    "guid": {
+                        "type": "string",
+                        "description": "Instance guid of the component or parameter to query"
+                    },
+                    "direction": {
+                        "type": "string",
+                        "enum": ["downstream", "upstream"],
+                        "default": "downstream"
+                    },
+                    "format": {
+                        "type": "string",
+                        "enum": ["auto", "json", "ghx", "gh"],
+                        "default": "auto"
+                    }
+                },
+                "required": ["path"]
+            }
+        ),
+        Tool(
+            name="gh_critical_path",
+            description="Estimate solve time from component timings: the heaviest timed chain through the wire graph, total cost, and per-component slack",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "Path to GH definition file"
+                    },
+                    "timings": {
+                        "type": "object",
+                        "additionalProperties": {"type": "number"},
+                        "description": "Milliseconds per object guid (e.g. from GHLiveAnalyzer.profile_document); defaults to timings stored in the JSON export"
+                    },
+                    "top": {
+                        "type": "integer",
+                        "default": 20,
+                        "description": "Number of least-slack components to list"
+                    },
+                    "format": {
+                        "type": "string",
+                        "enum": ["auto", "json", "ghx", "gh"],
+                        "default": "auto"
+                    }
+                },
+                "required": ["path"]
+            }
+        ),
+        Tool(
+            name="gh_spatial",
+            description="Spatial queries on the canvas layout: overlapping objects, objects in a rectangle, or objects nearest a point",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "path": {
+                        "type": "string",
+                        "description": "Path to GH definition file"
+                    },
+                    "query": {
+                        "type": "string",
+                        "enum": ["overlaps", "range", "nearest"],
+                        "default": "overlaps",
+                        "description": "overlaps: objects drawn on top of each other; range: objects in 'rect'; nearest: 'k' objects closest to 'point'"
+                    },
+                    "rect": {
+                        "type": "array",
+                        "items": {"type": "number"},
+                        "description": "Canvas rectangle [min_x, min_y, max_x, max_y] for range queries"
+                    },
+                    "point": {
+                        "type": "array",
+                        "items": {"type": "number"},
+                        "description": "Canvas point [x, y] for nearest queries"
+                    },
+                    "k": {
+                        "type": "integer",
+                        "default": 5,
+                        "description": "Number of objects returned by nearest queries"
+                    },
+                    "format": {
+                        "type": "string",
+                        "enum": ["auto", "json", "ghx", "gh"],
+                        "default": "auto"
+                    }
+                },
+                "required": ["path"]
+            }
+        ),
+        Tool(
+            name="gh_cache_stats",
+            description="Show parse cache and subgraph lint cache statistics (hits, misses, lint work skipped, evictions, size). Optionally clear the caches.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "clear": {
+                        "type": "boolean",
+                        "default": False,
+                        "description": "Remove all entries of both caches after reporting"
+                    }
+                }
+            }
+        ),
         Tool(
             name="gh_list_rules",
             description="Get list of all available lint rules with descriptions",
@@ -296,6 +477,26 @@ async def call_tool(name: str, arguments: Any) -> Sequence[TextContent | ImageCo
                 text=json.dumps(result, indent=2)
             )]
         
+        elif name == "gh_cache_stats":
+            if parse_cache is None:
+                result = {"enabled": False}
+            else:
+                result = {"enabled": True, **parse_cache.get_stats()}
+                if arguments and arguments.get("clear"):
+                    parse_cache.clear()
+                    result["cleared"] = True
+            if subgraph_cache is None:
+                result["subgraph_cache"] = {"enabled": False}
+            else:
+                result["subgraph_cache"] = {"enabled": True, **subgraph_cache.get_stats()}
+                if arguments and arguments.get("clear"):
+                    subgraph_cache.clear()
+                    result["subgraph_cache"]["cleared"] = True
+            return [TextContent(
+                type="text",
+                text=json.dumps(result, indent=2)
+            )]
+        
         elif name == "gh_parse":
             path = arguments.get("path")
             format_type = arguments.get("format", "auto")
@@ -307,6 +508,21 @@ async def call_tool(name: str, arguments: Any) -> Sequence[TextContent | ImageCo
                 )]
             
             format_used = format_type if format_type != "auto" else detect_format(path)
+            
+            if arguments.get("header_only") and format_used in ("ghx", "gh"):
+                parser = GHXParser(path, header_only=True)
+                result = {
+                    "success": True,
+                    "path": path,
+                    "format": format_used,
+                    "document": parser.data["document"],
+                    "libraries": parser.data["libraries"]
+                }
+                return [TextContent(
+                    type="text",
+                    text=json.dumps(result, indent=2)
+                )]
+            
             analyzer = load_analyzer(path, format_type)
             overview = analyzer.get_overview()
             report = analyzer.generate_report()
@@ -318,6 +534,12 @@ async def call_tool(name: str, arguments: Any) -> Sequence[TextContent | ImageCo
                 "overview": overview,
                 "report": report
             }
+            internalized = analyzer.find_internalized_data()
+            if internalized["objects"]:
+                result["internalized_data"] = internalized
+            dead = analyzer.find_dead_subgraphs()
+            if dead["subgraphs"]:
+                result["dead_subgraphs"] = dead
             
             return [TextContent(
                 type="text",
@@ -337,10 +559,10 @@ async def call_tool(name: str, arguments: Any) -> Sequence[TextContent | ImageCo
             
             format_used = format_type if format_type != "auto" else detect_format(path)
             linter = load_linter(path, format_type)
-            issues = linter.lint_all()
-            
+            linter.rule_budget_ms = arguments.get("budget_ms", 30000)
             if rules:
-                issues = [i for i in issues if i['rule']['id'] in rules]
+                linter.select_rules(rules)
+            issues = linter.lint_all()
             
             result = {
                 "success": True,
@@ -353,6 +575,7 @@ async def call_tool(name: str, arguments: Any) -> Sequence[TextContent | ImageCo
                     "warnings": sum(1 for i in issues if i['rule']['severity'] == 'warning'),
                     "info": sum(1 for i in issues if i['rule']['severity'] == 'info')
                 },
+                "rule_stats": linter.rule_stats,
                 "report": linter.generate_lint_report()
             }
             
@@ -374,10 +597,10 @@ async def call_tool(name: str, arguments: Any) -> Sequence[TextContent | ImageCo
             
             format_used = format_type if format_type != "auto" else detect_format(path)
             analyzer = load_analyzer(path, format_type)
-            linter = load_linter(path, format_type)
+            linter = GHLinter.from_analyzer(analyzer)
             
             overview = analyzer.get_overview()
-            issues = linter.get_top_issues(10)
+            issues = linter.get_top_issues(10, items=False)
             suggestions = generate_suggestions(overview, issues, goal)
             
             result = {
@@ -393,6 +616,108 @@ async def call_tool(name: str, arguments: Any) -> Sequence[TextContent | ImageCo
                 text=json.dumps(result, indent=2)
             )]
         
+        elif name == "gh_impact":
+            path = arguments.get("path")
+            format_type = arguments.get("format", "auto")
+            guid = arguments.get("guid")
+            
+            if not os.path.exists(path):
+                return [TextContent(
+                    type="text",
+                    text=json.dumps({"error": f"File not found: {path}"}, indent=2)
+                )]
+            
+            format_used = format_type if format_type != "auto" else detect_format(path)
+            analyzer = load_analyzer(path, format_type)
+            
+            result = {
+                "success": True,
+                "path": path,
+                "format": format_used
+            }
+            if guid:
+                result["cone"] = analyzer.find_cone(guid, arguments.get("direction", "downstream"))
+            else:
+                result["inputs"] = analyzer.find_input_impact()
+            
+            return [TextContent(
+                type="text",
+                text=json.dumps(result, indent=2)
+            )]
+        
+        elif name == "gh_critical_path":
+            path = arguments.get("path")
+            format_type = arguments.get("format", "auto")
+            
+            if not os.path.exists(path):
+                return [TextContent(
+                    type="text",
+                    text=json.dumps({"error": f"File not found: {path}"}, indent=2)
+                )]
+            
+            format_used = format_type if format_type != "auto" else detect_format(path)
+            analyzer = load_analyzer(path, format_type)
+            critical = analyzer.find_critical_path(arguments.get("timings"), arguments.get("top", 20))
+            
+            result = {
+                "success": True,
+                "path": path,
+                "format": format_used,
+                **critical
+            }
+            
+            return [TextContent(
+                type="text",
+                text=json.dumps(result, indent=2)
+            )]
+        
+        elif name == "gh_spatial":
+            path = arguments.get("path")
+            format_type = arguments.get("format", "auto")
+            query = arguments.get("query", "overlaps")
+            
+            if not os.path.exists(path):
+                return [TextContent(
+                    type="text",
+                    text=json.dumps({"error": f"File not found: {path}"}, indent=2)
+                )]
+            
+            format_used = format_type if format_type != "auto" else detect_format(path)
+            analyzer = load_analyzer(path, format_type)
+            
+            if query == "range":
+                rect = arguments.get("rect")
+                if not rect or len(rect) != 4:
+                    return [TextContent(
+                        type="text",
+                        text=json.dumps({"error": "range query needs rect [min_x, min_y, max_x, max_y]"}, indent=2)
+                    )]
+                objects = analyzer.find_objects_in_region(*rect)
+            elif query == "nearest":
+                point = arguments.get("point")
+                if not point or len(point) != 2:
+                    return [TextContent(
+                        type="text",
+                        text=json.dumps({"error": "nearest query needs point [x, y]"}, indent=2)
+                    )]
+                objects = analyzer.find_nearest_objects(point[0], point[1], arguments.get("k", 5))
+            else:
+                objects = analyzer.find_overlapping_components()
+            
+            result = {
+                "success": True,
+                "path": path,
+                "format": format_used,
+                "query": query,
+                "count": len(objects),
+                "objects": objects
+            }
+            
+            return [TextContent(
+                type="text",
+                text=json.dumps(result, indent=2)
+            )]
+        
         elif name == "gh_diff":
             path_a = arguments.get("path_a")
             path_b = arguments.get("path_b")
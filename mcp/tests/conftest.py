@@ -0,0 +1,149 @@
+"""
+Shared fixtures: sample definitions and synthetic GHX files built from them
+"""
+import copy
+import os
+import random
+import sys
+import uuid
+import xml.etree.ElementTree as ET
+
+import pytest
+
+MCP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MCP_DIR)
+
+UTILITIES_DIR = os.path.join(MCP_DIR, "utilities")
+SAMPLE_GHX = os.path.join(UTILITIES_DIR, "dual_save.ghx")
+SAMPLE_GH = os.path.join(UTILITIES_DIR, "dual_save.gh")
+
+
+def replicate_ghx(path: str, count: int, source: str = SAMPLE_GHX) -> str:
+    """Write a GHX holding ``count`` copies of the source's objects, each with fresh guids"""
+    tree = ET.parse(source)
+    chunks = tree.getroot().find('.//chunk[@name="DefinitionObjects"]').find("chunks")
+    objects = list(chunks)
+    for obj in objects:
+        chunks.remove(obj)
+    for i in range(count):
+        obj = copy.deepcopy(objects[i % len(objects)])
+        obj.set("index", str(i))
+        for item in obj.iter("item"):
+            if item.get("name") == "InstanceGuid":
+                item.text = str(uuid.uuid4())
+        chunks.append(obj)
+    chunks.set("count", str(count))
+    tree.write(path, encoding="utf-8", xml_declaration=True)
+    return path
+
+
+def add_xml_cluster(path: str, source: str = SAMPLE_GHX) -> str:
+    """Write the source with a ClusterDocument chunk, holding the whole source definition, in its first object"""
+    tree = ET.parse(source)
+    root = tree.getroot()
+    body = copy.deepcopy(root.find("chunks"))
+    first = root.find('.//chunk[@name="DefinitionObjects"]').find('chunks/chunk[@name="Object"]')
+    container_chunks = first.find('chunks/chunk[@name="Container"]/chunks')
+    ET.SubElement(container_chunks, "chunk", name="ClusterDocument").append(body)
+    tree.write(path, encoding="utf-8", xml_declaration=True)
+    return path
+
+
+def component(guid: str, name: str = "Addition", inputs=("A", "B"), outputs=("R",), **extra):
+    """Component dict in the export_to_json format"""
+    return {"guid": guid, "name": name, "type": name, "category": "Maths", "subcategory": "Operators",
+            "pos": [0, 0], "inputs": [{"index": i, "name": n} for i, n in enumerate(inputs)],
+            "outputs": [{"index": i, "name": n} for i, n in enumerate(outputs)], **extra}
+
+
+def param(guid: str, name: str = "Number Slider", **extra):
+    """Standalone param dict in the export_to_json format"""
+    return {"guid": guid, "name": name, "param_kind": name, "pos": [0, 0], **extra}
+
+
+def wire(src: str, dst: str, out_index: int = 0, in_index: int = 0, out_name: str = "R", in_name: str = "A"):
+    """Wire dict in the export_to_json format"""
+    return {"from": {"guid": src, "out_index": out_index, "out_name": out_name},
+            "to": {"guid": dst, "in_index": in_index, "in_name": in_name}}
+
+
+def definition(components=(), params=(), wires=()):
+    """Definition dict in the export_to_json format"""
+    return {"document": {}, "components": list(components), "params": list(params), "wires": list(wires)}
+
+
+_SECTION_TYPES = ("Addition", "Move", "Flatten Tree", "Graft Tree", "Expression", "Data Dam", "Series",
+                  "Divide Curve", "Loft", "Area", "List Item", "Cull Pattern", "Entwine")
+
+
+def sectioned_definition(seed: int, sections: int = 40, templates: int = 6, template_seed: int = 7):
+    """Definition of grouped, copy-pasted sections glued together, with inputs, panels and timings
+
+    Sections are drawn from ``templates`` node/wire layouts shared by every
+    definition with the same ``template_seed``; ``seed`` picks which
+    sections, where they sit and how they are fed.
+    """
+    trng = random.Random(template_seed)
+    rng = random.Random(seed)
+    layouts = []
+    for _ in range(templates):
+        count = trng.randrange(8, 24)
+        nodes = []
+        for _ in range(count):
+            name = trng.choice(_SECTION_TYPES)
+            inputs = [{"index": j, "name": n, **({"tree_access": "tree"} if trng.random() < .15 else {})}
+                      for j, n in enumerate("ABC"[:trng.randrange(1, 4)])]
+            outputs = [{"index": j, "name": n} for j, n in enumerate("RS"[:trng.randrange(1, 3)])]
+            nodes.append({"name": name, "type": name, "category": trng.choice(["Maths", "Sets", "Curve"]),
+                          "subcategory": "Util", "inputs": inputs, "outputs": outputs,
+                          **({"hidden": True} if trng.random() < .1 else {})})
+        links = []
+        for i in range(1, count):
+            for _ in range(trng.randrange(1, 3)):
+                j = trng.randrange(i)
+                o, p = trng.randrange(len(nodes[j]["outputs"])), trng.randrange(len(nodes[i]["inputs"]))
+                links.append((j, o, i, p))
+        layouts.append((nodes, links))
+
+    components, wires, heads = [], [], []
+    for s in range(sections):
+        nodes, links = layouts[rng.randrange(templates)]
+        base = len(components)
+        x, y = rng.uniform(0, 8000), rng.uniform(0, 8000)
+        for i, node in enumerate(nodes):
+            components.append({**copy.deepcopy(node), "guid": f"c{seed}-{s}-{i}", "group": f"g{seed}-{s}",
+                               "pos": [x + 40 * (i % 6), y + 30 * (i // 6)],
+                               **({"time_ms": rng.random() * 200} if rng.random() < .05 else {})})
+        for j, o, i, p in links:
+            a, b = components[base + j], components[base + i]
+            wires.append(wire(a["guid"], b["guid"], o, p, a["outputs"][o]["name"], b["inputs"][p]["name"]))
+        heads.append((base, len(nodes)))
+    params = []
+    for i in range(sections * 2):
+        kind = rng.choice(["Panel", "Number Slider", "Scribble"])
+        params.append(param(f"p{seed}-{i}", rng.choice([kind, f"Len {i % 5}"]), param_kind=kind,
+                            pos=[rng.uniform(0, 8000), rng.uniform(0, 8000)],
+                            **({"panel_text": "x" * 2000} if kind == "Panel" else {})))
+        base, _ = rng.choice(heads)
+        wires.append(wire(params[-1]["guid"], components[base]["guid"], out_name="",
+                          in_name=components[base]["inputs"][0]["name"]))
+    for _ in range(sections // 2):
+        (b1, k1), (b2, _) = rng.sample(heads, 2)
+        a, b = components[b1 + k1 - 1], components[b2]
+        wires.append(wire(a["guid"], b["guid"], out_name=a["outputs"][0]["name"], in_name=b["inputs"][0]["name"]))
+    return definition(components, params, wires)
+
+
+@pytest.fixture
+def sample_ghx():
+    return SAMPLE_GHX
+
+
+@pytest.fixture
+def sample_gh():
+    return SAMPLE_GH
+
+
+@pytest.fixture
+def many_objects_ghx(tmp_path):
+    return replicate_ghx(str(tmp_path / "many.ghx"), 200)
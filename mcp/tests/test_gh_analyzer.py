@@ -0,0 +1,41 @@
+"""
+GHAnalyzer: sinks and dead subgraphs
+"""
+from analyzer.gh_analyzer import GHAnalyzer
+from analyzer.ghx_parser import GHXParser
+
+from conftest import component, definition, param, wire
+
+
+def _dead_names(analyzer):
+    result = analyzer.find_dead_subgraphs()
+    return sorted(name for piece in result["subgraphs"] for name in piece["components"])
+
+
+def test_without_preview_flag_only_geometry_outputs_are_sinks():
+    # GHX/.gh input: no preview_capable on any object
+    analyzer = GHAnalyzer.from_data(definition(
+        components=[component("add", "Addition"),
+                    component("line", "Line", inputs=("A", "B"), outputs=("Line",))],
+        params=[param("s1"), param("s2")],
+        wires=[wire("s1", "add", out_name="N"), wire("s2", "line", out_name="N")]))
+    add, line = analyzer.model.nodes[0], analyzer.model.nodes[1]
+    assert not analyzer.is_sink(add)
+    assert analyzer.is_sink(line)
+    assert _dead_names(analyzer) == ["Addition", "Number Slider"]
+
+
+def test_preview_flag_decides_when_recorded():
+    analyzer = GHAnalyzer.from_data(definition(
+        components=[component("add", "Addition", preview_capable=True),
+                    component("line", "Line", outputs=("Line",), preview_capable=False)]))
+    add, line = analyzer.model.nodes[0], analyzer.model.nodes[1]
+    assert analyzer.is_sink(add)
+    assert not analyzer.is_sink(line)
+
+
+def test_ghx_input_finds_dead_objects(tmp_path, sample_ghx):
+    data = GHXParser(sample_ghx).to_json_format()
+    data["components"].append(component("dead", "Addition"))
+    analyzer = GHAnalyzer.from_data(data)
+    assert "Addition" in _dead_names(analyzer)
@@ -0,0 +1,40 @@
+"""
+Binary .gh archive reader
+"""
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from analyzer.gh_archive import GHArchiveError, GHArchiveReader, decompress_gh, read_gh_archive
+from analyzer.ghx_parser import GHXParser
+
+
+def _assert_same_tree(a, b, path=""):
+    assert (a.tag, a.attrib) == (b.tag, b.attrib), path
+    assert (a.text or "").strip() == (b.text or "").strip(), path
+    assert len(a) == len(b), path
+    for x, y in zip(a, b):
+        _assert_same_tree(x, y, f"{path}/{x.get('name') or x.tag}")
+
+
+def test_archive_tree_matches_ghx(sample_gh, sample_ghx):
+    _assert_same_tree(read_gh_archive(sample_gh), ET.parse(sample_ghx).getroot())
+
+
+def test_gh_and_ghx_parse_the_same(sample_gh, sample_ghx):
+    assert GHXParser(sample_gh).to_json_format() == GHXParser(sample_ghx).to_json_format()
+
+
+def test_stop_at_reads_header_only(sample_gh, sample_ghx):
+    root = read_gh_archive(sample_gh, stop_at="DefinitionObjects")
+    assert root.find('.//chunk[@name="DefinitionProperties"]') is not None
+    assert root.find('.//chunk[@name="Object"]') is None
+    header = GHXParser(sample_gh, header_only=True)
+    assert header.data["document"] == GHXParser(sample_ghx).data["document"]
+
+
+def test_truncated_archive_raises(sample_gh):
+    with open(sample_gh, "rb") as f:
+        raw = decompress_gh(f.read())
+    with pytest.raises(GHArchiveError):
+        GHArchiveReader(raw[:len(raw) // 2]).read()
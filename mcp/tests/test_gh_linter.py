@@ -0,0 +1,167 @@
+"""
+GHLinter: lint state, incremental lint and the subgraph cache
+"""
+import copy
+
+import pytest
+
+from analyzer.gh_analyzer import GHAnalyzer
+from analyzer.gh_linter import GHLinter
+from analyzer.rule_engine import LintRule
+from analyzer.subgraph_cache import SubgraphCache
+
+from conftest import component, definition, param, sectioned_definition, wire
+
+
+def _clean_linter():
+    analyzer = GHAnalyzer.from_data(definition(
+        components=[component("add", "Addition")],
+        params=[param("s1"), param("panel", "Panel")],
+        wires=[wire("s1", "add", out_name="N"), wire("s1", "add", in_index=1, out_name="N", in_name="B"),
+               wire("add", "panel", in_name="Panel")]))
+    linter = GHLinter.from_analyzer(analyzer)
+    linter.select_rules(["GH001"])
+    return linter
+
+
+def test_lint_with_no_issues_counts_as_linted():
+    linter = _clean_linter()
+    assert linter.lint_all() == []
+    stats = linter.rule_stats
+    assert linter.get_top_issues() == []
+    # Served from the finished lint, not a second run of the rules
+    assert linter.rule_stats is stats
+    assert "No issues found" in linter.generate_lint_report()
+    assert linter.rule_stats is stats
+
+
+def _lint(data):
+    linter = GHLinter.from_analyzer(GHAnalyzer.from_data(copy.deepcopy(data)))
+    linter.lint_all()
+    return linter
+
+
+def _node(data, guid):
+    return next(node for node in data["components"] + data["params"] if node["guid"] == guid)
+
+
+def _move(data):
+    node = _node(data, "c1-3-2")
+    node["pos"] = [node["pos"][0] + 537.0, node["pos"][1] - 211.0]
+
+
+def _retype(data):
+    node = _node(data, "c1-5-1")
+    node.update(name="Expression", type="Expression", hidden=True)
+
+
+def _rewire(data):
+    moved = data["wires"].pop(7)
+    moved["to"]["guid"] = "c1-9-4"
+    data["wires"].append(moved)
+
+
+def _add_node(data):
+    node = copy.deepcopy(_node(data, "c1-2-0"))
+    node.update(guid="added", pos=[node["pos"][0] + 40, node["pos"][1] + 40])
+    data["components"].insert(len(data["components"]) // 2, node)
+    data["wires"].append(wire("c1-4-0", "added", in_name=node["inputs"][0]["name"]))
+
+
+def _remove_node(data):
+    data["components"] = [node for node in data["components"] if node["guid"] != "c1-6-0"]
+    data["wires"] = [w for w in data["wires"] if "c1-6-0" not in (w["from"]["guid"], w["to"]["guid"])]
+
+
+@pytest.mark.parametrize("edit", [_move, _retype, _rewire, _add_node, _remove_node])
+def test_incremental_lint_matches_full_lint(edit):
+    data = sectioned_definition(1)
+    previous = _lint(data)
+    edited = copy.deepcopy(data)
+    edit(edited)
+    full = _lint(edited)
+    incremental = GHLinter.from_analyzer(GHAnalyzer.from_data(copy.deepcopy(edited)))
+    incremental.lint_incremental(previous)
+    assert incremental.issues == full.issues
+
+
+def _cached_lint(data, cache, budget_ms=None):
+    analyzer = GHAnalyzer.from_data(copy.deepcopy(data))
+    analyzer.subgraph_cache = cache
+    linter = GHLinter.from_analyzer(analyzer)
+    linter.rule_budget_ms = budget_ms
+    linter.lint_all()
+    return linter
+
+
+def test_subgraph_cache_matches_uncached_lint(tmp_path):
+    cache = SubgraphCache(str(tmp_path / "subgraphs"))
+    first, second = sectioned_definition(1), sectioned_definition(2)
+    assert _cached_lint(first, cache).issues == _lint(first).issues
+    assert _cached_lint(second, cache).issues == _lint(second).issues
+    assert cache.hits
+
+
+def test_truncated_lint_does_not_poison_subgraph_cache(tmp_path):
+    cache = SubgraphCache(str(tmp_path / "subgraphs"))
+    data = sectioned_definition(1)
+    truncated = _cached_lint(data, cache, budget_ms=0)
+    assert any(stat["partial"] for stat in truncated.rule_stats)
+    assert _cached_lint(data, cache).issues == _lint(data).issues
+
+
+def test_internalized_data_rule_uses_the_configured_threshold():
+    analyzer = GHAnalyzer.from_data(definition(params=[
+        param("big", "Curve", internalized={"encoded_bytes": 4000, "decoded_bytes": 3000, "items": {}})]))
+    linter = GHLinter.from_analyzer(analyzer)
+    linter.select_rules(["GH019"])
+    assert linter.lint_all() == []
+
+    linter = GHLinter.from_analyzer(analyzer)
+    linter.select_rules(["GH019"])
+    linter.internalized_data_threshold = 2000
+    (issue,) = linter.lint_all()
+    assert issue["threshold_bytes"] == 2000 and issue["decoded_bytes"] == 3000
+    assert "MB" not in issue["rule"]["description"]
+    assert "threshold 2,000 bytes" in linter.generate_lint_report()
+
+
+class CountingRule(LintRule):
+    """Test rule: walks every node in ``issues()``, the way whole-graph rules do"""
+    rule = {"id": "X010", "severity": "info", "title": "Counting", "description": "Counts node visits",
+            "why_it_matters": "Testing", "how_to_fix": "Nothing"}
+    visits = 0
+
+    def issues(self):
+        for node in self.analyzer.model.nodes:
+            CountingRule.visits += 1
+        return [self.issue([{"message": "counted"}], count=1)]
+
+
+def _counting_linter():
+    linter = GHLinter.from_analyzer(GHAnalyzer.from_data(sectioned_definition(1)))
+    linter.add_rule(CountingRule)
+    CountingRule.visits = 0
+    return linter
+
+
+@pytest.mark.parametrize("n", [1, 3, 6])
+def test_top_issues_stop_early_and_match_the_full_lint(n):
+    top = _counting_linter().get_top_issues(n)
+    top_visits = CountingRule.visits
+    full_linter = _counting_linter()
+    full = full_linter.lint_all()
+    assert len(full) > 6 and full[-1]["rule"]["id"] == "X010"
+    assert top == full[:n]
+    # The info-level counting rule comes last, so the top issues never reach it
+    assert top_visits == 0 < CountingRule.visits == full_linter.analyzer.model.n_nodes
+    # Once linted, the top issues are the head of the stored result
+    assert full_linter.get_top_issues(n) == full[:n]
+
+
+def test_top_issues_without_items():
+    linter = _counting_linter()
+    top = linter.get_top_issues(3, items=False)
+    assert all("items" not in issue for issue in top)
+    assert [issue["count"] for issue in top] == [issue["count"] for issue in _counting_linter().lint_all()[:3]]
+    assert len(linter.rule_stats) < len(linter.rules)
@@ -0,0 +1,167 @@
+"""
+GHX parser: tree, streaming and process-pool modes
+"""
+import base64
+import os
+import re
+import subprocess
+import sys
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from analyzer.ghx_parser import GHXParser, scan_object_ranges, _base64_size
+
+from conftest import MCP_DIR, add_xml_cluster
+
+
+def _summary(parser):
+    data = parser.to_json_format()
+    return data["components"], data["params"], data["wires"]
+
+
+def test_scan_object_ranges_matches_name_attribute(tmp_path, many_objects_ghx):
+    with open(many_objects_ghx, "rb") as f:
+        text = f.read()
+    # Same objects with the name attribute moved and single-quoted
+    reordered = tmp_path / "reordered.ghx"
+    text = re.sub(rb'<chunk name="Object" index="(\d+)">', rb"<chunk index=\"\1\" name='Object'>", text)
+    reordered.write_bytes(text.replace(b'<chunk name="DefinitionObjects"',
+                                       b"<chunk  name = 'DefinitionObjects'"))
+    assert len(scan_object_ranges(many_objects_ghx)) == 200
+    assert len(scan_object_ranges(str(reordered))) == 200
+
+
+def test_workers_match_serial(many_objects_ghx):
+    serial = GHXParser(many_objects_ghx)
+    parallel = GHXParser(many_objects_ghx, workers=2)
+    assert len(serial.data["components"]) + len(serial.data["params"]) == 200
+    assert _summary(parallel) == _summary(serial)
+
+
+@pytest.mark.parametrize("mode", [{}, {"streaming": True}, {"workers": 2}])
+def test_cluster_body_not_counted_as_top_level(tmp_path, sample_ghx, mode):
+    plain = GHXParser(sample_ghx)
+    clustered = GHXParser(add_xml_cluster(str(tmp_path / "cluster.ghx")), clusters=True, **mode)
+    assert len(clustered.data["components"]) == len(plain.data["components"])
+    assert len(clustered.data["params"]) == len(plain.data["params"])
+    assert len(clustered.data["wires"]) == len(plain.data["wires"])
+    (entry,) = clustered.data["clusters"].values()
+    assert entry["status"] == "parsed"
+    assert len(entry["components"]) == len(plain.data["components"])
+    assert len(entry["params"]) == len(plain.data["params"])
+
+
+def test_base64_size_ignores_wrapping():
+    encoded = base64.encodebytes(os.urandom(1000)).decode()
+    assert "\n" in encoded.strip()
+    assert _base64_size(encoded) == len(base64.b64decode(encoded))
+
+
+def test_internalized_counts_persistent_data_only(tmp_path, sample_ghx):
+    # The sample's only blob is an IconOverride bitmap
+    assert GHXParser(sample_ghx).get_internalized_data()["objects"] == 0
+
+    tree = ET.parse(sample_ghx)
+    param = tree.getroot().find('.//chunk[@name="DefinitionObjects"]').findall('chunks/chunk')[-1]
+    container_chunks = param.find('chunks/chunk[@name="Container"]/chunks')
+    if container_chunks is None:
+        container_chunks = ET.SubElement(param.find('chunks/chunk[@name="Container"]'), "chunks")
+    data = ET.SubElement(container_chunks, "chunk", name="PersistentData")
+    item = ET.SubElement(ET.SubElement(data, "items"), "item", name="ON_Data")
+    payload = os.urandom(3000)
+    ET.SubElement(item, "stream").text = base64.encodebytes(payload).decode()
+    path = str(tmp_path / "internalized.ghx")
+    tree.write(path, encoding="utf-8", xml_declaration=True)
+
+    for parser in (GHXParser(path), GHXParser(path, decode_data=True)):
+        internalized = parser.get_internalized_data()
+        assert internalized["objects"] == 1
+        assert internalized["decoded_bytes"] == len(payload)
+
+
+@pytest.mark.parametrize("fixture", ["sample_ghx", "many_objects_ghx"])
+def test_streaming_matches_tree(request, fixture):
+    path = request.getfixturevalue(fixture)
+    assert GHXParser(path, streaming=True).to_json_format() == GHXParser(path).to_json_format()
+
+
+def test_header_only_matches_full_header(sample_ghx):
+    full = GHXParser(sample_ghx)
+    header = GHXParser(sample_ghx, header_only=True)
+    assert header.data["document"] == full.data["document"]
+    assert header.data["libraries"] == full.data["libraries"]
+    assert header.data["components"] == []
+
+
+def test_runs_as_a_script(sample_gh):
+    script = os.path.join(MCP_DIR, "analyzer", "ghx_parser.py")
+    result = subprocess.run([sys.executable, script, sample_gh, "--stream"], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert "GHX FILE ANALYSIS" in result.stdout
+
+
+def _items(parent, **values):
+    items = ET.SubElement(parent, "items")
+    for name, value in values.items():
+        if isinstance(value, list):
+            for index, entry in enumerate(value):
+                ET.SubElement(items, "item", name=name, index=str(index)).text = entry
+        else:
+            ET.SubElement(items, "item", name=name).text = value
+    return items
+
+
+def _chunk(parent, name, index=None):
+    group = parent.find("chunks")
+    if group is None:
+        group = ET.SubElement(parent, "chunks")
+    chunk = ET.SubElement(group, "chunk", name=name)
+    if index is not None:
+        chunk.set("index", str(index))
+    return chunk
+
+
+def _wired_ghx(path):
+    """Slider s → add.A; mul.P → add.A (mul comes later); a missing guid → add.B;
+    add.R → mul.X; mul.P → panel"""
+    root = ET.Element("Archive", name="Root")
+    objects = _chunk(_chunk(root, "Definition"), "DefinitionObjects")
+
+    def add_object(index, name, guid, **container_items):
+        obj = _chunk(objects, "Object", index)
+        _items(obj, GUID=f"type-{name}", Name=name)
+        container = _chunk(obj, "Container")
+        _items(container, InstanceGuid=guid, Description=name, **container_items)
+        return container
+
+    def add_component(index, name, guid, inputs, outputs):
+        data = _chunk(add_object(index, name, guid), "ParameterData")
+        _items(data, InputCount=str(len(inputs)), OutputCount=str(len(outputs)))
+        for i, (nick, sources) in enumerate(inputs):
+            _items(_chunk(data, "InputParam", i), NickName=nick, SourceCount=str(len(sources)), Source=sources)
+        for i, (nick, out_guid) in enumerate(outputs):
+            _items(_chunk(data, "OutputParam", i), NickName=nick, InstanceGuid=out_guid)
+
+    add_object(0, "Number Slider", "s", NickName="len")
+    add_component(1, "Addition", "add", [("A", ["s", "mul-P"]), ("B", ["missing"])], [("R", "add-R")])
+    add_component(2, "Multiplication", "mul", [("X", ["add-R"])], [("P", "mul-P")])
+    add_object(3, "Panel", "panel", NickName="out", SourceCount="1", Source=["mul-P"])
+    ET.ElementTree(root).write(path, encoding="utf-8", xml_declaration=True)
+    return path
+
+
+@pytest.mark.parametrize("mode", [{}, {"streaming": True}, {"workers": 2}])
+def test_wires_resolve_forward_references_and_drop_unknown_sources(tmp_path, mode):
+    parser = GHXParser(_wired_ghx(str(tmp_path / "wired.ghx")), **mode)
+    wires = [(w["from"]["guid"], w["from"]["out_index"], w["from"]["out_name"],
+              w["to"]["guid"], w["to"]["in_index"], w["to"]["in_name"]) for w in parser.data["wires"]]
+    assert sorted(wires) == sorted([
+        ("s", 0, "len", "add", 0, "A"),
+        ("mul", 0, "P", "add", 0, "A"),   # source defined after its target
+        ("add", 0, "R", "mul", 0, "X"),
+        ("mul", 0, "P", "panel", 0, "out"),
+    ])
+    assert [c["guid"] for c in parser.data["components"]] == ["add", "mul"]
+    assert [p["guid"] for p in parser.data["params"]] == ["s", "panel"]
+    assert not parser._pending_sources
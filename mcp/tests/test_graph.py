@@ -0,0 +1,364 @@
+"""
+DefinitionGraph: CSR adjacency, topological order, critical path, cones
+"""
+import ast
+import collections
+import copy
+import os
+import random
+import types
+
+import pytest
+
+from analyzer import graph as graph_module
+from analyzer.gh_analyzer import GHAnalyzer
+from analyzer.model_diff import diff_models
+
+from conftest import MCP_DIR, component, definition, param, wire
+
+
+@pytest.fixture
+def diamond():
+    """Slider s feeds a and b, which both feed c; an unresolved source also feeds c"""
+    return GHAnalyzer.from_data(definition(
+        components=[component("a", time_ms=5.0), component("b", time_ms=1.0), component("c", time_ms=2.0)],
+        params=[param("s")],
+        wires=[wire("s", "a", out_name="N"), wire("s", "b", out_name="N"),
+               wire("a", "c"), wire("b", "c", in_index=1, in_name="B"),
+               wire("ghost", "c", out_name="X", in_index=1, in_name="B")]))
+
+
+def _ids(analyzer, *guids):
+    return [analyzer.model.node_ids[guid] for guid in guids]
+
+
+def test_csr_adjacency(diamond):
+    graph, model = diamond.graph, diamond.model
+    a, b, c, s = _ids(diamond, "a", "b", "c", "s")
+    ghost = model.n_nodes
+    assert graph.n == model.n_nodes + 1
+    assert sorted(graph.successors(s)) == sorted([a, b])
+    assert sorted(graph.predecessors(c)) == sorted([a, b, ghost])
+    assert list(graph.successors(ghost)) == [c]
+    assert graph.in_degree(c) == 3 and graph.out_degree(c) == 0
+    for w in graph.in_edges(c):
+        assert model.wire_dst[w] == c
+    for w in graph.out_edges(s):
+        assert model.wire_src[w] == s
+    assert {name: len(wires) for name, wires in graph.input_edges(c).items()} == {"A": 1, "B": 2}
+    assert graph.connected_outputs(s) == {"N"}
+    assert graph.sources() == [s]
+    assert graph.sinks() == [c]
+
+
+def test_dangling_ports_read_the_graph(diamond):
+    dangling = diamond.find_dangling_ports()
+    assert sorted(item["input"] for item in dangling["inputs"]) == ["B", "B"]
+    assert [item["component"] for item in dangling["outputs"]] == ["Addition"]
+
+
+def _chain_with_cycle():
+    """x -> y -> z -> y forms a cycle behind x; p -> q -> r is a plain chain"""
+    return GHAnalyzer.from_data(definition(
+        components=[component(guid, name) for guid, name in
+                    (("x", "Series"), ("y", "Addition"), ("z", "Multiplication"),
+                     ("p", "Series"), ("q", "Addition"), ("r", "Multiplication"))],
+        wires=[wire("x", "y"), wire("y", "z"), wire("z", "y", in_index=1, in_name="B"),
+               wire("p", "q"), wire("q", "r")]))
+
+
+def test_topological_order_respects_wires(diamond):
+    graph, model = diamond.graph, diamond.model
+    order, leftover = graph.topological_order()
+    assert sorted(order) == list(range(graph.n)) and not any(leftover)
+    position = {v: i for i, v in enumerate(order)}
+    for w in range(len(model.wire_src)):
+        assert position[model.wire_src[w]] < position[model.wire_dst[w]]
+
+
+def test_cycles_are_left_over_and_reported():
+    analyzer = _chain_with_cycle()
+    graph = analyzer.graph
+    x, y, z, p, q, r = _ids(analyzer, "x", "y", "z", "p", "q", "r")
+    order, leftover = graph.topological_order()
+    assert list(order) == [x, p, q, r]
+    assert [v for v in range(graph.n) if leftover[v]] == [y, z]
+    assert [sorted(cycle) for cycle in graph.find_cycles(leftover)] == [sorted([y, z])]
+
+    deep = analyzer.find_deep_chains(min_depth=3)
+    assert deep["max_depth"] == 3
+    assert [chain["path"] for chain in deep["chains"]] == [["Series", "Addition", "Multiplication"]]
+    assert [sorted(item["guid"] for item in cycle) for cycle in deep["cycles"]] == [["y", "z"]]
+
+
+@pytest.mark.parametrize("source,target,closes_cycle", [
+    ("n1", "n4", False),
+    ("n4", "n1", True),
+    # Runs back in the previous order without closing a cycle
+    ("m2", "n0", False),
+    ("added", "m1", False),
+    ("added", "n2", True),
+    ("n3", "added", False),
+])
+def test_followed_graph_finds_new_cycles(source, target, closes_cycle):
+    components = [component(f"n{i}") for i in range(6)] + [component(f"m{i}") for i in range(3)]
+    wires = [wire(f"n{i}", f"n{i + 1}") for i in range(5)] + [wire(f"m{i}", f"m{i + 1}") for i in range(2)]
+    previous = GHAnalyzer.from_data(definition(components, wires=wires))
+    previous.graph.leftover()
+    edited = components + [component("added")]
+    wires = wires + [wire(source, target, in_index=1, in_name="B"), wire("n5", "added")]
+    analyzer = GHAnalyzer.from_data(definition(edited, wires=wires))
+    analyzer.follow(previous, diff_models(previous.model, analyzer.model))
+    graph = analyzer.graph
+    # Known cycle-free without ordering, unless the new wire closes a cycle
+    assert (graph._leftover is None) == closes_cycle
+    if not closes_cycle:
+        model = analyzer.model
+        assert all(graph._rank[model.wire_src[w]] < graph._rank[model.wire_dst[w]] for w in range(model.n_wires))
+    assert graph.leftover() == graph_module.DefinitionGraph(analyzer.model).topological_order()[1]
+
+
+def test_deep_chain_depth_counts_components_only(diamond):
+    deep = diamond.find_deep_chains(min_depth=1)
+    # s (a param) -> a -> c: two components
+    assert deep["max_depth"] == 2
+    assert [chain["guid"] for chain in deep["chains"]] == ["c"]
+
+
+
+def _chains():
+    """Chains k0 .. k9 of 3 to 12 components, each ending in a sink"""
+    components, wires = [], []
+    for k in range(10):
+        components += [component(f"k{k}-{i}", pos=[i * 40.0, k * 40.0]) for i in range(k + 3)]
+        wires += [wire(f"k{k}-{i}", f"k{k}-{i + 1}") for i in range(k + 2)]
+    return definition(components, wires=wires)
+
+
+def _move_sink(data):
+    data["components"][-1]["pos"] = [0.0, 900.0]
+
+
+def _extend_chain(data):
+    data["components"].insert(20, component("added"))
+    data["wires"].append(wire("k4-6", "added"))
+
+
+def _cut_chain(data):
+    data["wires"] = [w for w in data["wires"] if w["to"]["guid"] != "k8-5"]
+
+
+def _remove_sink(data):
+    data["components"] = [c for c in data["components"] if c["guid"] != "k9-11"]
+
+
+def _deepen_chain(data):
+    data["wires"].append(wire("k9-11", "k2-0"))
+
+
+@pytest.mark.parametrize("edit", [_move_sink, _extend_chain, _cut_chain, _remove_sink, _deepen_chain])
+def test_followed_deep_chains_match_a_full_pass(edit):
+    data = _chains()
+    previous = GHAnalyzer.from_data(data)
+    previous.find_deep_chains(min_depth=6, max_paths=3)
+    edit(data)
+    analyzer = GHAnalyzer.from_data(data)
+    analyzer.follow(previous, diff_models(previous.model, analyzer.model))
+    deep = analyzer.find_deep_chains(min_depth=6, max_paths=3)
+    assert analyzer._depth_changes is not None
+    assert deep == GHAnalyzer.from_data(data).find_deep_chains(min_depth=6, max_paths=3)
+
+
+def _copies_data(prefixes, shared_input=False):
+    components, params, wires = [], [], []
+    for prefix in prefixes:
+        source = "s" if shared_input else f"s{prefix}"
+        if not shared_input:
+            params.append(param(source))
+        components += [component(f"{prefix}1", "Series", inputs=("A",), outputs=("S",)),
+                       component(f"{prefix}2", "Addition"), component(f"{prefix}3", "Multiplication")]
+        wires += [wire(source, f"{prefix}1", out_name="N"), wire(f"{prefix}1", f"{prefix}2", out_name="S"),
+                  wire(f"{prefix}2", f"{prefix}3")]
+    if shared_input:
+        params.append(param("s"))
+    return definition(components, params, wires)
+
+
+def _copies(prefixes, shared_input=False):
+    return GHAnalyzer.from_data(_copies_data(prefixes, shared_input))
+
+
+def test_identical_copies_are_one_duplicate_group():
+    (group,) = _copies("ab").find_duplicate_chains()
+    assert group["instances"] == 2
+    assert group["chain_components"] == 3
+    assert sorted(map(sorted, group["guids"])) == [["a1", "a2", "a3", "sa"], ["b1", "b2", "b3", "sb"]]
+
+
+def test_shared_input_stays_outside_the_copies():
+    (group,) = _copies("abc", shared_input=True).find_duplicate_chains()
+    assert group["instances"] == 3
+    assert all("s" not in chain for chain in group["guids"])
+
+
+def test_different_wiring_is_not_a_duplicate():
+    # Rewire b's Addition through its second input: same types, different chain
+    rewired = GHAnalyzer.from_data(definition(
+        [component(guid, name, inputs=ins, outputs=outs) for guid, name, ins, outs in
+         (("a1", "Series", ("A",), ("S",)), ("a2", "Addition", ("A", "B"), ("R",)), ("a3", "Multiplication", ("A", "B"), ("R",)),
+          ("b1", "Series", ("A",), ("S",)), ("b2", "Addition", ("A", "B"), ("R",)), ("b3", "Multiplication", ("A", "B"), ("R",)))],
+        [param("sa"), param("sb")],
+        [wire("sa", "a1", out_name="N"), wire("a1", "a2", out_name="S"), wire("a2", "a3"),
+         wire("sb", "b1", out_name="N"), wire("b1", "b2", in_index=1, out_name="S", in_name="B"), wire("b2", "b3")]))
+    assert all(group["chain_components"] < 3 for group in rewired.find_duplicate_chains(min_components=2))
+
+
+def _followed(previous, analyzer):
+    analyzer.follow(previous, diff_models(previous.model, analyzer.model))
+    return analyzer
+
+
+def test_moved_copies_keep_their_duplicate_chains():
+    data = _copies_data("abc")
+    previous = GHAnalyzer.from_data(copy.deepcopy(data))
+    found = previous.find_duplicate_chains()
+    data["components"][0]["pos"] = [500.0, 0.0]
+    moved = _followed(previous, GHAnalyzer.from_data(copy.deepcopy(data)))
+    assert moved.find_duplicate_chains() == found
+    assert moved._chain_result is previous._chain_result
+    # The carried state still serves the next revision; c3's wire stays, to a now unresolved endpoint
+    data["components"] = [c for c in data["components"] if c["guid"] != "c3"]
+    removed = _followed(moved, GHAnalyzer.from_data(copy.deepcopy(data)))
+    assert removed.find_duplicate_chains() == GHAnalyzer.from_data(data).find_duplicate_chains()
+    assert len(found[0]["guids"]) == 3 and len(removed.find_duplicate_chains()[0]["guids"]) == 2
+
+
+def test_critical_path_and_slack(diamond):
+    result = diamond.find_critical_path()
+    assert result["critical_ms"] == 7.0
+    assert result["serial_ms"] == 8.0
+    # The untimed slider adds nothing, so the path starts at a
+    assert [item["guid"] for item in result["critical_path"]] == ["a", "c"]
+    slack = {item["guid"]: item["slack_ms"] for item in result["nodes"]}
+    assert slack == {"a": 0.0, "c": 0.0, "b": 4.0}
+    assert sorted(item["guid"] for item in result["nodes"] if item["critical"]) == ["a", "c"]
+
+
+def test_critical_path_timings_override_exported_times(diamond):
+    result = diamond.find_critical_path({"a": 1.0, "b": 10.0, "c": 1.0})
+    assert result["critical_ms"] == 11.0
+    assert [item["guid"] for item in result["critical_path"]] == ["b", "c"]
+    assert result["timed_objects"] == 3
+
+
+def test_critical_path_skips_cycles():
+    result = _chain_with_cycle().find_critical_path({"x": 1.0, "y": 5.0, "z": 5.0, "p": 2.0, "q": 2.0})
+    assert result["critical_ms"] == 4.0
+    assert result["untimed_cycle_nodes"] == 2
+
+
+def _random_graph(seed, n=60, edges=150, cyclic=False):
+    """Components n0..n{n-1}; acyclic graphs only wire lower to higher ids"""
+    rng = random.Random(seed)
+    pairs = set()
+    while len(pairs) < edges:
+        a, b = rng.sample(range(n), 2)
+        pairs.add((a, b) if cyclic or a < b else (b, a))
+    return definition(components=[component(f"n{i}") for i in range(n)],
+                      params=[param("s0"), param("s1")],
+                      wires=[wire(f"n{a}", f"n{b}") for a, b in sorted(pairs)]
+                      + [wire("s0", "n0", out_name="N"), wire("s1", f"n{n // 2}", out_name="N"),
+                         wire("ghost", "n1")])
+
+
+def _bfs(step, v):
+    seen, queue = {v}, collections.deque([v])
+    while queue:
+        for u in step(queue.popleft()):
+            if u not in seen:
+                seen.add(u)
+                queue.append(u)
+    seen.discard(v)
+    return sorted(seen)
+
+
+@pytest.mark.parametrize("memo_bits", [graph_module.CONE_MEMO_BITS, 0, 2000])
+@pytest.mark.parametrize("seed, cyclic", [(1, False), (2, False), (3, True), (4, True)])
+def test_cones_match_breadth_first_search(seed, cyclic, memo_bits, monkeypatch):
+    monkeypatch.setattr(graph_module, "CONE_MEMO_BITS", memo_bits)
+    graph = GHAnalyzer.from_data(_random_graph(seed, cyclic=cyclic)).graph
+    if cyclic:
+        assert any(len(group) > 1 for group in graph.strongly_connected()[1])
+    for v in range(graph.n):
+        assert graph.downstream(v) == _bfs(graph.successors, v)
+        assert graph.upstream(v) == _bfs(graph.predecessors, v)
+    if memo_bits:
+        assert graph._cone_bits <= memo_bits + 2 * graph.n
+
+
+def test_find_cone_and_input_impact(diamond):
+    assert [o["guid"] for o in diamond.find_cone("s")["objects"]] == ["a", "b", "c"]
+    upstream = diamond.find_cone("c", "upstream")
+    # The unresolved source has no record, so only nodes are listed
+    assert sorted(o["guid"] for o in upstream["objects"]) == ["a", "b", "s"]
+    assert (upstream["components"], upstream["params"]) == (2, 1)
+    with pytest.raises(ValueError):
+        diamond.find_cone("nowhere")
+    (impact,) = diamond.find_input_impact()
+    assert (impact["guid"], impact["downstream_components"], impact["downstream_params"]) == ("s", 3, 0)
+
+
+class _Live:
+    """The cone methods of the standalone GHLiveAnalyzer, which needs Grasshopper to import
+
+    Objects are (guid, name, recipient guids) fakes shaped like GH objects.
+    """
+
+    def __init__(self, data):
+        self.components = []
+        self._reach = None
+        outgoing = collections.defaultdict(list)
+        for w in data["wires"]:
+            outgoing[w["from"]["guid"]].append(w["to"]["guid"])
+        for node in data["components"] + data["params"]:
+            obj = types.SimpleNamespace(InstanceGuid=node["guid"], NickName=node["name"])
+            obj.Recipients = [types.SimpleNamespace(Attributes=types.SimpleNamespace(
+                GetTopLevel=types.SimpleNamespace(DocObject=types.SimpleNamespace(InstanceGuid=guid))))
+                for guid in outgoing[node["guid"]]]
+            obj.GetType = lambda kind=("GH_NumberSlider" if "param_kind" in node else "Addition"): \
+                types.SimpleNamespace(FullName=kind, Name=kind)
+            self.components.append(obj)
+
+    def _is_param_component(self, obj):
+        return obj.GetType().FullName == "GH_NumberSlider"
+
+
+def _load_live_methods():
+    path = os.path.join(MCP_DIR, os.pardir, "standalone", "gh_live_analyzer.py")
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    live = next(node for node in tree.body if isinstance(node, ast.ClassDef) and node.name == "GHLiveAnalyzer")
+    wanted = ("_build_wire_graph", "_cone", "_cone_report", "get_downstream_cone", "get_upstream_cone",
+              "get_slider_impact")
+    namespace = {}
+    for method in live.body:
+        if isinstance(method, ast.FunctionDef) and method.name in wanted:
+            exec(compile(ast.Module([method], []), path, "exec"), namespace)
+            setattr(_Live, method.name, namespace[method.name])
+
+
+@pytest.mark.parametrize("seed, cyclic", [(5, False), (6, True)])
+def test_standalone_cones_match_breadth_first_search(seed, cyclic):
+    _load_live_methods()
+    data = _random_graph(seed, cyclic=cyclic)
+    data["wires"] = [w for w in data["wires"] if w["from"]["guid"] != "ghost"]
+    live = _Live(data)
+    graph = GHAnalyzer.from_data(data).graph
+    guids = graph.model.guids
+    for v in range(graph.model.n_nodes):
+        downstream = live.get_downstream_cone(guids[v])
+        assert [o["guid"] for o in downstream["objects"]] == sorted(guids[u] for u in _bfs(graph.successors, v))
+        upstream = live.get_upstream_cone(guids[v])
+        assert [o["guid"] for o in upstream["objects"]] == sorted(guids[u] for u in _bfs(graph.predecessors, v))
+    impact = {i["guid"]: i["downstream_count"] for i in live.get_slider_impact()}
+    assert impact == {guid: len(_bfs(graph.successors, graph.model.node_ids[guid])) for guid in ("s0", "s1")}
@@ -0,0 +1,79 @@
+"""
+DefinitionModel: export dict round trip and node ids
+"""
+import json
+
+from analyzer.gh_analyzer import GHAnalyzer
+from analyzer.ghx_parser import GHXParser
+from analyzer.model import DefinitionModel
+
+from conftest import component, definition, param, wire
+
+
+def _unresolved_definition():
+    """Two components and a param; wires reach a missing source ("ghost") and a missing target ("void")"""
+    return definition(
+        components=[component("a", preview_capable=True, time_ms=1.5),
+                    {"guid": "b", "name": "Custom", "pos": [3.5, -2],
+                     "inputs": [{"index": 0, "name": "X", "tree_access": "list", "optional": True, "hint": "Curve"}],
+                     "outputs": []}],
+        params=[param("s", internalized={"decoded_bytes": 10}),
+                {"guid": "p", "name": "Panel", "pos": [1, 1], "inputs": [{"index": 0, "name": "In"}]}],
+        wires=[wire("s", "a", out_name="N"),
+               wire("ghost", "a", in_index=1, in_name="B"),
+               wire("a", "void"),
+               wire("ghost", "b", in_name="X"),
+               {"from": {"guid": "a", "out_name": "R"}, "to": {"guid": "p", "in_name": "In"}}])
+
+
+def test_round_trip_is_exact():
+    data = _unresolved_definition()
+    data["document"] = {"title": "t"}
+    data["stats"] = {"total_components": 2}
+    model = DefinitionModel.from_dict(json.loads(json.dumps(data)))
+    assert model.to_dict() == data
+    assert DefinitionModel.from_dict(model.to_dict()).to_dict() == data
+
+
+def test_unresolved_endpoints_get_ids_past_the_nodes():
+    model = DefinitionModel.from_dict(_unresolved_definition())
+    assert model.n_components == 2 and model.n_nodes == 4
+    assert [model.node_ids[g] for g in ("a", "b", "s", "p")] == [0, 1, 2, 3]
+    # Each missing guid gets one id, in order of first appearance, shared by all its wires
+    assert model.node_ids["ghost"] == 4 and model.node_ids["void"] == 5
+    assert model.n_ids == 6
+    assert list(model.wire_src) == [2, 4, 0, 4, 0]
+    assert list(model.wire_dst) == [0, 0, 5, 1, 3]
+    assert [model.guids[i] for i in model.wire_src] == ["s", "ghost", "a", "ghost", "a"]
+    assert model.node("ghost") is None and model.node("a").guid == "a"
+    # Missing port indices are kept as absent, not invented
+    assert model.wire_src_port[4] == -1 and model.wire_dst_port[4] == -1
+    assert model.wire_dict(4) == {"from": {"guid": "a", "out_name": "R"}, "to": {"guid": "p", "in_name": "In"}}
+
+
+def test_records_answer_like_the_dicts():
+    model = DefinitionModel.from_dict(_unresolved_definition())
+    a, b, s, p = model.nodes
+    assert a.is_component and not s.is_component
+    assert a.get("preview_capable") is True and a.get("time_ms") == 1.5
+    assert b.get("category", "Unknown") == "Unknown" and b.get("outputs") == ()
+    assert b.inputs[0].get("hint") == "Curve" and b.inputs[0].get("tree_access") == "list"
+    assert s.get("inputs") is None and s.get("param_kind") == "Number Slider"
+    assert p.get("inputs")[0].name == "In" and p.pos == [1.0, 1.0]
+
+
+def test_ghx_export_round_trips(sample_ghx):
+    data = json.loads(json.dumps(GHXParser(sample_ghx).to_json_format()))
+    assert DefinitionModel.from_dict(data).to_dict() == data
+
+
+def test_analyzer_data_keeps_the_export_lists():
+    data = _unresolved_definition()
+    analyzer = GHAnalyzer.from_data(data)
+    assert set(analyzer.data) == set(data)
+    assert analyzer.data["document"] == {}
+    assert analyzer.data["components"] == data["components"]
+    assert dict(analyzer.data) == data
+    # Built once and kept
+    assert analyzer.components is analyzer.data["components"]
+    assert analyzer.wires is analyzer.wires and analyzer.params is analyzer.params
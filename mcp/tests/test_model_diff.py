@@ -0,0 +1,148 @@
+"""
+diff_models: node sets, wire pairing and carrying per-id values over
+"""
+import random
+from array import array
+from collections import Counter
+
+import pytest
+
+from analyzer.model import DefinitionModel
+from analyzer.model_diff import ALIGN_STEPS, diff_models, wire_keys
+
+from conftest import component, definition, param, wire
+
+
+def _chain_definition(count=40, seed=0):
+    rng = random.Random(seed)
+    components = [component(f"c{i}", pos=[i * 40.0, rng.uniform(0, 400)]) for i in range(count)]
+    params = [param(f"p{i}") for i in range(count // 4)]
+    wires = [wire(f"c{i}", f"c{i + 1}") for i in range(count - 1)]
+    wires += [wire(f"p{i}", f"c{rng.randrange(count)}", in_index=1, out_name="N", in_name="B")
+              for i in range(count // 4)]
+    wires.append(wire("c3", "elsewhere"))
+    return definition(components, params, wires=wires)
+
+
+def _drop_wire(data):
+    del data["wires"][5]
+
+
+def _insert_wire(data):
+    data["wires"].insert(9, wire("c2", "c30", in_index=1, in_name="B"))
+
+
+def _replace_wire(data):
+    data["wires"][12] = wire("c12", "c20", in_index=1, in_name="B")
+
+
+def _move_wire(data):
+    data["wires"].append(data["wires"].pop(4))
+
+
+def _scattered(data):
+    del data["wires"][30]
+    del data["wires"][20]
+    data["wires"].insert(10, wire("c0", "c39"))
+    data["wires"][3] = wire("c3", "c9", in_index=1, in_name="B")
+
+
+def _many_edits(data):
+    rng = random.Random(4)
+    for _ in range(ALIGN_STEPS + 4):
+        del data["wires"][rng.randrange(len(data["wires"]))]
+
+
+def _pairs(diff, old, new):
+    return [(i, j) for i, j in enumerate(diff.wire_map) if j >= 0], wire_keys(old), wire_keys(new)
+
+
+@pytest.mark.parametrize("edit", [_drop_wire, _insert_wire, _replace_wire, _scattered, _many_edits])
+def test_wires_pair_up_with_equal_keys(edit):
+    data = _chain_definition()
+    old = DefinitionModel.from_dict(data)
+    edit(data)
+    new = DefinitionModel.from_dict(data)
+    diff = diff_models(old, new)
+    pairs, old_keys, new_keys = _pairs(diff, old, new)
+    assert all(old_keys[i] == new_keys[j] for i, j in pairs)
+    assert all(diff.wire_origin[j] == i for i, j in pairs)
+    # Whatever is left unpaired is exactly the multiset difference
+    assert Counter(diff.wires_removed) == Counter(old_keys) - Counter(new_keys)
+    assert Counter(diff.wires_added) == Counter(new_keys) - Counter(old_keys)
+    assert not diff.reordered
+    assert not (diff.added or diff.removed or diff.changed or diff.moved)
+
+
+def test_moved_wire_is_removed_and_added():
+    data = _chain_definition()
+    old = DefinitionModel.from_dict(data)
+    _move_wire(data)
+    diff = diff_models(old, DefinitionModel.from_dict(data))
+    assert diff.wires_removed == diff.wires_added == [wire_keys(old)[4]]
+
+
+def _insert_nodes(data):
+    data["components"].insert(7, component("new1"))
+    data["params"].insert(0, param("new2"))
+
+
+def _remove_nodes(data):
+    del data["components"][12]
+    del data["components"][3]
+    del data["params"][-1]
+
+
+def _resolve_endpoint(data):
+    data["params"].append(param("elsewhere"))
+
+
+@pytest.mark.parametrize("edit", [_insert_nodes, _remove_nodes, _resolve_endpoint])
+def test_carry_matches_a_remap_by_guid(edit):
+    data = _chain_definition()
+    old = DefinitionModel.from_dict(data)
+    edit(data)
+    new = DefinitionModel.from_dict(data)
+    diff = diff_models(old, new)
+    values = array("i", range(100, 100 + len(old.guids)))
+    expected = [values[old.node_ids[g]] if g in old.node_ids else -7 for g in new.guids]
+    assert list(diff.carry(values, -7)) == expected
+    parents = array("i", [-1] + list(range(len(old.guids) - 1)))
+    expected = [new.node_ids.get(old.guids[parents[old.node_ids[g]]], -1)
+                if g in old.node_ids and parents[old.node_ids[g]] >= 0 else -1 for g in new.guids]
+    assert list(diff.carry(parents, -1, ids=True)) == expected
+
+
+def _edit_nodes(data):
+    data["components"][5]["name"] = "Multiplication"
+    data["components"][17]["inputs"][1]["name"] = "C"
+    data["components"][30]["outputs"].append({"index": 1, "name": "S"})
+    data["params"][1]["inputs"] = []
+    data["components"][8]["pos"] = [1000.0, 1000.0]
+    data["params"][2]["pos"] = [5.0, 5.0]
+    del data["components"][20]
+    data["components"].insert(25, component("new1"))
+
+
+def _swap_kind(data):
+    data["params"].insert(0, data["components"].pop())
+    data["components"].append(data["params"].pop())
+
+
+@pytest.mark.parametrize("edit", [_edit_nodes, _swap_kind, _insert_nodes, _remove_nodes])
+def test_changed_and_moved_match_a_node_by_node_comparison(edit):
+    data = _chain_definition()
+    old = DefinitionModel.from_dict(data)
+    edit(data)
+    new = DefinitionModel.from_dict(data)
+    diff = diff_models(old, new)
+
+    def record(model, guid):
+        node = model.node(guid)
+        data = {k: v for k, v in node.to_dict().items() if k != "pos"}
+        return data, node.is_component, model.xs[node.id], model.ys[node.id]
+
+    kept = [g for g in new.guids[:new.n_nodes] if old.node(g) is not None]
+    before, after = ({g: record(model, g) for g in kept} for model in (old, new))
+    assert diff.changed == {g for g in kept if before[g][:2] != after[g][:2]}
+    assert diff.moved == {g for g in kept if before[g][2:] != after[g][2:]}
@@ -0,0 +1,112 @@
+"""
+ParseCache / DiskCache: hits, invalidation, LRU eviction, damaged entries
+"""
+import os
+import pickle
+
+import pytest
+
+from analyzer import parse_cache
+from analyzer.parse_cache import DiskCache, ParseCache
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "def.ghx"
+    path.write_text("<Archive>one</Archive>")
+    return str(path)
+
+
+def _entry_path(cache, path, format_type="ghx"):
+    return cache._entry_path(cache._identity(path, format_type))
+
+
+def test_hit_after_put_and_miss_before(tmp_path, source):
+    cache = ParseCache(str(tmp_path / "cache"))
+    assert cache.get(source, "ghx") is None
+    cache.put(source, "ghx", {"components": [1, 2]})
+    assert cache.get(source, "ghx") == {"components": [1, 2]}
+    # The format is part of the key
+    assert cache.get(source, "gh") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+    stats = cache.get_stats()
+    assert stats["entries"] == 1 and stats["hit_rate"] == pytest.approx(1 / 3)
+
+
+def test_changed_file_misses(tmp_path, source):
+    cache = ParseCache(str(tmp_path / "cache"))
+    cache.put(source, "ghx", {"rev": 1})
+    with open(source, "w") as f:
+        f.write("<Archive>two, longer</Archive>")
+    assert cache.get(source, "ghx") is None
+
+
+def test_verify_hash_catches_rewrites_that_keep_size_and_mtime(tmp_path, source):
+    cache = ParseCache(str(tmp_path / "cache"), verify_hash=True)
+    cache.put(source, "ghx", {"rev": 1})
+    stat = os.stat(source)
+    with open(source, "w") as f:
+        f.write("<Archive>two</Archive>")
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.path.getsize(source) == stat.st_size
+    assert cache.get(source, "ghx") is None
+    assert cache.invalidations == 1
+    assert not os.path.exists(_entry_path(cache, source))
+
+
+def test_parser_version_change_misses(tmp_path, source, monkeypatch):
+    ParseCache(str(tmp_path / "cache")).put(source, "ghx", {"rev": 1})
+    assert ParseCache(str(tmp_path / "cache")).get(source, "ghx") == {"rev": 1}
+    version = parse_cache.parser_version()
+    monkeypatch.setattr(parse_cache, "_ENTRY_FORMAT", parse_cache._ENTRY_FORMAT + 1)
+    cache = ParseCache(str(tmp_path / "cache"))
+    assert cache.version != version
+    assert cache.get(source, "ghx") is None
+
+
+def test_stale_entry_under_the_same_key_is_invalidated(tmp_path, source):
+    cache = ParseCache(str(tmp_path / "cache"))
+    entry_path = _entry_path(cache, source)
+    with open(entry_path, "wb") as f:
+        pickle.dump({"identity": ("elsewhere",), "hash": None, "data": {}}, f)
+    assert cache.get(source, "ghx") is None
+    assert cache.invalidations == 1 and not os.path.exists(entry_path)
+
+
+def test_least_recently_used_entries_are_evicted_by_size(tmp_path):
+    cache = DiskCache(str(tmp_path / "cache"), max_bytes=1)
+    payload = {"data": b"x" * 1000}
+    paths = [cache._entry_path(("entry", i)) for i in range(3)]
+    cache._write(paths[0], payload, evict=False)
+    size = os.path.getsize(paths[0])
+    cache.max_bytes = 2 * size + size // 2
+    cache._write(paths[1], payload)
+    # Entry 0 is the oldest write but the most recent read
+    os.utime(paths[0], ns=(1_000_000_000, 1_000_000_000))
+    os.utime(paths[1], ns=(2_000_000_000, 2_000_000_000))
+    assert cache._read(paths[0]) == payload
+    cache._write(paths[2], payload)
+    assert [os.path.exists(p) for p in paths] == [True, False, True]
+    assert cache.evictions == 1
+    cache.clear()
+    assert cache._entries() == []
+
+
+@pytest.mark.parametrize("damage", [
+    lambda data: data[:len(data) // 2],   # truncated write
+    lambda data: b"",                     # empty file
+    lambda data: b"not a pickle at all",  # garbage
+    lambda data: pickle.dumps(["not", "an", "entry"]),
+])
+def test_damaged_entries_are_misses(tmp_path, source, damage):
+    cache = ParseCache(str(tmp_path / "cache"))
+    cache.put(source, "ghx", {"components": list(range(100))})
+    entry_path = _entry_path(cache, source)
+    with open(entry_path, "rb") as f:
+        data = f.read()
+    with open(entry_path, "wb") as f:
+        f.write(damage(data))
+    assert cache.get(source, "ghx") is None
+    # A fresh put replaces the damaged entry
+    cache.put(source, "ghx", {"rev": 2})
+    assert cache.get(source, "ghx") == {"rev": 2}
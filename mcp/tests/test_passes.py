@@ -0,0 +1,140 @@
+"""
+Graph passes: mixed tree access (GH005) and tree-operation chains (GH008)
+"""
+import copy
+
+import pytest
+
+from analyzer.gh_analyzer import GHAnalyzer
+from analyzer.model_diff import diff_models
+from analyzer.passes import DanglingPorts, MixedAccess, TreeOperations
+
+from conftest import component, definition, param, sectioned_definition, wire
+
+
+def _ports(*specs):
+    return [{"index": i, "name": name, **({"tree_access": access} if access else {})}
+            for i, (name, access) in enumerate(specs)]
+
+
+def test_mixed_access_flags_wires_with_tree_at_one_end():
+    analyzer = GHAnalyzer.from_data(definition(
+        components=[component("src", "Source", inputs=(), outputs=()) | {"outputs": _ports(("T", "tree"), ("I", None))},
+                    component("dst", "Target") | {"inputs": _ports(("A", None), ("B", "Tree"), ("C", "list"))}],
+        params=[param("tp", "Curve", tree_access="tree")],
+        wires=[wire("src", "dst", 0, 0, "T", "A"),      # tree -> item: mixed
+               wire("src", "dst", 1, 1, "I", "B"),      # item -> tree: mixed
+               wire("src", "dst", 0, 1, "T", "B"),      # tree -> tree
+               wire("src", "dst", 1, 2, "I", "C"),      # item -> list
+               wire("tp", "dst", 0, 2, "", "C"),        # param with tree access -> list: mixed
+               wire("ghost", "dst", 0, 1, "X", "B")]))  # unresolved source: skipped
+    (mixed,) = analyzer.run_passes(MixedAccess())
+    assert [(m["from"], m["input"], m["from_access"], m["to_access"]) for m in mixed] == [
+        ("Source", "A", "tree", "item"),
+        ("Source", "B", "item", "tree"),
+        ("Curve", "C", "tree", "list"),
+    ]
+    assert all(m["to_guid"] == "dst" for m in mixed)
+
+
+def test_tree_operations_follow_the_heaviest_chain():
+    def flagged(guid, mapping):
+        return component(guid, "Addition") | {"inputs": [{"index": 0, "name": "A", "mapping": mapping},
+                                                         {"index": 1, "name": "B"}]}
+    analyzer = GHAnalyzer.from_data(definition(
+        components=[component("f", "Flatten Tree", inputs=("T",), outputs=("T",)),
+                    component("g", "Graft Tree", inputs=("T",), outputs=("T",)),
+                    flagged("m", "Graft"),
+                    component("plain"),
+                    flagged("side", "Flatten")],
+        wires=[wire("f", "g", out_name="T", in_name="T"), wire("g", "plain", out_name="T"),
+               wire("plain", "m"), wire("f", "side", out_name="T")]))
+    (tree,) = analyzer.run_passes(TreeOperations(3))
+    assert tree["operations"] == {"flatten": 2, "graft": 2}
+    (hotspot,) = tree["hotspots"]
+    assert hotspot["guid"] == "m" and hotspot["chain_operations"] == 3
+    assert hotspot["chain"] == ["Flatten Tree", "Graft Tree", "Addition"]
+    (tree,) = analyzer.run_passes(TreeOperations(2))
+    # "side" (chain 2) is off the reported chain and qualifies on its own
+    assert [h["guid"] for h in tree["hotspots"]] == ["m", "side"]
+
+
+def _node(data, guid):
+    return next(node for node in data["components"] + data["params"] if node["guid"] == guid)
+
+
+def _tree_guids(data):
+    return [node["guid"] for node in data["components"] if node["name"] in ("Flatten Tree", "Graft Tree")]
+
+
+def _move(data):
+    _node(data, "c1-3-2")["pos"][0] += 300.0
+
+
+def _untree_access(data):
+    for port in _node(data, "c1-5-1")["inputs"]:
+        port.pop("tree_access", None)
+    for node in data["components"]:
+        if any(port.get("tree_access") for port in node["inputs"]):
+            node["outputs"][0]["tree_access"] = "tree"
+            break
+
+
+def _retype_tree_component(data):
+    guid = _tree_guids(data)[0]
+    _node(data, guid).update(name="Addition", type="Addition")
+
+
+def _new_tree_component(data):
+    _node(data, "c1-7-0").update(name="Flatten Tree", type="Flatten Tree")
+
+
+def _rewire(data):
+    moved = data["wires"].pop(11)
+    moved["to"]["guid"] = "c1-9-4"
+    data["wires"].append(moved)
+
+
+def _remove_node(data):
+    data["components"] = [node for node in data["components"] if node["guid"] != "c1-6-0"]
+    data["wires"] = [w for w in data["wires"] if "c1-6-0" not in (w["from"]["guid"], w["to"]["guid"])]
+
+
+@pytest.mark.parametrize("edit", [_move, _untree_access, _retype_tree_component, _new_tree_component,
+                                  _rewire, _remove_node])
+def test_incremental_update_matches_full_recompute(edit, monkeypatch):
+    data = sectioned_definition(1)
+    previous = GHAnalyzer.from_data(copy.deepcopy(data))
+    before = previous.run_passes(MixedAccess(), TreeOperations(3))
+    assert before[0] and before[1]["hotspots"]
+    edited = copy.deepcopy(data)
+    edit(edited)
+
+    updates = []
+    update = TreeOperations.update
+    monkeypatch.setattr(TreeOperations, "update",
+                        lambda self, *args: updates.append(update(self, *args)) or updates[-1])
+    analyzer = GHAnalyzer.from_data(copy.deepcopy(edited))
+    analyzer.follow(previous, diff_models(previous.model, analyzer.model))
+    incremental = analyzer.run_passes(MixedAccess(), TreeOperations(3))
+    assert incremental == GHAnalyzer.from_data(edited).run_passes(MixedAccess(), TreeOperations(3))
+    # A move carries the chains over; editing a tree component recomputes them
+    expected = {_move: True, _retype_tree_component: True, _new_tree_component: True}.get(edit)
+    assert len(updates) == 1 and expected in (None, updates[0])
+
+
+def _add_node(data):
+    data["components"].insert(3, dict(copy.deepcopy(_node(data, "c1-6-0")), guid="added"))
+
+
+@pytest.mark.parametrize("edit", [_move, _untree_access, _rewire, _remove_node, _add_node])
+def test_dangling_ports_patch_the_previous_lists(edit):
+    data = sectioned_definition(1)
+    previous = GHAnalyzer.from_data(copy.deepcopy(data))
+    assert previous.find_dangling_inputs() and previous.find_dangling_outputs()
+    edited = copy.deepcopy(data)
+    edit(edited)
+    analyzer = GHAnalyzer.from_data(copy.deepcopy(edited))
+    analyzer.follow(previous, diff_models(previous.model, analyzer.model))
+    assert analyzer.find_dangling_ports() == GHAnalyzer.from_data(edited).find_dangling_ports()
+    assert analyzer._pass_visitors[DanglingPorts().key].previous is not None
@@ -0,0 +1,217 @@
+"""
+Rule engine: built-in rule fixtures, custom rules, the shared traversal
+"""
+import copy
+import time
+
+import pytest
+
+from analyzer import rule_engine
+from analyzer.gh_analyzer import GHAnalyzer
+from analyzer.gh_linter import GHLinter
+from analyzer.graph import DefinitionGraph
+from analyzer.passes import DanglingPorts, TimedNodes
+from analyzer.rule_engine import LintRule, NodeRule, register_rule
+
+from conftest import component, definition, param, sectioned_definition, wire
+
+
+def _chain(count, name="Addition", **extra):
+    """``count`` components wired in a row, so nothing dangles but the ends"""
+    components = [component(f"c{i}", name, **extra) for i in range(count)]
+    wires = [wire(f"c{i}", f"c{i + 1}") for i in range(count - 1)]
+    return components, wires
+
+
+def _definition(components=(), params=(), wires=()):
+    return definition(components, params, wires)
+
+
+def _expressions(count):
+    components, wires = _chain(count, "Expression")
+    return _definition(components, wires=wires)
+
+
+def _data_dams(count):
+    components, wires = _chain(count, "Data Dam", inputs=("D",), outputs=("D",))
+    return _definition(components, wires=wires)
+
+
+def _panel(characters, wired=True):
+    panel = param("p", "Panel", panel_text="x" * characters)
+    return _definition([component("c")], [panel], [wire("p", "c", out_name="Panel")] if wired else [])
+
+
+def _hidden(hidden):
+    return _definition([component("c", hidden=hidden)])
+
+
+def _scribbles(components, scribble):
+    components, wires = _chain(components)
+    return _definition(components, [param("note", "Scribble")] if scribble else [], wires)
+
+
+def _timed(*times, **extra):
+    return _definition([component(f"c{i}", time_ms=t, **extra) for i, t in enumerate(times)])
+
+
+RULE_FIXTURES = [
+    ("GH006", _expressions(11), _expressions(10)),
+    ("GH010", _panel(1001), _panel(1000)),
+    ("GH010", _panel(5000), _panel(5000, wired=False)),
+    ("GH012", _hidden(True), _hidden(False)),
+    ("GH013", _data_dams(4), _data_dams(3)),
+    ("GH015", _scribbles(50, False), _scribbles(50, True)),
+    ("GH015", _scribbles(50, False), _scribbles(49, False)),
+    ("GH016", _timed(100.0, 1.0), _timed(99.9, 1.0)),
+    ("GH017", _timed(30.0, 20.0), _timed(*[10.0] * 6)),
+    ("GH018", _timed(50.0, preview_capable=True), _timed(50.0, preview_capable=True, hidden=True)),
+    ("GH018", _timed(50.0, preview_capable=True), _timed(50.0, preview_capable=False)),
+]
+
+
+def _rule_issues(data, rule_id):
+    linter = GHLinter.from_analyzer(GHAnalyzer.from_data(data))
+    linter.select_rules([rule_id])
+    return linter.lint_all()
+
+
+@pytest.mark.parametrize("rule_id, firing, quiet", RULE_FIXTURES)
+def test_rule_fires_only_on_its_fixture(rule_id, firing, quiet):
+    (issue,) = _rule_issues(firing, rule_id)
+    assert issue["rule"]["id"] == rule_id and issue["count"] >= 1
+    assert len(issue["items"]) == issue["count"]
+    assert _rule_issues(quiet, rule_id) == []
+
+
+
+@pytest.mark.parametrize("threshold", [0, 1, 2.5, 5, 1000])
+def test_wire_crossings_rule_keeps_crossed_or_long_wires(threshold):
+    analyzer = GHAnalyzer.from_data(sectioned_definition(3))
+    linter = GHLinter.from_analyzer(analyzer)
+    linter.wire_crossing_threshold = threshold
+    linter.select_rules(["GH009"])
+    wires = analyzer.find_wire_crossings(linter.long_wire_percentile)["wires"]
+    expected = [w for w in wires if w["crossings"] >= threshold or w["long"]]
+    assert [issue["items"] for issue in linter.lint_all()] == ([expected] if expected else [])
+
+def test_timing_rules_report_the_slow_objects():
+    data = _timed(120.0, 35.0, 5.0, preview_capable=True)
+    slow, = _rule_issues(data, "GH016")
+    assert [item["guid"] for item in slow["items"]] == ["c0"]
+    bottleneck, = _rule_issues(data, "GH017")
+    assert [item["guid"] for item in bottleneck["items"]] == ["c0", "c1"]
+    assert bottleneck["total_ms"] == 160.0
+    heavy, = _rule_issues(data, "GH018")
+    assert [item["time_ms"] for item in heavy["items"]] == [120.0]
+
+
+class CountAdditions(LintRule):
+    """Test rule: every Addition component"""
+    rule = {"id": "X001", "severity": "warning", "title": "Additions", "description": "Addition components",
+            "why_it_matters": "Testing", "how_to_fix": "Nothing"}
+
+    def begin(self, graph):
+        self.found = []
+
+    def visit_node(self, v, node):
+        if node.name == "Addition":
+            self.found.append({"component": node.name, "guid": node.guid, "pos": node.pos})
+
+    def issues(self):
+        return [self.issue(self.found)] if self.found else []
+
+
+def test_custom_rule_on_one_linter():
+    components, wires = _chain(3)
+    data = _definition(components, wires=wires)
+    linter = GHLinter.from_analyzer(GHAnalyzer.from_data(data))
+    assert linter.add_rule(CountAdditions) is CountAdditions
+    issues = linter.lint_all()
+    custom = [issue for issue in issues if issue["rule"]["id"] == "X001"]
+    assert custom and custom[0]["count"] == 3
+    assert "X001: Additions [WARNING]" in linter.generate_lint_report()
+    # Other linters do not run it
+    other = GHLinter.from_analyzer(GHAnalyzer.from_data(data))
+    assert all(issue["rule"]["id"] != "X001" for issue in other.lint_all())
+
+
+def test_registered_rule_runs_on_new_linters():
+    class Registered(CountAdditions):
+        rule = dict(CountAdditions.rule, id="X002")
+
+    assert register_rule(Registered) is Registered
+    try:
+        linter = GHLinter.from_analyzer(GHAnalyzer.from_data(_definition([component("a")])))
+        assert [i["count"] for i in linter.lint_all() if i["rule"]["id"] == "X002"] == [1]
+    finally:
+        rule_engine.RULE_REGISTRY.remove(Registered)
+
+
+def test_all_rules_share_one_traversal(monkeypatch):
+    walks = []
+    traverse = DefinitionGraph.traverse
+
+    def counting_traverse(graph, visitors):
+        walks.append([type(v) for v in visitors])
+        return traverse(graph, visitors)
+
+    monkeypatch.setattr(DefinitionGraph, "traverse", counting_traverse)
+    linter = GHLinter.from_analyzer(GHAnalyzer.from_data(sectioned_definition(1)))
+    linter.add_rule(CountAdditions)
+    linter.lint_all()
+    (walk,) = walks
+    # Passes several rules read are walked once
+    assert walk.count(DanglingPorts) == 1 and walk.count(TimedNodes) == 1
+    assert CountAdditions in walk
+    # A second lint reuses the memoized passes and walks only the rules
+    linter.lint_all()
+    assert len(walks) == 2 and DanglingPorts not in walks[1]
+
+
+class SlowRule(CountAdditions):
+    """Test rule: a millisecond per component, far past its budget"""
+    rule = dict(CountAdditions.rule, id="X003")
+    budget_ms = 20
+
+    def visit_node(self, v, node):
+        time.sleep(0.001)
+        if node.is_component:
+            self.found.append({"component": node.name, "guid": node.guid, "pos": node.pos})
+
+
+def test_slow_rule_is_cut_short_and_the_others_still_report():
+    linter = GHLinter.from_analyzer(GHAnalyzer.from_data(sectioned_definition(1)))
+    linter.add_rule(SlowRule)
+    issues = linter.lint_all()
+    stats = {s["rule"]: s for s in linter.rule_stats}
+    (slow,) = [issue for issue in issues if issue["rule"]["id"] == "X003"]
+    assert slow["partial"] and stats["X003"]["partial"]
+    assert 0 < stats["X003"]["nodes"] < linter.analyzer.model.n_nodes
+    # The built-in rules finish within the budget and report as without one
+    unlimited = GHLinter.from_analyzer(GHAnalyzer.from_data(sectioned_definition(1))).lint_all()
+    assert [i for i in issues if i["rule"]["id"] != "X003"] == unlimited
+    assert not any(s["partial"] for rule_id, s in stats.items() if rule_id != "X003")
+
+
+class SlowBegin(NodeRule):
+    """Test rule: 50 ms setup, run again inside ``update``"""
+    rule = dict(CountAdditions.rule, id="X004")
+
+    def begin(self, graph):
+        time.sleep(0.05)
+        super().begin(graph)
+
+
+def test_update_time_is_metered_once():
+    data = sectioned_definition(1)
+    previous = GHLinter.from_analyzer(GHAnalyzer.from_data(copy.deepcopy(data)))
+    previous.add_rule(SlowBegin)
+    previous.lint_all()
+    data["components"][0]["pos"][0] += 100.0
+    linter = GHLinter.from_analyzer(GHAnalyzer.from_data(data))
+    linter.add_rule(SlowBegin)
+    linter.lint_incremental(previous)
+    (stats,) = [s for s in linter.rule_stats if s["rule"] == "X004"]
+    # update calls begin: one sleep, counted once
+    assert 50.0 <= stats["time_ms"] < 90.0
@@ -0,0 +1,170 @@
+"""
+SpatialIndex queries and wire crossings against brute force
+"""
+import copy
+import math
+import random
+from array import array
+
+import pytest
+
+from analyzer.gh_analyzer import GHAnalyzer
+from analyzer.model_diff import diff_models
+from analyzer.spatial import SpatialIndex, count_crossings, segment_crossings
+
+from conftest import component, definition, wire
+
+
+def _intersects(a, b):
+    return a[0] <= b[2] and a[2] >= b[0] and a[1] <= b[3] and a[3] >= b[1]
+
+
+@pytest.fixture
+def boxes():
+    rng = random.Random(16)
+    found = []
+    for _ in range(600):
+        x, y = rng.uniform(0, 4000), rng.uniform(0, 4000)
+        found.append((x, y, x + rng.uniform(40, 160), y + rng.uniform(20, 80)))
+    return found
+
+
+def test_overlapping_pairs(boxes):
+    expected = [(i, j) for i in range(len(boxes)) for j in range(i + 1, len(boxes))
+                if _intersects(boxes[i], boxes[j])]
+    assert expected
+    assert SpatialIndex(boxes).overlapping_pairs() == expected
+
+
+def test_range_and_nearest(boxes):
+    index = SpatialIndex(boxes)
+    rng = random.Random(1)
+    for _ in range(50):
+        x, y = rng.uniform(-200, 4200), rng.uniform(-200, 4200)
+        rect = (x, y, x + 500, y + 300)
+        assert index.query_range(*rect) == [i for i, box in enumerate(boxes) if _intersects(box, rect)]
+        distances = sorted(math.hypot(max(b[0] - x, 0.0, x - b[2]), max(b[1] - y, 0.0, y - b[3]))
+                           for b in boxes)
+        assert [d for d, _ in index.nearest(x, y, 5)] == pytest.approx(distances[:5])
+
+
+def test_empty_index():
+    index = SpatialIndex([])
+    assert index.query_range(0, 0, 10, 10) == []
+    assert index.nearest(0, 0, 3) == []
+    assert index.overlapping_pairs() == []
+
+
+class _CountingCells(dict):
+    lookups = 0
+
+    def get(self, key, default=None):
+        _CountingCells.lookups += 1
+        return super().get(key, default)
+
+
+@pytest.mark.parametrize("point", [(1e4, 1e4), (3e5, 3e5), (-3e5, 2000.0), (2000.0, 1e6)])
+def test_nearest_far_outside_the_grid(boxes, point):
+    index = SpatialIndex(boxes)
+    gx0, gy0, gx1, gy1 = index.bounds
+    index.cells = _CountingCells(index.cells)
+    _CountingCells.lookups = 0
+    x, y = point
+    distances = sorted(math.hypot(max(b[0] - x, 0.0, x - b[2]), max(b[1] - y, 0.0, y - b[3]))
+                       for b in boxes)
+    assert [d for d, _ in index.nearest(x, y, 5)] == pytest.approx(distances[:5])
+    # Only cells of the populated grid are looked up, however far away the point is
+    assert _CountingCells.lookups <= (gx1 - gx0 + 1) * (gy1 - gy0 + 1)
+
+
+def _side(ax, ay, bx, by, cx, cy):
+    value = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+    return (value > 0) - (value < 0)
+
+
+def _brute_crossings(segments, ends):
+    """Proper crossings per segment: interiors meet at one point, no shared endpoint id"""
+    counts = [0] * len(segments)
+    for i, (ax, ay, bx, by) in enumerate(segments):
+        for j in range(i + 1, len(segments)):
+            if set(ends[i]) & set(ends[j]):
+                continue
+            cx, cy, dx, dy = segments[j]
+            if (_side(ax, ay, bx, by, cx, cy) * _side(ax, ay, bx, by, dx, dy) < 0
+                    and _side(cx, cy, dx, dy, ax, ay) * _side(cx, cy, dx, dy, bx, by) < 0):
+                counts[i] += 1
+                counts[j] += 1
+    return counts
+
+
+def _random_segments(seed):
+    """Wires between random points; integer points make collinear runs, T-junctions and crossings on cell edges"""
+    rng = random.Random(seed)
+    on_grid = seed % 2 == 0
+    points = [(float(rng.randrange(12)), float(rng.randrange(12))) if on_grid
+              else (rng.uniform(0, 100), rng.uniform(0, 100)) for _ in range(rng.randrange(4, 30))]
+    ends = [tuple(rng.sample(range(len(points)), 2)) for _ in range(rng.randrange(2, 50))]
+    if on_grid:
+        # Collinear overlapping wires, and a wire ending on another's interior
+        points += [(0.0, 0.0), (6.0, 6.0), (2.0, 2.0), (9.0, 9.0), (3.0, 0.0), (3.0, 3.0)]
+        n = len(points)
+        ends += [(n - 6, n - 5), (n - 4, n - 3), (n - 2, n - 1)]
+    return [points[a] + points[b] for a, b in ends], ends
+
+
+@pytest.mark.parametrize("seed", range(60))
+@pytest.mark.parametrize("cell_size", [0.0, 0.7, 1.0, 3.0])
+def test_segment_crossings_match_brute_force(seed, cell_size):
+    segments, ends = _random_segments(seed)
+    columns = [array("d", column) for column in zip(*segments)]
+    ends_a, ends_b = (array("i", column) for column in zip(*ends))
+    expected = _brute_crossings(segments, ends)
+    counts, total = segment_crossings(*columns, ends_a, ends_b, cell_size)
+    assert list(counts) == expected and total == sum(expected) // 2
+    if not cell_size:
+        return
+    # Queried pairs agree with the full pass, whichever segments are asked about
+    queries = random.Random(seed).sample(range(len(segments)), len(segments) // 3 + 1)
+    patched = [0] * len(segments)
+    for i, j in count_crossings(*columns, ends_a, ends_b, queries, cell_size):
+        patched[i] += 1
+        patched[j] += 1
+    assert [patched[q] for q in queries] == [expected[q] for q in queries]
+
+
+def _layout(seed, count=120):
+    rng = random.Random(seed)
+    components = [component(f"n{i}", pos=[rng.uniform(0, 2000), rng.uniform(0, 2000)]) for i in range(count)]
+    wires = [wire(f"n{a}", f"n{b}") for a, b in (rng.sample(range(count), 2) for _ in range(3 * count))]
+    return definition(components, wires=wires)
+
+
+def _move(data):
+    for node in data["components"][::17]:
+        node["pos"] = [node["pos"][1], node["pos"][0]]
+
+
+def _add(data):
+    data["components"].append(component("new", pos=[1000.0, 1000.0]))
+    data["wires"] += [wire("new", "n3"), wire("n40", "new")]
+
+
+def _remove(data):
+    del data["wires"][::9]
+
+
+@pytest.mark.parametrize("edit", [_move, _add, _remove])
+def test_patched_crossings_match_a_full_recompute(edit, monkeypatch):
+    data = _layout(15)
+    previous = GHAnalyzer.from_data(copy.deepcopy(data))
+    previous.find_wire_crossings()
+    edit(data)
+    analyzer = GHAnalyzer.from_data(copy.deepcopy(data))
+    analyzer.follow(previous, diff_models(previous.model, analyzer.model))
+    patched = []
+    patch = GHAnalyzer._patch_crossings
+    monkeypatch.setattr(GHAnalyzer, "_patch_crossings",
+                        lambda self, *args: patched.append(patch(self, *args)) or patched[-1])
+    result = analyzer.find_wire_crossings()
+    assert patched[0] is not None
+    assert result == GHAnalyzer.from_data(data).find_wire_crossings()
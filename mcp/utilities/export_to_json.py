@@ -60,6 +60,27 @@ def pt_to_xy(pt):
     except:
         return [0.0, 0.0]
 
+def rect_to_xywh(rect):
+    try:
+        return [float(rect.X), float(rect.Y), float(rect.Width), float(rect.Height)]
+    except:
+        return None
+
+def get_tree_settings(param):
+    """Data-tree flags of a param (flatten/graft mapping, simplify, reverse), only those set"""
+    settings = {}
+    try:
+        mapping = str(param.DataMapping).lower()
+        if mapping in ("flatten", "graft"):
+            settings["mapping"] = mapping
+        if param.Simplify:
+            settings["simplify"] = True
+        if param.Reverse:
+            settings["reverse"] = True
+    except:
+        pass
+    return settings
+
 def get_group_id(obj):
     """Safely get group ID"""
     try:
@@ -89,6 +110,18 @@ def get_owner_guid(param):
         pass
     return None
 
+def get_input_index(param):
+    """Get the index of an input parameter on its owning component (0 for standalone parameters)"""
+    try:
+        if hasattr(param, 'Attributes') and param.Attributes:
+            if hasattr(param.Attributes, 'Parent') and param.Attributes.Parent:
+                parent_obj = param.Attributes.Parent.DocObject
+                if isinstance(parent_obj, gh.Kernel.IGH_Component):
+                    return parent_obj.Params.Input.IndexOf(param)
+    except:
+        pass
+    return 0
+
 def extract_volatile_data(param):
     """Extract actual data from parameter's VolatileData"""
     try:
@@ -139,6 +172,17 @@ for obj in doc.Objects:
             "pos": pt_to_xy(obj.Attributes.Pivot) if hasattr(obj, 'Attributes') else [0, 0],
             "group": get_group_id(obj)
         }
+        bounds = rect_to_xywh(obj.Attributes.Bounds) if hasattr(obj, 'Attributes') else None
+        if bounds:
+            dobj["bounds"] = bounds
+        if isinstance(obj, gh.Kernel.IGH_PreviewObject):
+            dobj["hidden"] = bool(obj.Hidden)
+            dobj["preview_capable"] = bool(obj.IsPreviewCapable)
+        if isinstance(obj, gh.Kernel.IGH_ActiveObject):
+            try:
+                dobj["time_ms"] = float(obj.ProcessorTime.TotalMilliseconds)
+            except:
+                pass
         
         # Check if component
         if isinstance(obj, gh.Kernel.IGH_Component):
@@ -151,8 +195,11 @@ for obj in doc.Objects:
                         "tree_access": str(ip.Access) if hasattr(ip, 'Access') else "",
                         "source_count": ip.SourceCount if hasattr(ip, 'SourceCount') else 0
                     }
+                    if hasattr(ip, "Optional"):
+                        param_info["optional"] = bool(ip.Optional)
                     if hasattr(ip, "TypeHint"):
                         param_info["type_hint"] = str(ip.TypeHint)
+                    param_info.update(get_tree_settings(ip))
                     ins.append(param_info)
             except Exception as e:
                 data["warnings"].append(f"input_error: {e}")
@@ -167,6 +214,8 @@ for obj in doc.Objects:
                         "recipient_count": op.RecipientCount if hasattr(op, 'RecipientCount') else 0
                     }
                     
+                    out_info.update(get_tree_settings(op))
+                    
                     # Extract volatile data from output parameters
                     volatile = extract_volatile_data(op)
                     if volatile:
@@ -191,6 +240,10 @@ for obj in doc.Objects:
                     dobj["recipient_count"] = obj.RecipientCount
             except:
                 pass
+            if isinstance(obj, gh.Kernel.IGH_Param):
+                if hasattr(obj, 'Access'):
+                    dobj["tree_access"] = str(obj.Access)
+                dobj.update(get_tree_settings(obj))
             
             # Slider values and Panel data
             try:
@@ -246,6 +299,7 @@ for obj in doc.Objects:
                                     },
                                     "to": {
                                         "guid": target_guid if target_guid else "",
+                                        "in_index": get_input_index(rec),
                                         "in_name": str(rec.NickName or rec.Name or "")
                                     }
                                 }
@@ -39,6 +39,8 @@ class GHLiveAnalyzer:
             self.wires = []
             self.groups = []
             self.issues = []
+            self._spatial = None
+            self._reach = None
             
         except Exception as e:
             raise Exception("Failed to initialize analyzer: " + str(e))
@@ -49,6 +51,8 @@ class GHLiveAnalyzer:
             self.components = []
             self.wires = []
             self.groups = []
+            self._spatial = None
+            self._reach = None
             
             # Use the WORKING approach from debugging
             if self.doc and hasattr(self.doc, 'Objects'):
@@ -2679,6 +2683,402 @@ class GHLiveAnalyzer:
         except Exception as e:
             return [{'issue': 'Suggestion generation failed', 'action': str(e), 'auto_fix': False}]
 
+    # ==================== IMPACT ANALYSIS ====================
+
+    def _build_wire_graph(self):
+        """Successor and predecessor guid sets of every top-level object"""
+        if not self.components:
+            self.scan_document()
+
+        objects = {}
+        succ = {}
+        pred = {}
+        for comp in self.components:
+            guid = str(comp.InstanceGuid)
+            objects[guid] = comp
+            succ.setdefault(guid, set())
+            pred.setdefault(guid, set())
+
+        for comp in self.components:
+            try:
+                guid = str(comp.InstanceGuid)
+                # Components wire out of their output params; floating params out of themselves
+                if hasattr(comp, 'Params') and hasattr(comp.Params, 'Output'):
+                    outputs = list(comp.Params.Output)
+                else:
+                    outputs = [comp]
+                for param in outputs:
+                    if not hasattr(param, 'Recipients') or not param.Recipients:
+                        continue
+                    for recipient in param.Recipients:
+                        try:
+                            target = str(recipient.Attributes.GetTopLevel.DocObject.InstanceGuid)
+                        except:
+                            continue
+                        if target in objects and target != guid:
+                            succ[guid].add(target)
+                            pred[target].add(guid)
+            except:
+                continue
+
+        self._reach = {'objects': objects, 'succ': succ, 'pred': pred,
+                       'downstream': {}, 'upstream': {}}
+        return self._reach
+
+    def _cone(self, guid, direction):
+        """
+        Guids reachable from guid along (downstream) or against (upstream) the wires
+
+        Cones are memoized per object, and a search that meets an object
+        whose cone is already known takes that whole cone instead of walking
+        it again, so querying every slider costs little more than one pass.
+        Only queried objects are memoized, one set each, so memory grows with
+        queries times cone size; scan_document() drops the memo.
+        """
+        reach = self._reach if self._reach is not None else self._build_wire_graph()
+        memo = reach[direction]
+        if guid in memo:
+            return memo[guid]
+
+        adjacent = reach['succ'] if direction == 'downstream' else reach['pred']
+        cone = set()
+        stack = [guid]
+        while stack:
+            current = stack.pop()
+            for nxt in adjacent.get(current, ()):
+                if nxt in cone:
+                    continue
+                cone.add(nxt)
+                known = memo.get(nxt)
+                if known is not None:
+                    cone.update(known)
+                else:
+                    stack.append(nxt)
+        cone.discard(guid)
+        memo[guid] = frozenset(cone)
+        return memo[guid]
+
+    def _cone_report(self, target, direction):
+        try:
+            reach = self._reach if self._reach is not None else self._build_wire_graph()
+            guid = str(target.InstanceGuid) if hasattr(target, 'InstanceGuid') else str(target)
+            if guid not in reach['objects']:
+                return {'error': 'Object not found: ' + guid}
+
+            objects = []
+            for other in sorted(self._cone(guid, direction)):
+                obj = reach['objects'][other]
+                objects.append({
+                    'name': obj.NickName if hasattr(obj, 'NickName') and obj.NickName else 'Unnamed',
+                    'guid': other,
+                    'is_param': self._is_param_component(obj)
+                })
+            source = reach['objects'][guid]
+            return {
+                'name': source.NickName if hasattr(source, 'NickName') and source.NickName else 'Unnamed',
+                'guid': guid,
+                'direction': direction,
+                'count': len(objects),
+                'objects': objects
+            }
+        except Exception as e:
+            return {'error': str(e)}
+
+    def get_downstream_cone(self, target):
+        """Objects that recompute when target (an object or its guid) changes"""
+        return self._cone_report(target, 'downstream')
+
+    def get_upstream_cone(self, target):
+        """Objects whose output feeds into target (an object or its guid)"""
+        return self._cone_report(target, 'upstream')
+
+    def get_slider_impact(self):
+        """
+        Downstream cone size of every unwired input (sliders, panels, toggles)
+
+        Returns:
+            List of {'name', 'guid', 'type', 'downstream_count'}, largest first
+        """
+        try:
+            reach = self._reach if self._reach is not None else self._build_wire_graph()
+            impact = []
+            for guid, obj in reach['objects'].items():
+                if reach['pred'][guid] or not self._is_param_component(obj):
+                    continue
+                impact.append({
+                    'name': obj.NickName if hasattr(obj, 'NickName') and obj.NickName else 'Unnamed',
+                    'guid': guid,
+                    'type': obj.GetType().Name,
+                    'downstream_count': len(self._cone(guid, 'downstream'))
+                })
+            impact.sort(key=lambda i: i['downstream_count'], reverse=True)
+            return impact
+        except Exception as e:
+            return [{'error': str(e)}]
+
+    def _is_sink(self, comp):
+        """Whether an object's result is used outside the wire graph (display, bake, preview)"""
+        try:
+            label = comp.GetType().FullName + ' ' + (comp.Name or '') + ' ' + (comp.NickName or '')
+        except:
+            label = ''
+        sink_keywords = ['Panel', 'Bake', 'Export', 'Save', 'Write', 'ClusterOutput', 'Cluster Output',
+                         'CustomPreview', 'Custom Preview', 'DataRecorder', 'Data Recorder']
+        for keyword in sink_keywords:
+            if keyword in label:
+                return True
+        # Objects without a preview (sliders, toggles) lack IsPreviewCapable
+        if hasattr(comp, 'Hidden') and comp.Hidden:
+            return False
+        return bool(getattr(comp, 'IsPreviewCapable', False))
+
+    def find_dead_components(self, timing_data=None):
+        """
+        Components whose results never reach a sink
+
+        One reverse search from every sink (panels, bake/export components,
+        cluster outputs, visible previews) marks the live objects; the rest
+        compute results nobody uses and can be deleted.
+
+        Args:
+            timing_data: Optional result of profile_document(); otherwise each
+                component's last ProcessorTime is used as its cost
+
+        Returns:
+            {'live': int, 'dead': [{'name', 'guid', 'time_ms'}], 'total_time_ms': float}
+        """
+        try:
+            reach = self._reach if self._reach is not None else self._build_wire_graph()
+            pred = reach['pred']
+
+            live = set(guid for guid, obj in reach['objects'].items() if self._is_sink(obj))
+            stack = list(live)
+            while stack:
+                current = stack.pop()
+                for source in pred.get(current, ()):
+                    if source not in live:
+                        live.add(source)
+                        stack.append(source)
+
+            dead = []
+            for guid, obj in reach['objects'].items():
+                if guid in live:
+                    continue
+                # Unwired params (scribbles, stray sliders) are not computation
+                if self._is_param_component(obj) and not reach['succ'][guid] and not pred[guid]:
+                    continue
+                time_ms = None
+                if timing_data and guid in timing_data:
+                    time_ms = timing_data[guid].get('avg_time_ms')
+                elif hasattr(obj, 'ProcessorTime'):
+                    try:
+                        time_ms = obj.ProcessorTime.TotalMilliseconds
+                    except:
+                        pass
+                dead.append({
+                    'name': obj.NickName if hasattr(obj, 'NickName') and obj.NickName else 'Unnamed',
+                    'guid': guid,
+                    'time_ms': time_ms
+                })
+
+            dead.sort(key=lambda d: d['time_ms'] or 0, reverse=True)
+            return {
+                'live': len(live),
+                'dead': dead,
+                'total_time_ms': sum(d['time_ms'] or 0 for d in dead)
+            }
+        except Exception as e:
+            return {'error': str(e)}
+
+    # ==================== SPATIAL QUERIES ====================
+
+    def build_spatial_index(self, cell_size=None):
+        """
+        Build a uniform grid over the canvas bounds of every scanned object
+
+        Each object is registered in every grid cell its Attributes.Bounds
+        touches, so range, nearest and overlap queries only look at nearby
+        objects instead of comparing every pair. The cell size defaults to
+        twice the median object extent.
+
+        Returns:
+            Number of indexed objects
+        """
+        import math
+
+        if not self.components:
+            self.scan_document()
+
+        boxes = []
+        objects = []
+        for comp in self.components:
+            try:
+                if not hasattr(comp, 'Attributes') or not hasattr(comp.Attributes, 'Bounds'):
+                    continue
+                bounds = comp.Attributes.Bounds
+                boxes.append((float(bounds.X), float(bounds.Y),
+                              float(bounds.X + bounds.Width), float(bounds.Y + bounds.Height)))
+                objects.append(comp)
+            except:
+                continue
+
+        if not cell_size:
+            extents = sorted(max(b[2] - b[0], b[3] - b[1]) for b in boxes)
+            cell_size = 2.0 * extents[len(extents) // 2] if extents else 0
+            cell_size = max(cell_size, 1.0)
+
+        grid = {}
+        for i, box in enumerate(boxes):
+            for cell in self._grid_cells(box, cell_size):
+                grid.setdefault(cell, []).append(i)
+
+        # Extent of the populated cells, so far-away queries skip empty rings
+        bounds = (min(c[0] for c in grid), min(c[1] for c in grid),
+                  max(c[0] for c in grid), max(c[1] for c in grid)) if grid else (0, 0, -1, -1)
+
+        self._spatial = {'boxes': boxes, 'objects': objects, 'grid': grid, 'cell_size': cell_size,
+                         'bounds': bounds}
+        return len(boxes)
+
+    def _grid_cells(self, box, cell_size):
+        """Grid cells covered by a (min_x, min_y, max_x, max_y) box"""
+        import math
+        x0, y0 = int(math.floor(box[0] / cell_size)), int(math.floor(box[1] / cell_size))
+        x1, y1 = int(math.floor(box[2] / cell_size)), int(math.floor(box[3] / cell_size))
+        return [(cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)]
+
+    def _spatial_entry(self, i, **extra):
+        comp = self._spatial['objects'][i]
+        box = self._spatial['boxes'][i]
+        entry = {
+            'name': comp.NickName if hasattr(comp, 'NickName') and comp.NickName else 'Unnamed',
+            'guid': str(comp.InstanceGuid),
+            'bounds': [box[0], box[1], box[2] - box[0], box[3] - box[1]]
+        }
+        entry.update(extra)
+        return entry
+
+    def find_objects_in_box(self, min_x, min_y, max_x, max_y):
+        """Objects whose bounds intersect a canvas rectangle"""
+        try:
+            if self._spatial is None:
+                self.build_spatial_index()
+            boxes, grid = self._spatial['boxes'], self._spatial['grid']
+
+            found = set()
+            for cell in self._grid_cells((min_x, min_y, max_x, max_y), self._spatial['cell_size']):
+                for i in grid.get(cell, ()):
+                    box = boxes[i]
+                    if box[0] <= max_x and box[2] >= min_x and box[1] <= max_y and box[3] >= min_y:
+                        found.add(i)
+            return [self._spatial_entry(i) for i in sorted(found)]
+        except Exception as e:
+            return [{'error': str(e)}]
+
+    def find_nearest_objects(self, x, y, k=5):
+        """
+        The k objects closest to a canvas point (distance to their bounds)
+
+        Searches rings of grid cells outward from the point and stops once
+        the next ring is farther away than the k-th closest object found.
+        Rings start at the first one that meets the populated cells and are
+        clipped to them, so far-away points cost no more than nearby ones.
+        """
+        try:
+            import heapq
+            import math
+
+            if self._spatial is None:
+                self.build_spatial_index()
+            boxes, grid = self._spatial['boxes'], self._spatial['grid']
+            cell_size = self._spatial['cell_size']
+            if not boxes or k <= 0:
+                return []
+
+            cx, cy = int(math.floor(x / cell_size)), int(math.floor(y / cell_size))
+            gx0, gy0, gx1, gy1 = self._spatial['bounds']
+            first_ring = max(gx0 - cx, cx - gx1, gy0 - cy, cy - gy1, 0)
+            max_ring = max(abs(cx - gx0), abs(cx - gx1), abs(cy - gy0), abs(cy - gy1))
+            best = []  # max-heap of (-distance, index)
+            seen = set()
+            for ring in range(first_ring, max_ring + 1):
+                if len(best) == k and (ring - 1) * cell_size > -best[0][0]:
+                    break
+                # Cells of the ring inside the populated bounds
+                if ring == 0:
+                    cells = [(cx, cy)]
+                else:
+                    columns = range(max(cx - ring, gx0), min(cx + ring, gx1) + 1)
+                    rows = range(max(cy - ring + 1, gy0), min(cy + ring - 1, gy1) + 1)
+                    cells = [(c, r) for r in (cy - ring, cy + ring) if gy0 <= r <= gy1 for c in columns]
+                    cells += [(c, r) for c in (cx - ring, cx + ring) if gx0 <= c <= gx1 for r in rows]
+                for cell in cells:
+                    for i in grid.get(cell, ()):
+                        if i in seen:
+                            continue
+                        seen.add(i)
+                        box = boxes[i]
+                        dx = max(box[0] - x, 0.0, x - box[2])
+                        dy = max(box[1] - y, 0.0, y - box[3])
+                        distance = math.hypot(dx, dy)
+                        if len(best) < k:
+                            heapq.heappush(best, (-distance, i))
+                        elif distance < -best[0][0]:
+                            heapq.heapreplace(best, (-distance, i))
+
+            return [self._spatial_entry(i, distance=round(d, 1))
+                    for d, i in sorted((-d, i) for d, i in best)]
+        except Exception as e:
+            return [{'error': str(e)}]
+
+    def find_overlapping_objects(self, min_area=1.0):
+        """
+        Pairs of objects drawn on top of each other, largest overlap first
+
+        Each pair is compared only in the grid cell that holds the corner of
+        their intersection, so every pair is reported once. Overlaps smaller
+        than min_area (including boxes that merely touch) are ignored.
+        """
+        try:
+            import math
+
+            if self._spatial is None:
+                self.build_spatial_index()
+            boxes, grid = self._spatial['boxes'], self._spatial['grid']
+            cell_size = self._spatial['cell_size']
+
+            overlaps = []
+            for (cell_x, cell_y), members in grid.items():
+                if len(members) < 2:
+                    continue
+                members = sorted(members, key=lambda i: boxes[i][0])
+                for p, i in enumerate(members):
+                    a = boxes[i]
+                    for j in members[p + 1:]:
+                        b = boxes[j]
+                        if b[0] > a[2]:
+                            break
+                        if b[3] < a[1] or b[1] > a[3]:
+                            continue
+                        corner_x, corner_y = max(a[0], b[0]), max(a[1], b[1])
+                        if (int(math.floor(corner_x / cell_size)) != cell_x or
+                                int(math.floor(corner_y / cell_size)) != cell_y):
+                            continue
+                        area = (min(a[2], b[2]) - corner_x) * (min(a[3], b[3]) - corner_y)
+                        if area < min_area:
+                            continue
+                        first, second = self._spatial_entry(i), self._spatial_entry(j)
+                        overlaps.append({
+                            'objects': [first['name'], second['name']],
+                            'guids': [first['guid'], second['guid']],
+                            'overlap_area': round(area, 1)
+                        })
+
+            overlaps.sort(key=lambda o: o['overlap_area'], reverse=True)
+            return overlaps
+        except Exception as e:
+            return [{'error': str(e)}]
+
     # ==================== PERFORMANCE PROFILING METHODS ====================
 
     def profile_document(self, mode='quick', iterations=1):
@@ -2813,6 +3213,97 @@ class GHLiveAnalyzer:
         except Exception as e:
             return []
 
+    def find_critical_path(self, timing_data=None, top_n=10):
+        """
+        Weight profiler timings onto the wire graph and find the critical path
+
+        The critical path is the heaviest chain of dependent components; it
+        bounds solve time once independent branches run in parallel, while
+        the serial total is what a single-threaded solve pays. Slack is how
+        much slower a component could get before the critical path grows.
+
+        Args:
+            timing_data: Result of profile_document(); profiled fresh if None
+            top_n: Number of least-slack components to return
+
+        Returns:
+            Dictionary with 'critical_path', 'critical_time_ms',
+            'serial_time_ms' and 'components' (least slack first)
+        """
+        try:
+            if timing_data is None:
+                timing_data = self.get_component_execution_times()
+            if 'error' in timing_data:
+                return {'error': timing_data['error']}
+
+            reach = self._reach if self._reach is not None else self._build_wire_graph()
+            succ, pred = reach['succ'], reach['pred']
+            weight = dict((guid, timing_data[guid]['avg_time_ms'] if guid in timing_data else 0.0)
+                          for guid in reach['objects'])
+
+            # Forward pass in topological order: earliest finish
+            indegree = dict((guid, len(pred[guid])) for guid in reach['objects'])
+            order = [guid for guid, count in indegree.items() if count == 0]
+            finish = {}
+            parent = {}
+            for guid in order:
+                best, best_parent = 0.0, None
+                for source in pred[guid]:
+                    if finish[source] > best:
+                        best, best_parent = finish[source], source
+                finish[guid] = best + weight[guid]
+                parent[guid] = best_parent
+                for target in succ[guid]:
+                    indegree[target] -= 1
+                    if indegree[target] == 0:
+                        order.append(target)
+
+            if not order:
+                return {'critical_path': [], 'critical_time_ms': 0, 'serial_time_ms': 0, 'components': []}
+            end = max(order, key=lambda guid: finish[guid])
+            total = finish[end]
+
+            # Backward pass: latest finish that keeps the total
+            latest = dict((guid, total) for guid in order)
+            for guid in reversed(order):
+                for target in succ[guid]:
+                    if target in latest:
+                        latest[guid] = min(latest[guid], latest[target] - weight[target])
+
+            path = []
+            guid = end
+            while guid is not None:
+                path.append(guid)
+                guid = parent[guid]
+            path.reverse()
+
+            def describe(guid):
+                obj = reach['objects'][guid]
+                return {
+                    'name': obj.NickName if hasattr(obj, 'NickName') and obj.NickName else 'Unnamed',
+                    'guid': guid,
+                    'time_ms': weight[guid]
+                }
+
+            components = []
+            for guid in order:
+                if guid not in timing_data:
+                    continue
+                entry = describe(guid)
+                entry['slack_ms'] = max(latest[guid] - finish[guid], 0.0)
+                components.append(entry)
+            components.sort(key=lambda c: (c['slack_ms'], -c['time_ms']))
+
+            return {
+                'critical_path': [describe(guid) for guid in path],
+                'critical_time_ms': total,
+                'serial_time_ms': sum(weight.values()),
+                'components': components[:top_n],
+                'cycle_objects': len(reach['objects']) - len(order)
+            }
+        except Exception as e:
+            return {'error': str(e)}
+
     def analyze_performance_patterns(self):
         """
         Analyze performance patterns and identify common issues